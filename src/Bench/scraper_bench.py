@@ -0,0 +1,446 @@
+from argparse import ArgumentParser
+from asyncio import (run as aio_run,
+                     gather as aio_gather,
+                     Semaphore as aio_Semaphore)
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from json import dumps as json_dumps, load as json_load
+from logging import getLogger
+from multiprocessing import get_context
+from platform import platform, python_version
+from shutil import rmtree
+from subprocess import run as subprocess_run
+from sys import exit
+from tempfile import mkdtemp
+from time import perf_counter
+from src.Bench.scraper_bench_corpus import ScraperBenchCorpus
+from src.Bench.scraper_bench_server import ScraperBenchServer
+from src.Error.scraper_error import ScraperError
+from src.Scraper.scraper import Scraper
+from src.Scraper.Archive.scraper_archive import ScraperArchive
+from src.Scraper.Cache.scraper_cache import ScraperCache
+from src.Scraper.Models.scraper_models import (ScraperMsgConfig,
+                                               ScraperParseMode,
+                                               ScraperParseExecutor,
+                                               ScraperParserBackend,
+                                               ScraperResponse)
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Operations.scraper_page_operations import ScraperPageOperations
+from src.Scraper.Parser.scraper_parser import ScraperParser
+from src.Scraper.Transport.scraper_transport import ScraperTransport
+from src.Scraper.Transport.scraper_aiohttp_transport import ScraperAiohttpTransport
+from src.Scraper.Transport.scraper_archive_transport import ScraperReplayTransport
+from src.Scraper.Transport.scraper_circuit_breaker import ScraperCircuitBreaker
+from src.Scraper.Transport.scraper_rate_limiter import ScraperRateLimiter
+
+LOGGER = getLogger()
+
+
+class _ScraperTimedTransport(ScraperTransport):
+    def __init__(self, *, transport: ScraperTransport, latencies: list):
+        self._transport = transport
+        self._latencies = latencies
+
+        self.IS_REMOTE = transport.IS_REMOTE
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        started_at = perf_counter()
+
+        try:
+            return await self._transport.get(url=url, headers=headers)
+        finally:
+            self._latencies.append(perf_counter() - started_at)
+
+    async def close(self) -> None:
+        await self._transport.close()
+
+
+class ScraperBench:
+    """Benchmarks over ScraperBenchCorpus, every job runs in a fresh process so its peak RSS is its own.
+
+    Kinds:
+        extract - extract_page, extract_topic_index and match_page on every page, checks that every parser
+                  backend extracts the same data as html.parser
+        crawl - Scraper.run on every page through ScraperBenchServer
+        replay - Scraper.run on every page from an archive, no network, parsing and matching only
+    """
+
+    KINDS = ('extract', 'crawl', 'replay')
+
+    @staticmethod
+    def run(*,
+            kinds: [str],
+            scenarios: [str],
+            backends: [ScraperParserBackend],
+            scale: float = 1.0,
+            latency: float = 0.01,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            concurrency: int = 8,
+            parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+            parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+            is_rate_limited: bool = False) -> dict:
+
+        results = []
+
+        for kind in kinds:
+            for scenario in scenarios:
+                for backend in backends:
+                    job = {'kind': kind,
+                           'scenario': scenario,
+                           'backend': backend,
+                           'scale': scale,
+                           'latency': latency,
+                           'jitter': jitter,
+                           'error_rate': error_rate,
+                           'concurrency': concurrency,
+                           'parse_mode': parse_mode,
+                           'parse_executor': parse_executor,
+                           'is_rate_limited': is_rate_limited}
+
+                    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                        result = executor.submit(ScraperBench.run_job, **job).result()
+
+                    LOGGER.info(f"{kind} {scenario} {backend.value} - {result.get('pages_per_sec')} pages/sec")
+                    results.append(result)
+
+        return {
+            'meta': {
+                'commit': ScraperBench._get_commit(),
+                'python': python_version(),
+                'platform': platform(),
+                'started_at': datetime.now(timezone.utc).isoformat(),
+                'options': {'scale': scale,
+                            'latency': latency,
+                            'jitter': jitter,
+                            'error_rate': error_rate,
+                            'concurrency': concurrency,
+                            'parse_mode': parse_mode.value,
+                            'parse_executor': parse_executor.value,
+                            'is_rate_limited': is_rate_limited}
+            },
+            'results': results
+        }
+
+    @staticmethod
+    def run_job(*,
+                kind: str,
+                scenario: str,
+                backend: ScraperParserBackend,
+                scale: float,
+                latency: float,
+                jitter: float,
+                error_rate: float,
+                concurrency: int,
+                parse_mode: ScraperParseMode,
+                parse_executor: ScraperParseExecutor,
+                is_rate_limited: bool) -> dict:
+
+        corpus = ScraperBenchCorpus(scale=scale)
+        msg_config = corpus.get_msg_config(scenario=scenario).model_copy(update={'parser': backend})
+
+        if kind == 'extract':
+            result = ScraperBench._bench_extract(corpus=corpus, scenario=scenario, msg_config=msg_config)
+        else:
+            result = aio_run(ScraperBench._bench_crawl(corpus=corpus,
+                                                       scenario=scenario,
+                                                       msg_config=msg_config,
+                                                       is_replay=kind == 'replay',
+                                                       latency=latency,
+                                                       jitter=jitter,
+                                                       error_rate=error_rate,
+                                                       concurrency=concurrency,
+                                                       parse_mode=parse_mode,
+                                                       parse_executor=parse_executor,
+                                                       is_rate_limited=is_rate_limited))
+
+        seconds = result['seconds']
+
+        return {'kind': kind,
+                'scenario': scenario,
+                'backend': backend.value,
+                **result,
+                'pages_per_sec': round(result['pages'] / seconds, 3) if seconds else None,
+                'msgs_per_sec': round(result['msgs'] / seconds, 3) if seconds else None,
+                'stages': {name: ScraperBench.get_stats(latencies=latencies)
+                           for name, latencies in result['stages'].items()},
+                'peak_rss_bytes': ScraperBench._get_peak_rss()}
+
+    @staticmethod
+    def compare(*, baseline: dict, current: dict, threshold: float = 0.1) -> [dict]:
+        """Throughput drops and p99 rises beyond threshold between two run() outputs"""
+
+        regressions = []
+        baseline_results = {(result['kind'], result['scenario'], result['backend']): result
+                            for result in baseline['results']}
+
+        for result in current['results']:
+            key = (result['kind'], result['scenario'], result['backend'])
+            baseline_result = baseline_results.get(key)
+
+            if baseline_result is None:
+                continue
+
+            checks = [('pages_per_sec', baseline_result['pages_per_sec'], result['pages_per_sec'], -1)]
+            checks += [(f'{stage}.p99_ms', baseline_result['stages'][stage]['p99_ms'], stats['p99_ms'], 1)
+                       for stage, stats in result['stages'].items() if stage in baseline_result['stages']]
+
+            for metric, before, after, direction in checks:
+                if before and after is not None and (after - before) / before * direction > threshold:
+                    regressions.append({'kind': key[0],
+                                        'scenario': key[1],
+                                        'backend': key[2],
+                                        'metric': metric,
+                                        'baseline': before,
+                                        'current': after})
+
+        return regressions
+
+    @staticmethod
+    def get_stats(*, latencies: [float]) -> dict:
+        if not latencies:
+            return {'count': 0, 'mean_ms': None, 'p50_ms': None, 'p99_ms': None, 'max_ms': None}
+
+        ordered = sorted(latencies)
+
+        def percentile(value: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(value * len(ordered)))] * 1000, 3)
+
+        return {'count': len(ordered),
+                'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+                'p50_ms': percentile(0.5),
+                'p99_ms': percentile(0.99),
+                'max_ms': round(ordered[-1] * 1000, 3)}
+
+    @staticmethod
+    def _bench_extract(*,
+                       corpus: ScraperBenchCorpus,
+                       scenario: str,
+                       msg_config: ScraperMsgConfig) -> dict:
+
+        stages = defaultdict(list)
+        pages = {}
+        topic_indexes = {}
+
+        started_at = perf_counter()
+
+        for url in corpus.crawl_urls[scenario]:
+            stage_started_at = perf_counter()
+            pages[url] = ScraperPageOperations.extract_page(html=corpus.pages[url], base_url=url, msg_config=msg_config)
+            stages['extract_page'].append(perf_counter() - stage_started_at)
+
+        for url in corpus.topic_urls[scenario]:
+            stage_started_at = perf_counter()
+            topic_indexes[url] = ScraperPageOperations.extract_topic_index(html=corpus.pages[url],
+                                                                           base_url=url,
+                                                                           msg_config=msg_config)
+            stages['extract_topic_index'].append(perf_counter() - stage_started_at)
+
+        msgs_count = 0
+
+        for url, page in pages.items():
+            msgs = [msg for msg in page['msgs'] if msg] if page else []
+            msgs_count += len(msgs)
+
+            stage_started_at = perf_counter()
+            ScraperPageOperations.match_page(msgs=msgs,
+                                             topic_indexes=topic_indexes if msg_config.topic_link_patterns
+                                             else {url: page['index']})
+            stages['match_page'].append(perf_counter() - stage_started_at)
+
+        seconds = perf_counter() - started_at
+
+        # html.parser is the reference every other backend has to agree with
+        mismatched_urls = []
+
+        if msg_config.parser != ScraperParserBackend.HTML_PARSER:
+            reference_config = msg_config.model_copy(update={'parser': ScraperParserBackend.HTML_PARSER})
+
+            for url, page in pages.items():
+                if page != ScraperPageOperations.extract_page(html=corpus.pages[url],
+                                                              base_url=url,
+                                                              msg_config=reference_config):
+                    mismatched_urls.append(url)
+
+            for url, topic_index in topic_indexes.items():
+                if topic_index != ScraperPageOperations.extract_topic_index(html=corpus.pages[url],
+                                                                            base_url=url,
+                                                                            msg_config=reference_config):
+                    mismatched_urls.append(url)
+
+        return {'pages': len(pages) + len(topic_indexes),
+                'failed_pages': len([page for page in pages.values() if not page]),
+                'msgs': msgs_count,
+                'requests': 0,
+                'seconds': round(seconds, 6),
+                'is_equivalent': not mismatched_urls,
+                'mismatched_urls': mismatched_urls[:5],
+                'stages': stages}
+
+    @staticmethod
+    async def _bench_crawl(*,
+                           corpus: ScraperBenchCorpus,
+                           scenario: str,
+                           msg_config: ScraperMsgConfig,
+                           is_replay: bool,
+                           latency: float,
+                           jitter: float,
+                           error_rate: float,
+                           concurrency: int,
+                           parse_mode: ScraperParseMode,
+                           parse_executor: ScraperParseExecutor,
+                           is_rate_limited: bool) -> dict:
+
+        stages = defaultdict(list)
+        server = None
+        archive = None
+        archive_path = None
+
+        try:
+            if is_replay:
+                archive_path = mkdtemp(prefix='scraper-bench-')
+                archive = ScraperArchive(path=archive_path)
+                await corpus.build(archive=archive)
+
+                transport = ScraperReplayTransport(archive=archive)
+                urls = corpus.crawl_urls[scenario]
+            else:
+                server = ScraperBenchServer(pages=corpus.pages, latency=latency, jitter=jitter, error_rate=error_rate)
+                await server.start()
+
+                transport = ScraperAiohttpTransport(proxy_url=None)
+                urls = [server.get_url(url) for url in corpus.crawl_urls[scenario]]
+
+            ScraperHtmlOperations.set_transport(_ScraperTimedTransport(transport=transport, latencies=stages['fetch']))
+            ScraperHtmlOperations.set_circuit_breaker(ScraperCircuitBreaker())
+            ScraperHtmlOperations.set_rate_limiter(ScraperRateLimiter() if is_rate_limited else None)
+
+            # First request pays for the user agent list and the connection pool, not part of the crawl
+            await ScraperHtmlOperations.get_html_from_url(url=urls[0], is_stop_404=False)
+            stages['fetch'].clear()
+
+            topic_cache = ScraperCache()
+            semaphore = aio_Semaphore(concurrency)
+
+            async def crawl(url: str) -> int or None:
+                async with semaphore:
+                    stage_started_at = perf_counter()
+                    result = await Scraper(url=url,
+                                           msg_config=msg_config,
+                                           is_stop_404=False,
+                                           topic_cache=topic_cache,
+                                           parse_mode=parse_mode,
+                                           parse_executor=parse_executor).run()
+                    stages['page'].append(perf_counter() - stage_started_at)
+
+                    return len(result) if result is not None else None
+
+            started_at = perf_counter()
+            msgs_counts = await aio_gather(*[crawl(url) for url in urls])
+            seconds = perf_counter() - started_at
+
+            await transport.close()
+
+        finally:
+            if server is not None:
+                await server.stop()
+
+            if archive is not None:
+                archive.close()
+                rmtree(archive_path, ignore_errors=True)
+
+        return {'pages': len(urls),
+                'failed_pages': msgs_counts.count(None),
+                'msgs': sum([count for count in msgs_counts if count]),
+                'requests': len(stages['fetch']),
+                'seconds': round(seconds, 6),
+                'stages': stages}
+
+    @staticmethod
+    def get_available_backends() -> [ScraperParserBackend]:
+        backends = []
+
+        for backend in ScraperParserBackend:
+            try:
+                ScraperParser.from_backend(backend)
+                backends.append(backend)
+            except ScraperError:
+                pass
+
+        return backends
+
+    @staticmethod
+    def _get_peak_rss() -> int or None:
+        try:
+            from resource import getrusage, RUSAGE_SELF
+        except ImportError:
+            return None
+
+        # Kilobytes on Linux, bytes on macOS
+        peak_rss = getrusage(RUSAGE_SELF).ru_maxrss
+
+        return peak_rss if platform().startswith('macOS') else peak_rss * 1024
+
+    @staticmethod
+    def _get_commit() -> str or None:
+        try:
+            return subprocess_run(['git', 'rev-parse', 'HEAD'],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        except Exception:
+            return None
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Benchmarks scraping on a recorded-like forum corpus")
+    parser.add_argument('--kind', action='append', choices=ScraperBench.KINDS)
+    parser.add_argument('--scenario', action='append', choices=ScraperBenchCorpus.SCENARIOS)
+    parser.add_argument('--parser', action='append', choices=[backend.value for backend in ScraperParserBackend])
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--latency', type=float, default=0.01, help="Server latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra server latency in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mode', choices=[mode.value for mode in ScraperParseMode], default='page')
+    parser.add_argument('--executor', choices=[executor.value for executor in ScraperParseExecutor], default='thread')
+    parser.add_argument('--rate-limit', action='store_true', help="Keep the adaptive rate limiter on")
+    parser.add_argument('--output', help="Write results to this file instead of stdout")
+    parser.add_argument('--compare', help="Results of an earlier run, exits with 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    result = ScraperBench.run(kinds=args.kind or list(ScraperBench.KINDS),
+                              scenarios=args.scenario or list(ScraperBenchCorpus.SCENARIOS),
+                              backends=[ScraperParserBackend(backend) for backend in args.parser]
+                              if args.parser else ScraperBench.get_available_backends(),
+                              scale=args.scale,
+                              latency=args.latency,
+                              jitter=args.jitter,
+                              error_rate=args.error_rate,
+                              concurrency=args.concurrency,
+                              parse_mode=ScraperParseMode(args.mode),
+                              parse_executor=ScraperParseExecutor(args.executor),
+                              is_rate_limited=args.rate_limit)
+
+    output = json_dumps(result, indent=2)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            regressions = ScraperBench.compare(baseline=json_load(file), current=result, threshold=args.threshold)
+
+        for regression in regressions:
+            LOGGER.error(f"Regression {regression['kind']} {regression['scenario']} {regression['backend']} "
+                         f"{regression['metric']} - {regression['baseline']} -> {regression['current']}")
+
+        if regressions:
+            exit(1)
+
+
+if __name__ == "__main__":
+    main()
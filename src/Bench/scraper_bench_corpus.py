@@ -0,0 +1,168 @@
+from random import Random
+from datetime import datetime, timedelta
+from html import escape
+from src.Scraper.Archive.scraper_archive import ScraperArchive
+from src.Scraper.Models.scraper_models import (ScraperMsgConfig,
+                                               ScraperUserConfig,
+                                               ScraperDateConfig,
+                                               ScraperResponse)
+
+BENCH_URL = 'http://bench.local'
+
+_WORDS = ('forum thread post reply quote user moderator topic page answer question market vendor order '
+          'shipping price review scam trust escrow wallet address server mirror onion link update '
+          'access account login password guide tutorial release version patch bug issue report').split()
+
+
+class ScraperBenchCorpus:
+    """Deterministic forum pages in XenForo-like markup, served by ScraperBenchServer or replayed after build().
+
+    Scenarios:
+        small - short paginated threads with few quotes
+        large - one long paginated thread
+        quote_heavy - post history pages linking to topics where most messages quote earlier ones
+    """
+
+    SCENARIOS = ('small', 'large', 'quote_heavy')
+
+    def __init__(self, *, scale: float = 1.0, seed: int = 1):
+        self._scale = scale
+        self._random = Random(seed)
+
+        self.pages: dict[str, str] = {}
+        self.crawl_urls: dict[str, list[str]] = {scenario: [] for scenario in self.SCENARIOS}
+        self.topic_urls: dict[str, list[str]] = {scenario: [] for scenario in self.SCENARIOS}
+
+        self._generate()
+
+    @staticmethod
+    def get_msg_config(*, scenario: str) -> ScraperMsgConfig:
+        return ScraperMsgConfig(msg_block_class_name='message',
+                                msg_text_class_name='bbWrapper',
+                                quote_block_name='blockquote',
+                                user_config=ScraperUserConfig(block_name='message-name', is_class=True),
+                                date_config=ScraperDateConfig(block_name='u-dt', is_class=True, attribute='datetime'),
+                                date_format='iso',
+                                topic_link_patterns=[r'/threads/'] if scenario == 'quote_heavy' else None,
+                                next_page_class_name='pageNav-jump--next')
+
+    async def build(self, *, archive: ScraperArchive) -> None:
+        """Stores the corpus as if it was crawled, for ScraperReplayTransport"""
+
+        for url, html in self.pages.items():
+            await archive.put(response=ScraperResponse(url=url,
+                                                       status_code=200,
+                                                       text=html,
+                                                       headers={'Content-Type': 'text/html; charset=utf-8'}),
+                              fetched_at=0.0)
+
+    def _generate(self) -> None:
+        for index in range(self._get_count(3)):
+            self._add_thread(scenario='small', path=f'/threads/small-{index}/', title=f'Small thread {index}',
+                             pages=self._get_count(3), msgs_per_page=10, quote_rate=0.2)
+
+        self._add_thread(scenario='large', path='/threads/large-0/', title='Large thread',
+                         pages=self._get_count(20), msgs_per_page=50, quote_rate=0.3)
+
+        topics = []
+
+        for index in range(self._get_count(5)):
+            url = f'{BENCH_URL}/threads/topic-{index}/'
+            msgs = self._make_msgs(count=self._get_count(150), quote_rate=0.8)
+
+            topics.append((f'/threads/topic-{index}/', f'Topic {index}', msgs))
+
+            self.pages[url] = self._render_page(title=f'Topic {index}', msgs=msgs, next_path=None)
+            self.topic_urls['quote_heavy'].append(url)
+
+        # Post history, every message repeats one posted in a topic and links to it
+        for index in range(self._get_count(3)):
+            pages = self._get_count(3)
+
+            for page in range(1, pages + 1):
+                url = f'{BENCH_URL}/members/user-{index}/posts?page={page}'
+                msgs = []
+
+                for _ in range(30):
+                    topic_path, topic_title, topic_msgs = topics[self._random.randrange(len(topics))]
+                    msgs.append({**topic_msgs[self._random.randrange(len(topic_msgs))],
+                                 'topic': (topic_path, topic_title)})
+
+                self.pages[url] = self._render_page(title=f'Posts of user-{index}',
+                                                    msgs=msgs,
+                                                    next_path=f'/members/user-{index}/posts?page={page + 1}'
+                                                    if page < pages else None)
+                self.crawl_urls['quote_heavy'].append(url)
+
+    def _get_count(self, count: int) -> int:
+        return max(1, round(count * self._scale))
+
+    def _add_thread(self, *,
+                    scenario: str,
+                    path: str,
+                    title: str,
+                    pages: int,
+                    msgs_per_page: int,
+                    quote_rate: float) -> None:
+
+        msgs = self._make_msgs(count=pages * msgs_per_page, quote_rate=quote_rate)
+
+        for page in range(1, pages + 1):
+            url = f'{BENCH_URL}{path}?page={page}'
+
+            self.pages[url] = self._render_page(title=title,
+                                                msgs=msgs[(page - 1) * msgs_per_page:page * msgs_per_page],
+                                                next_path=f'{path}?page={page + 1}' if page < pages else None)
+            self.crawl_urls[scenario].append(url)
+
+    def _make_msgs(self, *, count: int, quote_rate: float) -> [dict]:
+        rnd = self._random
+        msgs = []
+        started_at = datetime(2023, 1, 1)
+
+        for index in range(count):
+            text = ' '.join(rnd.choice(_WORDS) for _ in range(rnd.randint(8, 80)))
+            quote = None
+
+            if msgs and rnd.random() < quote_rate:
+                quoted = msgs[rnd.randrange(max(0, len(msgs) - 20), len(msgs))]
+                words = quoted['text'].split()
+                start = rnd.randrange(len(words))
+                quote = ' '.join(words[start:start + rnd.randint(3, 12)])
+
+            user = rnd.randrange(max(2, count // 5))
+
+            msgs.append({'user': (f'/members/user-{user}/', f'user-{user}'),
+                         'date': (started_at + timedelta(minutes=37 * index)).isoformat(),
+                         'text': text,
+                         'quote': quote,
+                         'topic': None})
+
+        return msgs
+
+    @staticmethod
+    def _render_page(*, title: str, msgs: [dict], next_path: str or None) -> str:
+        articles = []
+
+        for msg in msgs:
+            topic = (f'<div class="contentRow-title"><a href="{msg["topic"][0]}">{escape(msg["topic"][1])}</a></div>'
+                     if msg['topic'] else '')
+            quote = (f'<blockquote class="bbCodeBlock bbCodeBlock--quote">'
+                     f'<div class="bbCodeBlock-content">{escape(msg["quote"])}</div></blockquote>'
+                     if msg['quote'] else '')
+
+            articles.append(f'<article class="message message--post">{topic}'
+                            f'<div class="message-userDetails"><h4 class="message-name">'
+                            f'<a href="{msg["user"][0]}" class="username">{escape(msg["user"][1])}</a></h4></div>'
+                            f'<div class="message-attribution"><time class="u-dt" datetime="{msg["date"]}">'
+                            f'{msg["date"][:10]}</time></div>'
+                            f'<div class="message-content"><div class="bbWrapper">{quote}{escape(msg["text"])}</div>'
+                            f'</div></article>\n')
+
+        next_link = (f'<link rel="next" href="{next_path}">' if next_path else '')
+        navigation = (f'<div class="pageNav"><a class="pageNav-jump pageNav-jump--next" href="{next_path}">Next</a>'
+                      f'</div>' if next_path else '')
+
+        return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{escape(title)}</title>{next_link}</head>'
+                f'<body><div class="p-body"><div class="block-body">\n{"".join(articles)}</div>{navigation}</div>'
+                f'</body></html>')
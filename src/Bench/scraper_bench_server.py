@@ -0,0 +1,81 @@
+from asyncio import sleep as aio_sleep
+from random import Random
+from aiohttp import web
+from src.Bench.scraper_bench_corpus import BENCH_URL
+
+
+class ScraperBenchServer:
+    """Local stand-in for a forum, serves corpus pages from memory with injected latency and errors"""
+
+    def __init__(self, *,
+                 pages: dict[str, str],
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 error_statuses: tuple[int, ...] = (503,),
+                 seed: int = 1):
+
+        self._pages = pages
+        self._host = host
+        self._port = port
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._error_statuses = error_statuses
+        self._random = Random(seed)
+        self._runner = None
+
+        self.base_url = None
+        self.requests_count = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self._handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.base_url = f'http://{self._host}:{port}'
+
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def get_url(self, url: str) -> str:
+        """Corpus url as served by this server"""
+
+        return url.replace(BENCH_URL, self.base_url, 1)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests_count += 1
+
+        delay = self._latency + self._random.uniform(0, self._jitter) if self._jitter else self._latency
+
+        if delay:
+            await aio_sleep(delay)
+
+        if self._error_rate and self._random.random() < self._error_rate:
+            return web.Response(status=self._random.choice(self._error_statuses))
+
+        html = self._pages.get(f'{BENCH_URL}{request.path_qs}')
+
+        if html is None:
+            return web.Response(status=404)
+
+        return web.Response(text=html, content_type='text/html', charset='utf-8')
@@ -0,0 +1,181 @@
+from asyncio import (start_server as aio_start_server,
+                     open_connection as aio_open_connection,
+                     gather as aio_gather,
+                     sleep as aio_sleep,
+                     StreamReader,
+                     StreamWriter,
+                     IncompleteReadError)
+from random import Random
+from socket import inet_ntop, AF_INET, AF_INET6
+
+
+class ScraperBenchSocksProxy:
+    """Local stand-in for a Tor SOCKS port, a SOCKS5 CONNECT proxy with simulated circuits.
+
+    Like Tor with IsolateSOCKSAuth, every new username/password pair is a new circuit. A circuit gets its
+    own latency, added to each request, and is banned with ban_rate - a banned exit answers every request
+    with 403 itself. A stopped proxy starts again on the same port, to stand in for a restarted Tor client.
+    """
+
+    def __init__(self, *,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency: float = 0.0,
+                 slow_rate: float = 0.0,
+                 slow_latency: float = 1.0,
+                 ban_rate: float = 0.0,
+                 seed: int = 1):
+
+        self._host = host
+        self._port = port
+        self._latency = latency
+        self._slow_rate = slow_rate
+        self._slow_latency = slow_latency
+        self._ban_rate = ban_rate
+        self._random = Random(seed)
+        self._server = None
+        self._circuits = {}
+        self._writers = set()
+
+        self.proxy_url = None
+        self.connections_count = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self) -> str:
+        self._server = await aio_start_server(self._handle, self._host, self._port)
+
+        self._port = self._server.sockets[0].getsockname()[1]
+        self.proxy_url = f'socks5://{self._host}:{self._port}'
+
+        return self.proxy_url
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+
+            # Open tunnels would keep wait_closed() waiting
+            for writer in self._writers:
+                writer.close()
+
+            await self._server.wait_closed()
+            self._server = None
+
+    def get_circuits_count(self) -> int:
+        return len(self._circuits)
+
+    async def _handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        self._writers.add(writer)
+
+        try:
+            self.connections_count += 1
+
+            credentials = await self._negotiate(reader, writer)
+
+            if credentials is None:
+                return
+
+            host, port = await self._read_request(reader)
+            latency, is_banned = self._get_circuit(credentials)
+
+            if is_banned:
+                writer.write(b'\x05\x00\x00\x01\x00\x00\x00\x00\x00\x00')
+                await reader.readuntil(b'\r\n\r\n')
+                writer.write(b'HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                await writer.drain()
+                return
+
+            try:
+                remote_reader, remote_writer = await aio_open_connection(host, port)
+            except OSError:
+                # Host unreachable
+                writer.write(b'\x05\x04\x00\x01\x00\x00\x00\x00\x00\x00')
+                await writer.drain()
+                return
+
+            writer.write(b'\x05\x00\x00\x01\x00\x00\x00\x00\x00\x00')
+            await writer.drain()
+
+            self._writers.add(remote_writer)
+
+            try:
+                await aio_gather(self._pipe(reader, remote_writer, latency=latency), self._pipe(remote_reader, writer))
+            finally:
+                self._writers.discard(remote_writer)
+                remote_writer.close()
+
+        except (IncompleteReadError, ConnectionError, OSError):
+            pass
+
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _negotiate(self, reader: StreamReader, writer: StreamWriter) -> tuple or None:
+        _, methods_count = await reader.readexactly(2)
+        methods = await reader.readexactly(methods_count)
+
+        if 2 in methods:
+            writer.write(b'\x05\x02')
+            await writer.drain()
+
+            _, user_length = await reader.readexactly(2)
+            user = await reader.readexactly(user_length)
+            password = await reader.readexactly((await reader.readexactly(1))[0])
+
+            writer.write(b'\x01\x00')
+            await writer.drain()
+
+            return user, password
+
+        if 0 in methods:
+            writer.write(b'\x05\x00')
+            await writer.drain()
+
+            return b'', b''
+
+        writer.write(b'\x05\xff')
+        await writer.drain()
+
+        return None
+
+    @staticmethod
+    async def _read_request(reader: StreamReader) -> (str, int):
+        _, _, _, address_type = await reader.readexactly(4)
+
+        if address_type == 1:
+            host = inet_ntop(AF_INET, await reader.readexactly(4))
+        elif address_type == 4:
+            host = inet_ntop(AF_INET6, await reader.readexactly(16))
+        else:
+            host = (await reader.readexactly((await reader.readexactly(1))[0])).decode()
+
+        return host, int.from_bytes(await reader.readexactly(2), 'big')
+
+    def _get_circuit(self, credentials: tuple) -> (float, bool):
+        circuit = self._circuits.get(credentials)
+
+        if circuit is None:
+            latency = self._latency + (self._slow_latency if self._random.random() < self._slow_rate else 0.0)
+            circuit = self._circuits[credentials] = (latency, self._random.random() < self._ban_rate)
+
+        return circuit
+
+    @staticmethod
+    async def _pipe(reader: StreamReader, writer: StreamWriter, latency: float = 0.0) -> None:
+        try:
+            while data := await reader.read(65536):
+                # Every request on a kept-alive tunnel pays the latency of the circuit
+                if latency:
+                    await aio_sleep(latency)
+
+                writer.write(data)
+                await writer.drain()
+        finally:
+            if not writer.is_closing() and writer.can_write_eof():
+                writer.write_eof()
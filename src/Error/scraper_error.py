@@ -4,3 +4,15 @@ class ScraperError(Exception):
 
 class ScraperNotFoundError(Exception):
     pass
+
+
+class ScraperConnectionError(Exception):
+    pass
+
+
+class ScraperNotModifiedError(Exception):
+    pass
+
+
+class ScraperCircuitOpenError(Exception):
+    pass
@@ -0,0 +1,116 @@
+from asyncio import to_thread as aio_to_thread
+from hashlib import sha256
+from json import dumps as json_dumps, loads as json_loads
+from os import makedirs, fdopen, remove, replace as os_replace
+from os.path import join as path_join, exists as path_exists, dirname
+from sqlite3 import connect as sqlite_connect
+from tempfile import mkstemp
+from threading import Lock
+from time import time
+from zlib import compress as zlib_compress, decompress as zlib_decompress
+from src.Scraper.Models.scraper_models import ScraperResponse
+
+
+class ScraperArchive:
+    """Fetched pages on disk, every fetch is indexed by url and time, bodies are stored once per content hash"""
+
+    def __init__(self, *,
+                 path: str,
+                 compress_level: int = 6):
+
+        self._path = path
+        self._objects_path = path_join(path, 'objects')
+        self._compress_level = compress_level
+
+        makedirs(self._objects_path, exist_ok=True)
+
+        self._connection = sqlite_connect(path_join(path, 'index.db'), check_same_thread=False)
+        self._lock = Lock()
+
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS fetches '
+                                     '(url TEXT, fetched_at REAL, status_code INTEGER, headers TEXT, content_hash TEXT)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS fetches_url ON fetches (url, fetched_at)')
+
+    async def put(self, *, response: ScraperResponse, fetched_at: float or None = None) -> str:
+        return await aio_to_thread(self._insert, response, fetched_at if fetched_at is not None else time())
+
+    async def get(self, *, url: str, fetched_before: float or None = None) -> ScraperResponse or None:
+        """Latest fetch of url, or the latest one made before fetched_before"""
+
+        return await aio_to_thread(self._select, url, fetched_before)
+
+    async def get_urls(self) -> [str]:
+        return await aio_to_thread(self._select_urls)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _get_object_path(self, content_hash: str) -> str:
+        return path_join(self._objects_path, content_hash[:2], content_hash)
+
+    def _insert(self, response: ScraperResponse, fetched_at: float) -> str:
+        body = (response.text or '').encode()
+        content_hash = sha256(body).hexdigest()
+        object_path = self._get_object_path(content_hash)
+
+        # Unchanged pages fetched again only add an index row
+        if not path_exists(object_path):
+            self._write_object(object_path, body)
+
+        with self._lock, self._connection:
+            self._connection.execute('INSERT INTO fetches (url, fetched_at, status_code, headers, content_hash) '
+                                     'VALUES (?, ?, ?, ?, ?)',
+                                     (response.url, fetched_at, response.status_code,
+                                      json_dumps(response.headers), content_hash))
+
+        return content_hash
+
+    def _write_object(self, object_path: str, body: bytes) -> None:
+        makedirs(dirname(object_path), exist_ok=True)
+
+        # Fetches of the same body may be written at once, each writer gets its own temporary file
+        file_descriptor, tmp_path = mkstemp(dir=dirname(object_path), suffix='.tmp')
+
+        try:
+            with fdopen(file_descriptor, 'wb') as file:
+                file.write(zlib_compress(body, self._compress_level))
+
+            os_replace(tmp_path, object_path)
+
+        except OSError:
+            # Another writer already stored the same body
+            if not path_exists(object_path):
+                raise
+
+        finally:
+            if path_exists(tmp_path):
+                remove(tmp_path)
+
+    def _select(self, url: str, fetched_before: float or None) -> ScraperResponse or None:
+        with self._lock:
+            row = self._connection.execute('SELECT status_code, headers, content_hash FROM fetches '
+                                           'WHERE url = ? AND fetched_at <= ? ORDER BY fetched_at DESC LIMIT 1',
+                                           (url, fetched_before if fetched_before is not None else float('inf'))
+                                           ).fetchone()
+
+        if not row:
+            return None
+
+        status_code, headers, content_hash = row
+
+        with open(self._get_object_path(content_hash), 'rb') as file:
+            text = zlib_decompress(file.read()).decode()
+
+        return ScraperResponse(url=url,
+                               status_code=status_code,
+                               text=text,
+                               headers=json_loads(headers))
+
+    def _select_urls(self) -> [str]:
+        with self._lock:
+            rows = self._connection.execute('SELECT DISTINCT url FROM fetches ORDER BY url').fetchall()
+
+        return [row[0] for row in rows]
@@ -0,0 +1,89 @@
+from asyncio import (shield as aio_shield,
+                     get_running_loop as aio_get_running_loop,
+                     CancelledError)
+from collections import OrderedDict
+from logging import getLogger
+from time import monotonic
+
+LOGGER = getLogger()
+
+
+class ScraperCache:
+    def __init__(self, *,
+                 max_size: int = 256,
+                 ttl: float or None = None):
+
+        self._max_size = max_size
+        self._ttl = ttl
+        self._items = OrderedDict()
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str):
+        item = self._items.get(key)
+
+        if item is None:
+            return None
+
+        value, expires_at = item
+
+        if expires_at is not None and expires_at <= monotonic():
+            del self._items[key]
+            return None
+
+        self._items.move_to_end(key)
+
+        return value
+
+    def put(self, key: str, value) -> None:
+        expires_at = monotonic() + self._ttl if self._ttl is not None else None
+
+        self._items[key] = (value, expires_at)
+        self._items.move_to_end(key)
+
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    async def get_or_load(self, *, key: str, loader):
+        value = self.get(key)
+
+        if value is not None:
+            return value
+
+        future = self._pending.get(key)
+
+        if future is not None:
+            try:
+                return await aio_shield(future)
+            except CancelledError:
+                if future.cancelled():
+                    return None
+                raise
+
+        future = aio_get_running_loop().create_future()
+        self._pending[key] = future
+
+        try:
+            value = await loader()
+
+            if value is not None:
+                self.put(key, value)
+
+            future.set_result(value)
+
+            return value
+
+        except Exception as err:
+            LOGGER.error(err)
+            future.set_result(None)
+
+        finally:
+            del self._pending[key]
+
+            if not future.done():
+                future.cancel()
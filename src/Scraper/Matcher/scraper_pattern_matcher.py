@@ -0,0 +1,76 @@
+from collections import deque
+
+
+class ScraperPatternMatcher:
+    """Aho-Corasick automaton, finds which of many literal patterns occur in a text in one pass over it"""
+
+    def __init__(self, patterns: [str]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._out_link = [0]
+        self._empty_ids = []
+
+        for pattern_id, pattern in enumerate(patterns):
+            if not pattern:
+                self._empty_ids.append(pattern_id)
+                continue
+
+            state = 0
+
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._out_link.append(0)
+
+                state = next_state
+
+            self._out[state].append(pattern_id)
+
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail_state = self._fail[state]
+
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+
+                self._fail[next_state] = self._goto[fail_state].get(char, 0)
+
+                fail_state = self._fail[next_state]
+                self._out_link[next_state] = fail_state if self._out[fail_state] else self._out_link[fail_state]
+
+    def search(self, text: str) -> set[int]:
+        result = set(self._empty_ids)
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        out_link = self._out_link
+
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(char, 0)
+
+            match_state = state if out[state] else out_link[state]
+
+            while match_state:
+                result.update(out[match_state])
+                match_state = out_link[match_state]
+
+        return result
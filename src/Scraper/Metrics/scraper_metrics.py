@@ -0,0 +1,161 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from time import perf_counter, time
+from urllib.parse import urlparse
+
+_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _ScraperNullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _ScraperTimer:
+    __slots__ = ('_metrics', '_stage', '_started_at')
+
+    def __init__(self, metrics: 'ScraperMetrics', stage: str):
+        self._metrics = metrics
+        self._stage = stage
+        self._started_at = None
+
+    def __enter__(self):
+        self._started_at = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics.observe(self._stage, perf_counter() - self._started_at)
+        return False
+
+
+_NULL_TIMER = _ScraperNullTimer()
+
+
+class _ScraperHistogram:
+    __slots__ = ('count', 'sum', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.buckets = [0] * (len(_BUCKETS) + 1)
+
+
+class ScraperMetrics:
+    """Stage timings, counters and gauges of the pipeline.
+
+    Hooks go through the static time/count/set_gauge, which do nothing until an instance is activated,
+    so disabled metrics cost one attribute lookup per hook. Counters are labelled by host for export,
+    per-URL counts of the last max_urls URLs are kept for the JSON dump only.
+    """
+
+    _ACTIVE: 'ScraperMetrics' or None = None
+
+    def __init__(self, *, max_urls: int = 10_000):
+        self._max_urls = max_urls
+        self._started_at = time()
+
+        self._histograms: dict[str, _ScraperHistogram] = {}
+        self._counters: dict[tuple[str, str], float] = {}
+        self._gauges: dict[tuple[str, str], float] = {}
+        self._url_counters: OrderedDict[str, dict[str, int]] = OrderedDict()
+
+    @staticmethod
+    def set_active(metrics: 'ScraperMetrics' or None) -> None:
+        ScraperMetrics._ACTIVE = metrics
+
+    @staticmethod
+    def get_active() -> 'ScraperMetrics' or None:
+        return ScraperMetrics._ACTIVE
+
+    @staticmethod
+    def time(stage: str):
+        metrics = ScraperMetrics._ACTIVE
+
+        return _NULL_TIMER if metrics is None else _ScraperTimer(metrics, stage)
+
+    @staticmethod
+    def count(name: str, url: str or None = None, value: int = 1) -> None:
+        metrics = ScraperMetrics._ACTIVE
+
+        if metrics is not None:
+            metrics.inc(name, url=url, value=value)
+
+    @staticmethod
+    def set_gauge(name: str, value: float, host: str = '') -> None:
+        metrics = ScraperMetrics._ACTIVE
+
+        if metrics is not None:
+            metrics._gauges[(name, host)] = value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        histogram = self._histograms.get(stage)
+
+        if histogram is None:
+            histogram = self._histograms[stage] = _ScraperHistogram()
+
+        histogram.count += 1
+        histogram.sum += seconds
+        histogram.buckets[bisect_left(_BUCKETS, seconds)] += 1
+
+    def inc(self, name: str, *, url: str or None = None, value: int = 1) -> None:
+        key = (name, urlparse(url).netloc if url else '')
+        self._counters[key] = self._counters.get(key, 0) + value
+
+        if url:
+            url_counters = self._url_counters.get(url)
+
+            if url_counters is None:
+                if len(self._url_counters) >= self._max_urls:
+                    self._url_counters.popitem(last=False)
+
+                url_counters = self._url_counters[url] = {}
+            else:
+                self._url_counters.move_to_end(url)
+
+            url_counters[name] = url_counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        return {
+            'started_at': self._started_at,
+            'updated_at': time(),
+            'stages': {stage: {'count': histogram.count,
+                               'sum': histogram.sum,
+                               'mean': histogram.sum / histogram.count if histogram.count else None,
+                               'buckets': dict(zip([*map(str, _BUCKETS), '+Inf'], histogram.buckets))}
+                       for stage, histogram in self._histograms.items()},
+            'counters': [{'name': name, 'host': host, 'value': value}
+                         for (name, host), value in self._counters.items()],
+            'gauges': [{'name': name, 'host': host, 'value': value}
+                       for (name, host), value in self._gauges.items()],
+            'urls': {url: dict(url_counters) for url, url_counters in self._url_counters.items()}
+        }
+
+    def to_prometheus(self) -> str:
+        lines = []
+
+        if self._histograms:
+            lines += ['# HELP scraper_stage_seconds Time spent in a pipeline stage',
+                      '# TYPE scraper_stage_seconds histogram']
+
+        for stage, histogram in self._histograms.items():
+            cumulative = 0
+
+            for bound, bucket in zip([*map(str, _BUCKETS), '+Inf'], histogram.buckets):
+                cumulative += bucket
+                lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+
+            lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+        for metric_type, values in (('counter', self._counters), ('gauge', self._gauges)):
+            for name in sorted({name for name, _ in values}):
+                lines.append(f'# TYPE {name} {metric_type}')
+                lines += [f'{name}{{host="{host}"}} {value}' if host else f'{name} {value}'
+                          for (value_name, host), value in values.items() if value_name == name]
+
+        return '\n'.join(lines) + '\n'
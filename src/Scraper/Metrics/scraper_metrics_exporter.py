@@ -0,0 +1,88 @@
+from asyncio import (create_task as aio_create_task,
+                     sleep as aio_sleep,
+                     gather as aio_gather,
+                     to_thread as aio_to_thread)
+from json import dumps as json_dumps
+from logging import getLogger
+from os import replace as os_replace
+from aiohttp import web
+from src.Scraper.Metrics.scraper_metrics import ScraperMetrics
+
+LOGGER = getLogger()
+
+
+class ScraperMetricsExporter:
+    """Serves /metrics in Prometheus text format and /metrics.json, optionally dumps the JSON to a file"""
+
+    def __init__(self, *,
+                 metrics: ScraperMetrics,
+                 host: str = '127.0.0.1',
+                 port: int or None = 9464,
+                 dump_path: str or None = None,
+                 dump_interval: float = 60):
+
+        self._metrics = metrics
+        self._host = host
+        self._port = port
+        self._dump_path = dump_path
+        self._dump_interval = dump_interval
+
+        self._runner = None
+        self._dump_task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self) -> None:
+        if self._port is not None:
+            app = web.Application()
+            app.router.add_get('/metrics', self._handle_prometheus)
+            app.router.add_get('/metrics.json', self._handle_json)
+
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self._host, self._port).start()
+
+        if self._dump_path is not None:
+            self._dump_task = aio_create_task(self._dump_periodically())
+
+    async def stop(self) -> None:
+        if self._dump_task is not None:
+            self._dump_task.cancel()
+            await aio_gather(self._dump_task, return_exceptions=True)
+            self._dump_task = None
+
+            # Final numbers of the crawl
+            await self.dump()
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def dump(self) -> None:
+        try:
+            await aio_to_thread(self._write_dump, json_dumps(self._metrics.to_dict()))
+        except Exception as err:
+            LOGGER.error(err)
+
+    async def _dump_periodically(self) -> None:
+        while 1:
+            await aio_sleep(self._dump_interval)
+            await self.dump()
+
+    def _write_dump(self, content: str) -> None:
+        with open(f'{self._dump_path}.tmp', 'w', encoding='utf-8') as file:
+            file.write(content)
+
+        os_replace(f'{self._dump_path}.tmp', self._dump_path)
+
+    async def _handle_prometheus(self, request: web.Request) -> web.Response:
+        return web.Response(text=self._metrics.to_prometheus(),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    async def _handle_json(self, request: web.Request) -> web.Response:
+        return web.json_response(self._metrics.to_dict())
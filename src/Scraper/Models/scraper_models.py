@@ -1,5 +1,33 @@
 from pydantic import BaseModel
 from typing import Optional
+from enum import Enum
+from datetime import datetime
+
+
+class ScraperResponse(BaseModel):
+    url: str
+    status_code: int
+    text: str
+    headers: dict[str, str]
+
+
+class ScraperParseMode(str, Enum):
+    PAGE = 'page'
+    PER_MSG = 'per_msg'
+    # Page mode holding one message subtree at a time, needs lxml
+    STREAM = 'stream'
+
+
+class ScraperParseExecutor(str, Enum):
+    THREAD = 'thread'
+    PROCESS = 'process'
+    INLINE = 'inline'
+
+
+class ScraperParserBackend(str, Enum):
+    HTML_PARSER = 'html.parser'
+    LXML = 'lxml'
+    SELECTOLAX = 'selectolax'
 
 
 class ScraperUserConfig(BaseModel):
@@ -7,9 +35,30 @@ class ScraperUserConfig(BaseModel):
     is_class: bool
 
 
+class ScraperDateConfig(BaseModel):
+    block_name: str
+    is_class: bool
+    attribute: Optional[str] = None
+
+
+class ScraperProfileFieldConfig(BaseModel):
+    block_name: str
+    is_class: bool
+    attribute: Optional[str] = None
+    # The value is the first group, the whole text without a pattern
+    pattern: Optional[str] = None
+
+
+class ScraperProfileConfig(BaseModel):
+    # Field name to its place on the profile page, e.g. joined and posts
+    fields: dict[str, ScraperProfileFieldConfig]
+
+
 class ScraperUserResult(BaseModel):
     url: str
     name: str
+    # Filled by ScraperProfileEnricher
+    profile: Optional[dict[str, Optional[str]]] = None
 
 
 class ScraperTopicResult(BaseModel):
@@ -22,8 +71,13 @@ class ScraperMsgConfig(BaseModel):
     msg_text_class_name: str
     quote_block_name: str
     user_config: ScraperUserConfig
-    date_pattern: str
+    date_pattern: Optional[str] = None
     topic_link_patterns: Optional[list[str]]
+    date_config: Optional[ScraperDateConfig] = None
+    date_format: Optional[str] = None
+    next_page_class_name: Optional[str] = None
+    parser: ScraperParserBackend = ScraperParserBackend.HTML_PARSER
+    profile_config: Optional[ScraperProfileConfig] = None
 
 
 class ScraperUserMsgResult(BaseModel):
@@ -33,7 +87,43 @@ class ScraperUserMsgResult(BaseModel):
 
 class ScraperMsgResult(BaseModel):
     date: Optional[str]
+    parsed_date: Optional[datetime] = None
     answer: Optional[ScraperUserMsgResult]
     questions: Optional[list[ScraperUserMsgResult]]
 
     topic: Optional[ScraperTopicResult]
+
+
+class ScraperSiteProfile(BaseModel):
+    name: str
+    hosts: list[str] = []
+    msg_config: ScraperMsgConfig
+
+
+class ScraperCrawlJob(BaseModel):
+    url: str
+    # Without msg_config the scheduler takes the site profile by name, or by the host of url
+    msg_config: Optional[ScraperMsgConfig] = None
+    site: Optional[str] = None
+    is_stop_404: bool = False
+    priority: int = 0
+    range_id: Optional[int] = None
+
+
+class ScraperQueueLease(BaseModel):
+    id: int
+    job: ScraperCrawlJob
+    owner: str
+    # Counts this lease
+    attempts: int
+
+
+class ScraperPageState(BaseModel):
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    last_msg_key: Optional[str] = None
+    last_msg_date: Optional[datetime] = None
+    # Followed by the thread crawler when the page is not modified
+    next_url: Optional[str] = None
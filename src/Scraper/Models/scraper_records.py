@@ -0,0 +1,145 @@
+from datetime import datetime
+from src.Scraper.Models.scraper_models import (ScraperMsgResult,
+                                               ScraperUserMsgResult,
+                                               ScraperUserResult,
+                                               ScraperTopicResult)
+
+
+class ScraperUserRecord:
+    __slots__ = ('url', 'name')
+
+    def __init__(self, *, url: str, name: str):
+        self.url = url
+        self.name = name
+
+    def to_result(self, *, profile: dict or None = None) -> ScraperUserResult:
+        return ScraperUserResult(url=self.url, name=self.name, profile=profile)
+
+    def to_dict(self, *, profile: dict or None = None) -> dict:
+        return {'url': self.url, 'name': self.name, 'profile': profile}
+
+
+class ScraperTopicRecord:
+    __slots__ = ('url', 'name')
+
+    def __init__(self, *, url: str, name: str):
+        self.url = url
+        self.name = name
+
+    def to_result(self) -> ScraperTopicResult:
+        return ScraperTopicResult(url=self.url, name=self.name)
+
+    def to_dict(self) -> dict:
+        return {'url': self.url, 'name': self.name}
+
+
+class ScraperUserMsgRecord:
+    # The profile of the user is kept per message, users are interned and shared across crawls
+    __slots__ = ('user', 'text', 'profile')
+
+    def __init__(self, *, user: ScraperUserRecord or None, text: str or None, profile: dict or None = None):
+        self.user = user
+        self.text = text
+        self.profile = profile
+
+    def to_result(self) -> ScraperUserMsgResult:
+        user = self.user.to_result(profile=self.profile) if self.user else None
+
+        return ScraperUserMsgResult(user=user, text=self.text)
+
+    def to_dict(self) -> dict:
+        return {'user': self.user.to_dict(profile=self.profile) if self.user else None, 'text': self.text}
+
+
+class ScraperMsgRecord:
+    """Internal message, built without validation, converted to ScraperMsgResult and validated only when handed out"""
+
+    __slots__ = ('date', 'parsed_date', 'answer', 'questions', 'topic')
+
+    def __init__(self, *,
+                 date: str or None,
+                 parsed_date: datetime or None,
+                 answer: ScraperUserMsgRecord or None,
+                 questions: [ScraperUserMsgRecord] or None,
+                 topic: ScraperTopicRecord or None):
+
+        self.date = date
+        self.parsed_date = parsed_date
+        self.answer = answer
+        self.questions = questions
+        self.topic = topic
+
+    def to_result(self) -> ScraperMsgResult:
+        # Raises ValidationError, a missing title or user name is only caught here
+        return ScraperMsgResult(
+            date=self.date,
+            parsed_date=self.parsed_date,
+            answer=self.answer.to_result() if self.answer else None,
+            questions=[question.to_result() for question in self.questions] if self.questions else None,
+            topic=self.topic.to_result() if self.topic else None)
+
+    def to_dict(self) -> dict:
+        return {
+            'date': self.date,
+            'parsed_date': self.parsed_date.isoformat() if self.parsed_date else None,
+            'answer': self.answer.to_dict() if self.answer else None,
+            'questions': [question.to_dict() for question in self.questions] if self.questions else None,
+            'topic': self.topic.to_dict() if self.topic else None
+        }
+
+    @staticmethod
+    def from_result(result: ScraperMsgResult) -> 'ScraperMsgRecord':
+        def to_user_msg(user_msg: ScraperUserMsgResult) -> ScraperUserMsgRecord:
+            return ScraperUserMsgRecord(user=ScraperUserRecord(url=user_msg.user.url,
+                                                               name=user_msg.user.name) if user_msg.user else None,
+                                        text=user_msg.text,
+                                        profile=user_msg.user.profile if user_msg.user else None)
+
+        return ScraperMsgRecord(date=result.date,
+                                parsed_date=result.parsed_date,
+                                answer=to_user_msg(result.answer) if result.answer else None,
+                                questions=[to_user_msg(question) for question in result.questions]
+                                if result.questions else None,
+                                topic=ScraperTopicRecord(url=result.topic.url,
+                                                         name=result.topic.name) if result.topic else None)
+
+
+class ScraperRecordPool:
+    """Interns users and topics, the same few of them repeat across every message of a crawl"""
+
+    def __init__(self, *, max_size: int = 100_000):
+        self._max_size = max_size
+        self._users = {}
+        self._topics = {}
+
+    def get_user(self, user: (str, str) or None) -> ScraperUserRecord or None:
+        if not user:
+            return None
+
+        record = self._users.get(user)
+
+        if record is None:
+            if len(self._users) >= self._max_size:
+                self._users.clear()
+
+            record = self._users[user] = ScraperUserRecord(url=user[0], name=user[1])
+
+        return record
+
+    def get_topic(self, topic: (str, str) or None) -> ScraperTopicRecord or None:
+        if not topic:
+            return None
+
+        record = self._topics.get(topic)
+
+        if record is None:
+            if len(self._topics) >= self._max_size:
+                self._topics.clear()
+
+            record = self._topics[topic] = ScraperTopicRecord(url=topic[0], name=topic[1])
+
+        return record
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._topics.clear()
@@ -0,0 +1,40 @@
+from asyncio import (to_thread as aio_to_thread,
+                     get_running_loop as aio_get_running_loop)
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from src.Scraper.Models.scraper_models import ScraperParseExecutor
+
+
+class ScraperExecutorOperations:
+
+    _PROCESS_POOL: ProcessPoolExecutor or None = None
+
+    @staticmethod
+    def set_process_pool(*, max_workers: int or None = None) -> None:
+        ScraperExecutorOperations.shutdown_process_pool()
+        # Spawned, the pool starts after aiohttp and to_thread workers and a forked child may inherit their held
+        # locks. Spawned workers import the main module, scripts need the __main__ guard
+        ScraperExecutorOperations._PROCESS_POOL = ProcessPoolExecutor(max_workers=max_workers,
+                                                                      mp_context=get_context('spawn'))
+
+    @staticmethod
+    def shutdown_process_pool() -> None:
+        if ScraperExecutorOperations._PROCESS_POOL is not None:
+            ScraperExecutorOperations._PROCESS_POOL.shutdown(cancel_futures=True)
+            ScraperExecutorOperations._PROCESS_POOL = None
+
+    @staticmethod
+    async def run_in_executor(func, /, *, executor: ScraperParseExecutor, **kwargs):
+        if executor == ScraperParseExecutor.INLINE:
+            return func(**kwargs)
+
+        if executor == ScraperParseExecutor.PROCESS:
+            if ScraperExecutorOperations._PROCESS_POOL is None:
+                ScraperExecutorOperations.set_process_pool()
+
+            # Arguments and results cross the process boundary pickled, so func must be importable plain data in/out
+            return await aio_get_running_loop().run_in_executor(ScraperExecutorOperations._PROCESS_POOL,
+                                                                partial(func, **kwargs))
+
+        return await aio_to_thread(func, **kwargs)
@@ -1,26 +1,105 @@
 from fake_useragent import UserAgent
-from requests_tor import RequestsTor
-from asyncio import to_thread as aio_to_thread
-from src.Error.scraper_error import ScraperError
-from bs4 import BeautifulSoup
+from asyncio import (to_thread as aio_to_thread,
+                     sleep as aio_sleep)
+from urllib.parse import urlparse, urljoin
+from time import monotonic
+from src.Error.scraper_error import ScraperError, ScraperConnectionError, ScraperCircuitOpenError
+from src.Scraper.Transport.scraper_transport import ScraperTransport
+from src.Scraper.Transport.scraper_aiohttp_transport import ScraperAiohttpTransport
+from src.Scraper.Transport.scraper_retry_policy import ScraperRetryPolicy
+from src.Scraper.Transport.scraper_circuit_breaker import ScraperCircuitBreaker
+from src.Scraper.Transport.scraper_rate_limiter import ScraperRateLimiter
+from src.Scraper.Models.scraper_models import ScraperResponse
+from src.Scraper.Metrics.scraper_metrics import ScraperMetrics
+from src.Scraper.Parser.scraper_parser import ScraperNode
 from logging import getLogger
-from requests.exceptions import ConnectionError
 
 LOGGER = getLogger()
 
 
 class ScraperHtmlOperations:
 
-    _RT = RequestsTor(autochange_id=1)
+    _TRANSPORT: ScraperTransport or None = None
+    _RETRY_POLICY = ScraperRetryPolicy()
+    _CIRCUIT_BREAKER = ScraperCircuitBreaker()
+    _RATE_LIMITER: ScraperRateLimiter or None = ScraperRateLimiter()
+    _USER_AGENT: UserAgent or None = None
 
     @staticmethod
-    async def get_title_from_html(*, base_obj: BeautifulSoup) -> str or None:
+    def set_transport(transport: ScraperTransport) -> None:
+        ScraperHtmlOperations._TRANSPORT = transport
+
+    @staticmethod
+    def set_retry_policy(retry_policy: ScraperRetryPolicy) -> None:
+        ScraperHtmlOperations._RETRY_POLICY = retry_policy
+
+    @staticmethod
+    def set_circuit_breaker(circuit_breaker: ScraperCircuitBreaker) -> None:
+        ScraperHtmlOperations._CIRCUIT_BREAKER = circuit_breaker
+
+    @staticmethod
+    def get_circuit_breaker() -> ScraperCircuitBreaker or None:
+        # Only remote transports go through the breaker
+        return ScraperHtmlOperations._CIRCUIT_BREAKER if ScraperHtmlOperations.get_transport().IS_REMOTE else None
+
+    @staticmethod
+    def set_rate_limiter(rate_limiter: ScraperRateLimiter or None) -> None:
+        ScraperHtmlOperations._RATE_LIMITER = rate_limiter
+
+    @staticmethod
+    def get_rate_limiter() -> ScraperRateLimiter or None:
+        return ScraperHtmlOperations._RATE_LIMITER
+
+    @staticmethod
+    def get_transport() -> ScraperTransport:
+        if ScraperHtmlOperations._TRANSPORT is None:
+            ScraperHtmlOperations._TRANSPORT = ScraperAiohttpTransport()
+
+        return ScraperHtmlOperations._TRANSPORT
+
+    @staticmethod
+    async def get_title_from_html(*, base_obj: ScraperNode) -> str or None:
+        return await aio_to_thread(ScraperHtmlOperations.parse_title_from_html, base_obj=base_obj)
+
+    @staticmethod
+    def parse_title_from_html(*, base_obj: ScraperNode) -> str or None:
+        result = None
+
+        try:
+            title_obj = base_obj.find_by_tag('title')
+
+            result = title_obj.get_text()
+
+        except Exception as err:
+            LOGGER.error(err)
+
+        finally:
+            return result
+
+    @staticmethod
+    def parse_next_page_url_from_html(*,
+                                      base_obj: ScraperNode,
+                                      base_url: str,
+                                      next_page_class_name: str or None) -> str or None:
         result = None
 
         try:
-            title_obj = await aio_to_thread(base_obj.find, 'title')
+            link_obj = None
+
+            if next_page_class_name:
+                next_obj = base_obj.find_by_class(next_page_class_name)
+
+                if next_obj is not None:
+                    link_obj = next_obj if next_obj.get_attr('href') else next_obj.find_link()
+
+            if link_obj is None:
+                # <link rel="next"> in the head or <a rel="next"> in the page navigation
+                link_obj = base_obj.find_by_attr('rel', 'next')
 
-            result = title_obj.text
+            link = link_obj.get_attr('href') if link_obj is not None else None
+
+            if link:
+                result = urljoin(base_url, link)
 
         except Exception as err:
             LOGGER.error(err)
@@ -30,31 +109,105 @@ class ScraperHtmlOperations:
 
     @staticmethod
     async def get_html_from_url(*, url: str, is_stop_404: bool) -> (str or None, bool or None):
+        response, isStop = await ScraperHtmlOperations.get_response_from_url(url=url,
+                                                                            is_stop_404=is_stop_404)
+
+        return response.text if response else None, isStop
+
+    @staticmethod
+    async def get_response_from_url(*,
+                                    url: str,
+                                    is_stop_404: bool,
+                                    headers: dict[str, str] or None = None) -> (ScraperResponse or None, bool or None):
         result = None
         isStop = False
 
         try:
+            transport = ScraperHtmlOperations.get_transport()
+            retry_policy = ScraperHtmlOperations._RETRY_POLICY
+            circuit_breaker = ScraperHtmlOperations._CIRCUIT_BREAKER if transport.IS_REMOTE else None
+            rate_limiter = ScraperHtmlOperations._RATE_LIMITER if transport.IS_REMOTE else None
+            host = urlparse(url).netloc
+
+            if ScraperHtmlOperations._USER_AGENT is None:
+                ScraperHtmlOperations._USER_AGENT = UserAgent()
+
+            for attempt in range(1, retry_policy.max_attempts + 1):
+                if circuit_breaker is not None and not circuit_breaker.allow(host=host):
+                    ScraperMetrics.count('scraper_circuit_open_total', url=url)
+                    raise ScraperCircuitOpenError(f"Circuit is open for host - {host}")
+
+                is_last_attempt = attempt == retry_policy.max_attempts
+
+                if rate_limiter is not None:
+                    await rate_limiter.acquire(host=host)
+
+                started_at = monotonic()
+
+                if attempt > 1:
+                    ScraperMetrics.count('scraper_retries_total', url=url)
 
-            while 1:
                 try:
-                    response = await aio_to_thread(ScraperHtmlOperations._RT.get, url, headers={'User-agent': UserAgent().random})
-                except ConnectionError:
+                    with ScraperMetrics.time('fetch'):
+                        response = await transport.get(url=url,
+                                                       headers={'User-agent': ScraperHtmlOperations._USER_AGENT.random,
+                                                                **(headers or {})})
+                except ScraperConnectionError as err:
+                    ScraperMetrics.count('scraper_connection_errors_total', url=url)
+
+                    if rate_limiter is not None:
+                        rate_limiter.record(host=host, status_code=None, latency=monotonic() - started_at)
+
+                    # One failure per request, a failed probe of an open host opens it again at once
+                    if circuit_breaker is not None and (is_last_attempt or circuit_breaker.is_open(host=host)):
+                        circuit_breaker.record_failure(host=host)
+
+                    if is_last_attempt:
+                        raise ScraperError(f"Failed request after {attempt} attempts with error - {err}")
+
+                    await aio_sleep(retry_policy.get_delay(attempt=attempt))
+                    continue
+
+                if rate_limiter is not None:
+                    rate_limiter.record(host=host, status_code=response.status_code, latency=monotonic() - started_at)
+                    ScraperMetrics.set_gauge('scraper_rate_limit_requests_per_second',
+                                             rate_limiter.get_rate(host=host),
+                                             host=host)
+
+                ScraperMetrics.count('scraper_requests_total', url=url)
+
+                if retry_policy.is_retry_status(response.status_code):
+                    if circuit_breaker is not None and (is_last_attempt or circuit_breaker.is_open(host=host)):
+                        circuit_breaker.record_failure(host=host)
+
+                    if is_last_attempt:
+                        raise ScraperError(f"Failed request after {attempt} attempts with response status code "
+                                           f"{response.status_code}")
+
+                    await aio_sleep(retry_policy.get_delay(attempt=attempt, response=response))
                     continue
 
-                if response.status_code == 200:
-                    result = response.text
+                if circuit_breaker is not None:
+                    circuit_breaker.record_success(host=host)
+
+                # 304 only comes back for conditional requests, the caller keeps its stored copy
+                if response.status_code in (200, 304):
+                    result = response
                 elif response.status_code == 404:
+                    ScraperMetrics.count('scraper_not_found_total', url=url)
+
                     if is_stop_404:
                         LOGGER.error(f"Requests loop ended with url - {url}")
                         isStop = True
                     else:
                         raise ScraperError("Failed request with response status code 404")
                 else:
-                    raise ScraperError(f"Failed request with response - {response}")
+                    raise ScraperError(f"Failed request with response status code {response.status_code}")
 
                 break
 
         except (ScraperError, Exception) as err:
             LOGGER.error(err)
-        finally:
-            return result, isStop
+
+        # Not returned from finally, cancellation while waiting for a retry has to reach the caller
+        return result, isStop
@@ -1,48 +1,91 @@
 from asyncio import to_thread as aio_to_thread
 from logging import getLogger
-from bs4 import BeautifulSoup
-from re import (search as re_search,
-                I as re_I)
+from src.Scraper.Parser.scraper_parser import ScraperNode
 from urllib.parse import urlparse, urljoin
-from re import compile as re_compile
-from src.Scraper.Models.scraper_models import (ScraperUserConfig, ScraperUserResult, ScraperTopicResult)
-from asyncio import (gather as aio_gather)
+from re import (compile as re_compile,
+                I as re_I,
+                Pattern)
+from functools import lru_cache
+from hashlib import sha1
+from datetime import datetime
+from src.Scraper.Models.scraper_models import (ScraperUserConfig,
+                                               ScraperUserResult,
+                                               ScraperTopicResult,
+                                               ScraperDateConfig,
+                                               ScraperProfileFieldConfig)
 
 LOGGER = getLogger()
 
+_FILE_LINK_PATTERN = re_compile(r'\.\w+(?:\?.*)?$', re_I)
+
 
 class ScraperMsgOperations:
 
     @staticmethod
     async def get_topic_from_msg(*,
-                                 msg_obj: BeautifulSoup,
+                                 msg_obj: ScraperNode,
                                  topic_link_patterns: [str],
-                                 base_url: str) -> str or None:
+                                 base_url: str) -> ScraperTopicResult or None:
+
+        result = await aio_to_thread(ScraperMsgOperations.parse_topic_from_msg,
+                                     msg_obj=msg_obj,
+                                     topic_link_patterns=topic_link_patterns,
+                                     base_url=base_url)
+
+        return ScraperTopicResult(url=result[0], name=result[1]) if result else None
+
+    @staticmethod
+    async def get_date_from_msg(*,
+                                msg_obj: ScraperNode,
+                                date_pattern: str or None,
+                                date_config: ScraperDateConfig or None = None) -> str or None:
+
+        return await aio_to_thread(ScraperMsgOperations.parse_date_from_msg,
+                                   msg_obj=msg_obj,
+                                   date_pattern=date_pattern,
+                                   date_config=date_config)
+
+    @staticmethod
+    async def get_user_from_msg(*,
+                                msg_obj: ScraperNode,
+                                base_url: str,
+                                user_config: ScraperUserConfig) -> ScraperUserResult or None:
+
+        result = await aio_to_thread(ScraperMsgOperations.parse_user_from_msg,
+                                     msg_obj=msg_obj,
+                                     base_url=base_url,
+                                     user_config=user_config)
+
+        return ScraperUserResult(url=result[0], name=result[1]) if result else None
+
+    @staticmethod
+    def parse_topic_from_msg(*,
+                             msg_obj: ScraperNode,
+                             topic_link_patterns: [str or Pattern],
+                             base_url: str) -> (str, str) or None:
+        """Patterns are matched case-insensitively, compiled ones are used as they are"""
 
         result = None
 
         try:
 
-            link_obj = await aio_to_thread(msg_obj.find, href=True)
+            link_obj = msg_obj.find_link()
 
-            link = link_obj.get('href')
+            link = link_obj.get_attr('href')
             text = link_obj.get_text()
 
             if not link:
                 return
 
-            searched_results = await aio_gather(*[aio_to_thread(re_search, pattern, link, re_I) for pattern in
-                                                  topic_link_patterns])
-
-            if not re_search(r'\.\w+(?:\?.*)?$', link, re_I) and (
-                    all(searched_results)):
+            if not _FILE_LINK_PATTERN.search(link) and all(
+                    (pattern if isinstance(pattern, Pattern) else
+                     ScraperMsgOperations.compile_pattern(pattern=pattern, flags=re_I)).search(link)
+                    for pattern in topic_link_patterns):
                 if link.startswith('/'):
-                    result = ScraperTopicResult(url=urljoin(base_url, link),
-                                                name=text)
+                    result = (urljoin(base_url, link), text)
 
                 elif urlparse(link).netloc == urlparse(base_url).netloc:
-                    result = ScraperTopicResult(url=link,
-                                                name=text)
+                    result = (link, text)
 
         except Exception as err:
             LOGGER.error(err)
@@ -51,21 +94,37 @@ class ScraperMsgOperations:
             return result
 
     @staticmethod
-    async def get_date_from_msg(*,
-                                msg_obj: BeautifulSoup,
-                                date_pattern: str) -> str or None:
+    def parse_date_from_msg(*,
+                            msg_obj: ScraperNode,
+                            date_pattern: str or Pattern or None,
+                            date_config: ScraperDateConfig or None = None) -> str or None:
         result = None
 
         try:
+            if date_config:
+                if date_config.is_class:
+                    date_obj = msg_obj.find_by_class(date_config.block_name)
+                else:
+                    date_obj = msg_obj.find_by_tag(date_config.block_name)
+
+                text = date_obj.get_attr(date_config.attribute) if date_config.attribute else date_obj.get_text()
+            else:
+                # Markup of the post as parsed, prettify() would re-indent a second copy of the whole subtree
+                text = msg_obj.get_html()
 
-            html_text = msg_obj.prettify()
+            if not text:
+                return
 
-            pattern = re_compile(date_pattern)
+            if date_pattern:
+                date_regex = date_pattern if isinstance(date_pattern, Pattern) else (
+                    ScraperMsgOperations.compile_pattern(pattern=date_pattern))
 
-            match_obj = await aio_to_thread(pattern.search, html_text)
+                match_obj = date_regex.search(text)
 
-            if match_obj:
-                result = match_obj.group(1).strip()
+                if match_obj:
+                    result = match_obj.group(1).strip()
+            else:
+                result = text.strip()
 
         except Exception as err:
             LOGGER.error(err)
@@ -74,28 +133,95 @@ class ScraperMsgOperations:
             return result
 
     @staticmethod
-    async def get_user_from_msg(*,
-                                msg_obj: BeautifulSoup,
-                                base_url: str,
-                                user_config: ScraperUserConfig) -> ScraperUserResult or None:
+    def parse_field_from_obj(*,
+                             base_obj: ScraperNode,
+                             field_config: ScraperProfileFieldConfig) -> str or None:
+        result = None
+
+        try:
+            if field_config.is_class:
+                field_obj = base_obj.find_by_class(field_config.block_name)
+            else:
+                field_obj = base_obj.find_by_tag(field_config.block_name)
+
+            # Fields a user keeps hidden are missing from the page
+            if field_obj is None:
+                return
+
+            text = field_obj.get_attr(field_config.attribute) if field_config.attribute else field_obj.get_text()
+
+            if not text:
+                return
+
+            if field_config.pattern:
+                match_obj = ScraperMsgOperations.compile_pattern(pattern=field_config.pattern).search(text)
+
+                if match_obj:
+                    result = match_obj.group(1).strip()
+            else:
+                result = text.strip()
+
+        except Exception as err:
+            LOGGER.error(err)
+
+        finally:
+            return result
+
+    @staticmethod
+    def parse_datetime(*,
+                       date: str or None,
+                       date_format: str or None) -> datetime or None:
+        result = None
+
+        try:
+            if not date or not date_format:
+                return
+
+            if date_format == 'iso':
+                result = datetime.fromisoformat(date)
+            else:
+                result = datetime.strptime(date, date_format)
+
+        except Exception as err:
+            LOGGER.error(err)
+
+        finally:
+            return result
+
+    @staticmethod
+    def get_msg_key(*,
+                    topic_url: str or None,
+                    user_url: str or None,
+                    date: str or None,
+                    text: str or None) -> str:
+        return sha1("\x1f".join([value or '' for value in (topic_url, user_url, date, text)]).encode()).hexdigest()
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile_pattern(*, pattern: str, flags: int = 0) -> Pattern:
+        return re_compile(pattern, flags)
+
+    @staticmethod
+    def parse_user_from_msg(*,
+                            msg_obj: ScraperNode,
+                            base_url: str,
+                            user_config: ScraperUserConfig) -> (str, str) or None:
         result = None
 
         try:
             if user_config.is_class:
-                user_name_obj = await aio_to_thread(msg_obj.find, class_=user_config.block_name)
+                user_name_obj = msg_obj.find_by_class(user_config.block_name)
             else:
-                user_name_obj = await aio_to_thread(msg_obj.find, user_config.block_name)
+                user_name_obj = msg_obj.find_by_tag(user_config.block_name)
 
-            user_name_link_obj = await aio_to_thread(user_name_obj.find, href=True)
-            link = user_name_link_obj.get('href')
+            user_name_link_obj = user_name_obj.find_link()
+            link = user_name_link_obj.get_attr('href')
             text = user_name_link_obj.get_text()
 
             if link.startswith('/'):
-                result = ScraperUserResult(url=urljoin(base_url, link),
-                                           name=text)
+                result = (urljoin(base_url, link), text)
             elif urlparse(link).netloc == urlparse(base_url).netloc:
-                result = ScraperUserResult(url=link,
-                                           name=text)
+                result = (link, text)
         except Exception as err:
             LOGGER.error(err)
 
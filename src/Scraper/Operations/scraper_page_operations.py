@@ -0,0 +1,340 @@
+from logging import getLogger
+from src.Scraper.Parser.scraper_parser import ScraperParser, ScraperNode
+from src.Scraper.Parser.scraper_stream_parser import ScraperStreamParser
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Operations.scraper_msg_operations import ScraperMsgOperations
+from src.Scraper.Models.scraper_models import ScraperMsgConfig, ScraperParserBackend, ScraperProfileConfig
+from src.Scraper.Registry.scraper_extraction_plan import ScraperExtractionPlan
+from src.Scraper.Matcher.scraper_pattern_matcher import ScraperPatternMatcher
+from collections import defaultdict
+from re import compile as re_compile
+from urllib.parse import urljoin
+
+LOGGER = getLogger()
+
+_WHITESPACE_PATTERN = re_compile(r'\s+')
+
+
+class ScraperPageOperations:
+    """Synchronous extraction run as a single worker call per page, returns plain data only"""
+
+    @staticmethod
+    def extract_page(*,
+                     html: str,
+                     base_url: str,
+                     msg_config: ScraperMsgConfig,
+                     is_stream: bool = False) -> dict or None:
+        result = None
+
+        try:
+            msg_config = ScraperExtractionPlan.get(msg_config)
+
+            if is_stream:
+                result = ScraperPageOperations._extract_page_stream(html=html,
+                                                                    base_url=base_url,
+                                                                    msg_config=msg_config)
+                return result
+
+            base_obj = ScraperParser.from_backend(msg_config.parser).parse(html)
+            msg_objs = base_obj.find_all_by_class(msg_config.msg_block_class_name)
+
+            # The page itself is the topic when topics are not linked from messages
+            page_topic = None if msg_config.topic_link_patterns else (
+                base_url, ScraperHtmlOperations.parse_title_from_html(base_obj=base_obj))
+
+            msgs = []
+
+            for msg_obj in msg_objs:
+                msg = ScraperPageOperations.extract_msg(msg_obj=msg_obj,
+                                                        base_url=base_url,
+                                                        msg_config=msg_config)
+                if msg and page_topic:
+                    msg['topic'] = page_topic
+
+                msgs.append(msg)
+
+            result = {
+                'msgs': msgs,
+                'index': ScraperPageOperations.build_topic_index(msg_objs=msg_objs,
+                                                                 base_url=base_url,
+                                                                 msg_config=msg_config) if page_topic else None,
+                'next_url': ScraperHtmlOperations.parse_next_page_url_from_html(
+                    base_obj=base_obj,
+                    base_url=base_url,
+                    next_page_class_name=msg_config.next_page_class_name)
+            }
+
+        except Exception as err:
+            LOGGER.error(err)
+
+        finally:
+            return result
+
+    @staticmethod
+    def _extract_page_stream(*,
+                             html: str,
+                             base_url: str,
+                             msg_config: ScraperExtractionPlan) -> dict:
+        """extract_page holding one message subtree at a time instead of the whole page"""
+
+        stream_parser = ScraperStreamParser(block_class_name=msg_config.msg_block_class_name,
+                                            next_page_class_name=msg_config.next_page_class_name,
+                                            backend=msg_config.parser)
+        msgs = []
+        index = []
+
+        for msg_obj in stream_parser.iter_blocks(html):
+            msgs.append(ScraperPageOperations.extract_msg(msg_obj=msg_obj,
+                                                          base_url=base_url,
+                                                          msg_config=msg_config))
+
+            if not msg_config.topic_link_patterns:
+                index += ScraperPageOperations.build_topic_index(msg_objs=[msg_obj],
+                                                                 base_url=base_url,
+                                                                 msg_config=msg_config)
+
+        # The title comes before the messages, but is only known for sure once the page is read
+        if not msg_config.topic_link_patterns:
+            for msg in msgs:
+                if msg:
+                    msg['topic'] = (base_url, stream_parser.title)
+
+        return {
+            'msgs': msgs,
+            'index': None if msg_config.topic_link_patterns else index,
+            'next_url': urljoin(base_url, stream_parser.next_link) if stream_parser.next_link else None
+        }
+
+    @staticmethod
+    def extract_msg(*,
+                    msg_obj: ScraperNode,
+                    base_url: str,
+                    msg_config: ScraperMsgConfig) -> dict or None:
+        result = None
+
+        try:
+            msg_config = ScraperExtractionPlan.get(msg_config)
+            msg_text_obj = msg_obj.find_by_class(msg_config.msg_text_class_name)
+
+            topic = None
+
+            if msg_config.topic_link_regexes:
+                topic = ScraperMsgOperations.parse_topic_from_msg(msg_obj=msg_obj,
+                                                                  topic_link_patterns=msg_config.topic_link_regexes,
+                                                                  base_url=base_url)
+
+            date = ScraperMsgOperations.parse_date_from_msg(msg_obj=msg_obj,
+                                                            date_pattern=msg_config.date_regex,
+                                                            date_config=msg_config.date_config)
+
+            result = {
+                'text': msg_text_obj.get_text().strip(),
+                'quotes': [quote_obj.get_text().strip() for quote_obj in msg_obj.find_all_by_tag(msg_config.quote_block_name)],
+                'topic': topic,
+                'date': date,
+                'parsed_date': ScraperMsgOperations.parse_datetime(date=date,
+                                                                   date_format=msg_config.date_format),
+                'user': ScraperMsgOperations.parse_user_from_msg(msg_obj=msg_obj,
+                                                                 base_url=base_url,
+                                                                 user_config=msg_config.user_config)
+            }
+
+        except Exception as err:
+            LOGGER.error(err)
+
+        finally:
+            return result
+
+    @staticmethod
+    def extract_topic_index(*,
+                            html: str,
+                            base_url: str,
+                            msg_config: ScraperMsgConfig,
+                            is_stream: bool = False) -> [dict] or None:
+        result = None
+
+        try:
+            if is_stream:
+                topic_index = []
+
+                for msg_obj in ScraperStreamParser(block_class_name=msg_config.msg_block_class_name,
+                                                   backend=msg_config.parser).iter_blocks(html):
+                    topic_index += ScraperPageOperations.build_topic_index(msg_objs=[msg_obj],
+                                                                           base_url=base_url,
+                                                                           msg_config=msg_config)
+
+                result = topic_index
+                return result
+
+            topic_obj = ScraperParser.from_backend(msg_config.parser).parse(html)
+
+            result = ScraperPageOperations.build_topic_index(
+                msg_objs=topic_obj.find_all_by_class(msg_config.msg_block_class_name),
+                base_url=base_url,
+                msg_config=msg_config)
+
+        except Exception as err:
+            LOGGER.error(err)
+
+        finally:
+            return result
+
+    @staticmethod
+    def extract_profile(*,
+                        html: str,
+                        profile_config: ScraperProfileConfig,
+                        parser: ScraperParserBackend = ScraperParserBackend.HTML_PARSER) -> dict or None:
+        result = None
+
+        try:
+            profile_obj = ScraperParser.from_backend(parser).parse(html)
+
+            result = {name: ScraperMsgOperations.parse_field_from_obj(base_obj=profile_obj, field_config=field_config)
+                      for name, field_config in profile_config.fields.items()}
+
+        except Exception as err:
+            LOGGER.error(err)
+
+        finally:
+            return result
+
+    @staticmethod
+    def build_topic_index(*,
+                          msg_objs: [ScraperNode],
+                          base_url: str,
+                          msg_config: ScraperMsgConfig) -> [dict]:
+        """Messages without a text block, deleted or moderated ones, are left out, the rest stay searchable"""
+
+        result = []
+
+        for msg_obj in msg_objs:
+            try:
+                msg_text_obj = msg_obj.find_by_class(msg_config.msg_text_class_name)
+                quote_objs = msg_obj.find_all_by_tag(msg_config.quote_block_name)
+
+                text = msg_text_obj.get_text().strip()
+                quote_text = " ".join([obj.get_text().strip() for obj in quote_objs])
+
+                result.append({
+                    'text': text,
+                    'quote_text': quote_text,
+                    'norm_text': ScraperPageOperations.normalize_text(text=text),
+                    'norm_quote_text': ScraperPageOperations.normalize_text(text=quote_text),
+                    'user': ScraperMsgOperations.parse_user_from_msg(msg_obj=msg_obj,
+                                                                     base_url=base_url,
+                                                                     user_config=msg_config.user_config)
+                })
+
+            except Exception as err:
+                LOGGER.error(err)
+
+        return result
+
+    @staticmethod
+    def match_page(*,
+                   msgs: [dict],
+                   topic_indexes: dict[str, list]) -> [(str, [dict] or None)]:
+
+        result = [(msg['text'], None) for msg in msgs]
+
+        topic_positions = defaultdict(list)
+
+        for position, msg in enumerate(msgs):
+            if msg['topic'] and topic_indexes.get(msg['topic'][0]) is not None:
+                topic_positions[msg['topic'][0]].append(position)
+
+        for topic_url, positions in topic_positions.items():
+            searched_results = ScraperPageOperations.search_questions_in_topic(topic_index=topic_indexes[topic_url],
+                                                                               msgs=[msgs[position] for position in
+                                                                                     positions])
+            if searched_results:
+                for position, searched_result in zip(positions, searched_results):
+                    result[position] = searched_result
+
+        return result
+
+    @staticmethod
+    def search_questions_in_index(*,
+                                  topic_index: [dict],
+                                  msg_text: str,
+                                  quote_texts: [str] or None) -> (str, [dict] or None) or None:
+
+        searched_results = ScraperPageOperations.search_questions_in_topic(topic_index=topic_index,
+                                                                           msgs=[{'text': msg_text,
+                                                                                  'quotes': quote_texts or []}])
+
+        return searched_results[0] if searched_results else None
+
+    @staticmethod
+    def search_questions_in_topic(*,
+                                  topic_index: [dict],
+                                  msgs: [dict]) -> [(str, [dict] or None)] or None:
+        """Resolves answers and questions of many messages with a single scan of the topic"""
+
+        result = None
+
+        try:
+            pattern_ids = {}
+            msg_pattern_ids = []
+
+            for msg in msgs:
+                quote_ids = [pattern_ids.setdefault(ScraperPageOperations.normalize_pattern(pattern=quote),
+                                                    len(pattern_ids)) for quote in msg['quotes']]
+                text_id = None if quote_ids else pattern_ids.setdefault(
+                    ScraperPageOperations.normalize_pattern(pattern=msg['text']), len(pattern_ids))
+
+                msg_pattern_ids.append((text_id, quote_ids))
+
+            matcher = ScraperPatternMatcher(list(pattern_ids))
+            is_quoted = any(quote_ids for _, quote_ids in msg_pattern_ids)
+
+            text_postings = defaultdict(list)
+            quote_postings = defaultdict(list)
+
+            for index, entry in enumerate(topic_index):
+                for pattern_id in matcher.search(entry['norm_text']):
+                    text_postings[pattern_id].append(index)
+
+                if is_quoted:
+                    for pattern_id in matcher.search(entry['norm_quote_text']):
+                        quote_postings[pattern_id].append(index)
+
+            result = []
+
+            for msg, (text_id, quote_ids) in zip(msgs, msg_pattern_ids):
+                if quote_ids:
+                    # The answer quotes every pattern, messages containing any of them are the questions
+                    answer_indexes = set.intersection(*[set(quote_postings[quote_id]) for quote_id in quote_ids])
+                    answer_text_index = max(answer_indexes) if answer_indexes else None
+
+                    question_indexes = sorted(set().union(*[text_postings[quote_id] for quote_id in quote_ids])
+                                              - answer_indexes)
+                else:
+                    answer_indexes = text_postings[text_id]
+                    answer_text_index = answer_indexes[-1] if answer_indexes else None
+
+                    question_indexes = []
+
+                questions = [topic_index[index] for index in question_indexes]
+
+                if answer_text_index and len(questions) == 0:
+                    questions.append(topic_index[answer_text_index - 1])
+
+                result.append((topic_index[answer_text_index]['text'] if answer_text_index is not None else msg['text'],
+                               questions if len(questions) != 0 else None))
+
+        except Exception as err:
+            LOGGER.error(err)
+
+        finally:
+            return result
+
+    @staticmethod
+    def normalize_text(*, text: str) -> str:
+        return _WHITESPACE_PATTERN.sub('', text).lower()
+
+    @staticmethod
+    def normalize_pattern(*, pattern: str) -> str:
+        text = pattern[:pattern.rfind('…')] if pattern.endswith('…') else pattern
+
+        return ScraperPageOperations.normalize_text(text=text)
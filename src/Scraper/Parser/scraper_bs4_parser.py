@@ -0,0 +1,61 @@
+from bs4 import BeautifulSoup, FeatureNotFound
+from src.Scraper.Parser.scraper_parser import ScraperParser, ScraperNode
+
+
+class ScraperBs4Node(ScraperNode):
+    __slots__ = ('_obj',)
+
+    def __init__(self, obj: BeautifulSoup):
+        self._obj = obj
+
+    @property
+    def obj(self) -> BeautifulSoup:
+        return self._obj
+
+    def find_by_class(self, name: str) -> ScraperNode or None:
+        return ScraperBs4Node.wrap(self._obj.find(class_=name))
+
+    def find_all_by_class(self, name: str) -> [ScraperNode]:
+        return [ScraperBs4Node(obj) for obj in self._obj.find_all(class_=name)]
+
+    def find_by_tag(self, name: str) -> ScraperNode or None:
+        return ScraperBs4Node.wrap(self._obj.find(name))
+
+    def find_all_by_tag(self, name: str) -> [ScraperNode]:
+        return [ScraperBs4Node(obj) for obj in self._obj.find_all(name)]
+
+    def find_link(self) -> ScraperNode or None:
+        return ScraperBs4Node.wrap(self._obj.find(href=True))
+
+    def find_by_attr(self, name: str, value: str) -> ScraperNode or None:
+        return ScraperBs4Node.wrap(self._obj.find(attrs={name: value}))
+
+    def get_attr(self, name: str) -> str or None:
+        value = self._obj.get(name)
+
+        # bs4 splits multi-valued attributes such as class and rel into lists
+        return " ".join(value) if isinstance(value, list) else value
+
+    def get_text(self) -> str:
+        return self._obj.get_text()
+
+    def get_html(self) -> str:
+        return self._obj.decode()
+
+    @staticmethod
+    def wrap(obj: BeautifulSoup or None) -> ScraperNode or None:
+        return ScraperBs4Node(obj) if obj is not None else None
+
+
+class ScraperBs4Parser(ScraperParser):
+    def __init__(self, *, features: str = 'html.parser'):
+        if features != 'html.parser':
+            try:
+                BeautifulSoup('', features)
+            except FeatureNotFound as err:
+                raise ImportError(err)
+
+        self._features = features
+
+    def parse(self, html: str or bytes) -> ScraperNode:
+        return ScraperBs4Node(BeautifulSoup(html, self._features))
@@ -0,0 +1,61 @@
+from src.Error.scraper_error import ScraperError
+from src.Scraper.Models.scraper_models import ScraperParserBackend
+
+
+class ScraperNode:
+    """Element of a parsed document, lookups search descendants only"""
+
+    __slots__ = ()
+
+    def find_by_class(self, name: str) -> 'ScraperNode' or None:
+        raise NotImplementedError()
+
+    def find_all_by_class(self, name: str) -> ['ScraperNode']:
+        raise NotImplementedError()
+
+    def find_by_tag(self, name: str) -> 'ScraperNode' or None:
+        raise NotImplementedError()
+
+    def find_all_by_tag(self, name: str) -> ['ScraperNode']:
+        raise NotImplementedError()
+
+    def find_link(self) -> 'ScraperNode' or None:
+        raise NotImplementedError()
+
+    def find_by_attr(self, name: str, value: str) -> 'ScraperNode' or None:
+        """Matches one of the space separated values, like class lookups do"""
+
+        raise NotImplementedError()
+
+    def get_attr(self, name: str) -> str or None:
+        raise NotImplementedError()
+
+    def get_text(self) -> str:
+        raise NotImplementedError()
+
+    def get_html(self) -> str:
+        raise NotImplementedError()
+
+
+class ScraperParser:
+
+    def parse(self, html: str or bytes) -> ScraperNode:
+        raise NotImplementedError()
+
+    @staticmethod
+    def from_backend(backend: ScraperParserBackend) -> 'ScraperParser':
+        backend = ScraperParserBackend(backend)
+
+        # Backends import lazily so lxml and selectolax stay optional
+        try:
+            if backend == ScraperParserBackend.SELECTOLAX:
+                from src.Scraper.Parser.scraper_selectolax_parser import ScraperSelectolaxParser
+
+                return ScraperSelectolaxParser()
+
+            from src.Scraper.Parser.scraper_bs4_parser import ScraperBs4Parser
+
+            return ScraperBs4Parser(features=backend.value)
+
+        except ImportError as err:
+            raise ScraperError(f"Parser backend {backend.value} is not installed - {err}")
@@ -0,0 +1,90 @@
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+from src.Scraper.Parser.scraper_parser import ScraperParser, ScraperNode
+
+
+_ASCII_WHITESPACE = ' \n\t\f\r'
+_PRESERVE_WHITESPACE_TAGS = frozenset(('pre', 'textarea'))
+
+
+class ScraperSelectolaxNode(ScraperNode):
+    __slots__ = ('_obj',)
+
+    def __init__(self, obj: LexborNode):
+        self._obj = obj
+
+    def find_by_class(self, name: str) -> ScraperNode or None:
+        return self._first(ScraperSelectolaxNode._get_attr_selector('class', name))
+
+    def find_all_by_class(self, name: str) -> [ScraperNode]:
+        return self._all(ScraperSelectolaxNode._get_attr_selector('class', name))
+
+    def find_by_tag(self, name: str) -> ScraperNode or None:
+        return self._first(name)
+
+    def find_all_by_tag(self, name: str) -> [ScraperNode]:
+        return self._all(name)
+
+    def find_link(self) -> ScraperNode or None:
+        return self._first('[href]')
+
+    def find_by_attr(self, name: str, value: str) -> ScraperNode or None:
+        return self._first(ScraperSelectolaxNode._get_attr_selector(name, value))
+
+    def get_attr(self, name: str) -> str or None:
+        return self._obj.attributes.get(name)
+
+    def get_text(self) -> str:
+        texts = []
+
+        for obj in self._obj.traverse(include_text=True):
+            if obj.tag != '-text':
+                continue
+
+            text = obj.text_content
+
+            # Like bs4, whitespace between tags becomes one newline or space, except in pre and textarea
+            if not text.strip(_ASCII_WHITESPACE) and not self._is_preserved(obj):
+                text = '\n' if '\n' in text else ' '
+
+            texts.append(text)
+
+        return ''.join(texts)
+
+    def get_html(self) -> str:
+        return self._obj.html
+
+    @staticmethod
+    def _get_attr_selector(name: str, value: str) -> str:
+        # Like bs4, a value with spaces is the whole attribute, ~= would never match it
+        operator = '=' if value.split() != [value] else '~='
+        value = value.replace('\\', '\\\\').replace('"', '\\"')
+
+        return f'[{name}{operator}"{value}"]'
+
+    def _is_preserved(self, obj: LexborNode) -> bool:
+        parent = obj.parent
+
+        while parent is not None and parent.mem_id != self._obj.mem_id:
+            if parent.tag in _PRESERVE_WHITESPACE_TAGS:
+                return True
+
+            parent = parent.parent
+
+        return parent is not None and parent.tag in _PRESERVE_WHITESPACE_TAGS
+
+    def _first(self, selector: str) -> ScraperNode or None:
+        # Lexbor matches the node itself too, bs4 semantics look at descendants only
+        for obj in self._obj.css(selector):
+            if obj.mem_id != self._obj.mem_id:
+                return ScraperSelectolaxNode(obj)
+
+        return None
+
+    def _all(self, selector: str) -> [ScraperNode]:
+        return [ScraperSelectolaxNode(obj) for obj in self._obj.css(selector) if obj.mem_id != self._obj.mem_id]
+
+
+class ScraperSelectolaxParser(ScraperParser):
+
+    def parse(self, html: str or bytes) -> ScraperNode:
+        return ScraperSelectolaxNode(LexborHTMLParser(html).root)
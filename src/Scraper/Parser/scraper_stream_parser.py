@@ -0,0 +1,117 @@
+from src.Error.scraper_error import ScraperError
+from src.Scraper.Models.scraper_models import ScraperParserBackend
+from src.Scraper.Parser.scraper_parser import ScraperParser, ScraperNode
+
+
+class ScraperStreamParser:
+    """Walks a page with the lxml pull parser and yields message blocks one at a time.
+
+    Each block is cut out of the tree as soon as it is closed and parsed on its own with the configured
+    backend, so lookups behave as on a full tree. Blocks nested in a block are yielded right after it, in
+    the order of find_all_by_class. Everything already read is dropped, the tree holds one block and the
+    open ancestors at most. The page title and the next page link are collected on the way, read them after
+    the blocks are exhausted.
+    """
+
+    def __init__(self, *,
+                 block_class_name: str,
+                 next_page_class_name: str or None = None,
+                 backend: ScraperParserBackend = ScraperParserBackend.HTML_PARSER,
+                 chunk_size: int = 65536):
+
+        self._block_class_name = block_class_name
+        self._next_page_class_name = next_page_class_name
+        self._parser = ScraperParser.from_backend(backend)
+        self._chunk_size = chunk_size
+
+        self.title = None
+        self.next_link = None
+
+    def iter_blocks(self, html: str or bytes):
+        try:
+            from lxml.etree import HTMLPullParser, tostring
+        except ImportError as err:
+            raise ScraperError(f"lxml is required to stream pages - {err}")
+
+        pull_parser = HTMLPullParser(events=('start', 'end'))
+
+        block = None
+        title = None
+        next_obj, next_link, is_next_found = None, None, False
+        rel_link, is_rel_found = None, False
+
+        for event, element in self._iter_events(pull_parser, html):
+            # Comments and processing instructions have no string tag
+            if not isinstance(element.tag, str):
+                continue
+
+            if event == 'start':
+                if block is None and ScraperStreamParser._has_class(element, self._block_class_name):
+                    block = element
+
+                # Same lookups as parse_next_page_url_from_html, in document order
+                if not is_next_found:
+                    if next_obj is not None:
+                        if element.get('href'):
+                            next_link, is_next_found = element.get('href'), True
+
+                    elif self._next_page_class_name and ScraperStreamParser._has_class(element,
+                                                                                       self._next_page_class_name):
+                        next_obj = element
+
+                        if element.get('href'):
+                            next_link, is_next_found = element.get('href'), True
+
+                if not is_rel_found and 'next' in (element.get('rel') or '').split():
+                    rel_link, is_rel_found = element.get('href'), True
+
+                continue
+
+            if element is next_obj and not is_next_found:
+                # The class element holds no link, the rel lookup decides
+                is_next_found = True
+
+            if element.tag == 'title' and title is None:
+                title = ''.join(element.itertext())
+
+            if block is not None and element is not block:
+                continue
+
+            if element is block:
+                block = None
+
+                block_obj = self._parser.parse(tostring(element, method='html', encoding='unicode',
+                                                        with_tail=False))
+
+                # The fragment parses into a document, the block itself comes first, then the nested ones
+                yield from block_obj.find_all_by_class(self._block_class_name) or [block_obj]
+
+            # Closed elements are read, drop them with their preceding siblings
+            element.clear()
+
+            parent = element.getparent()
+
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+        self.title = title
+        self.next_link = next_link if next_obj is not None and next_link else rel_link
+
+    def _iter_events(self, pull_parser, html: str or bytes):
+        for offset in range(0, len(html), self._chunk_size):
+            pull_parser.feed(html[offset:offset + self._chunk_size])
+
+            yield from pull_parser.read_events()
+
+        # Elements left open by a truncated page are closed here, a last block among them
+        pull_parser.close()
+
+        yield from pull_parser.read_events()
+
+    @staticmethod
+    def _has_class(element, name: str) -> bool:
+        # Like bs4 class_ lookups, one of the classes or the whole attribute
+        value = element.get('class')
+
+        return bool(value) and (name in value.split() or value == name)
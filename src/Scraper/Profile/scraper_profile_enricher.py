@@ -0,0 +1,112 @@
+from asyncio import (gather as aio_gather,
+                     get_running_loop as aio_get_running_loop,
+                     Semaphore as aio_Semaphore)
+from collections import defaultdict
+from src.Scraper.Cache.scraper_cache import ScraperCache
+from src.Scraper.Models.scraper_models import ScraperMsgConfig, ScraperParseExecutor
+from src.Scraper.Models.scraper_records import ScraperMsgRecord
+from src.Scraper.Metrics.scraper_metrics import ScraperMetrics
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Operations.scraper_page_operations import ScraperPageOperations
+from src.Scraper.Operations.scraper_executor_operations import ScraperExecutorOperations
+
+
+class ScraperProfileEnricher:
+    """Attaches profile data to the users of messages, each profile is fetched once per ttl.
+
+    Users of a batch are deduplicated by url and their profiles fetched concurrently, at most concurrency
+    at a time. Lookups of a url already in flight wait for it. Needs profile_config in the msg config,
+    without it messages pass unchanged. An unreadable profile is not cached and stays None.
+    """
+
+    def __init__(self, *,
+                 concurrency: int = 4,
+                 cache: ScraperCache or None = None,
+                 parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD):
+
+        self._concurrency = concurrency
+        self._cache = cache if cache is not None else ScraperCache(max_size=10_000, ttl=24 * 60 * 60)
+        self._parse_executor = parse_executor
+
+        self._semaphore = None
+        self._loop = None
+
+    async def enrich(self, *,
+                     records: [ScraperMsgRecord],
+                     msg_config: ScraperMsgConfig) -> [ScraperMsgRecord]:
+        if msg_config.profile_config is None:
+            return records
+
+        user_msgs = defaultdict(list)
+
+        for record in records:
+            for user_msg in [record.answer, *(record.questions or [])]:
+                if user_msg is not None and user_msg.user is not None and user_msg.profile is None:
+                    user_msgs[user_msg.user.url].append(user_msg)
+
+        profiles = await aio_gather(*[self.get_profile(url=url, msg_config=msg_config) for url in user_msgs])
+
+        # Set on the messages, not on the interned users, so every batch takes the profile from the cache
+        for url_user_msgs, profile in zip(user_msgs.values(), profiles):
+            for user_msg in url_user_msgs:
+                user_msg.profile = profile
+
+        return records
+
+    async def iter_enriched(self, *,
+                            records,
+                            msg_config: ScraperMsgConfig,
+                            batch_size: int = 100):
+        """Enriches an async iterable of records in batches, so lookups of a batch run concurrently"""
+
+        batch = []
+
+        async for record in records:
+            batch.append(record)
+
+            if len(batch) >= batch_size:
+                for enriched_record in await self.enrich(records=batch, msg_config=msg_config):
+                    yield enriched_record
+
+                batch = []
+
+        for enriched_record in await self.enrich(records=batch, msg_config=msg_config):
+            yield enriched_record
+
+    async def get_profile(self, *, url: str, msg_config: ScraperMsgConfig) -> dict or None:
+        semaphore = self._get_semaphore()
+        is_loaded = False
+
+        async def load_profile():
+            nonlocal is_loaded
+            is_loaded = True
+
+            async with semaphore:
+                html_content, _ = await ScraperHtmlOperations.get_html_from_url(url=url, is_stop_404=False)
+
+                if not html_content:
+                    return None
+
+                return await ScraperExecutorOperations.run_in_executor(ScraperPageOperations.extract_profile,
+                                                                       executor=self._parse_executor,
+                                                                       html=html_content,
+                                                                       profile_config=msg_config.profile_config,
+                                                                       parser=msg_config.parser)
+
+        with ScraperMetrics.time('profile_lookup'):
+            result = await self._cache.get_or_load(key=url, loader=load_profile)
+
+        ScraperMetrics.count('scraper_profile_cache_misses_total' if is_loaded else 'scraper_profile_cache_hits_total',
+                             url=url)
+
+        return result
+
+    def _get_semaphore(self) -> aio_Semaphore:
+        loop = aio_get_running_loop()
+
+        # Semaphores are bound to the loop they are first used on, app.py runs a new loop per scrape
+        if self._semaphore is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = aio_Semaphore(self._concurrency)
+
+        return self._semaphore
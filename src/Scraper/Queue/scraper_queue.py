@@ -0,0 +1,39 @@
+from src.Scraper.Models.scraper_models import ScraperCrawlJob, ScraperQueueLease
+
+
+class ScraperQueue:
+    """Crawl jobs shared by workers, possibly on other hosts.
+
+    A leased job belongs to its owner until the lease expires, then any worker may lease it again.
+    Jobs are unique by url, putting a known url again does nothing unless forced.
+    """
+
+    async def put(self, *, job: ScraperCrawlJob, is_force: bool = False) -> bool:
+        raise NotImplementedError()
+
+    async def lease(self, *, owner: str, lease_seconds: float) -> ScraperQueueLease or None:
+        raise NotImplementedError()
+
+    async def extend(self, *, lease: ScraperQueueLease, lease_seconds: float) -> bool:
+        """False when the lease expired and the job was taken by another worker"""
+
+        raise NotImplementedError()
+
+    async def ack(self, *, lease: ScraperQueueLease) -> bool:
+        raise NotImplementedError()
+
+    async def fail(self, *, lease: ScraperQueueLease, error: str or None, retry_delay: float = 0) -> None:
+        raise NotImplementedError()
+
+    async def get_counts(self) -> dict[str, int]:
+        raise NotImplementedError()
+
+    async def is_empty(self) -> bool:
+        """No job is waiting or in progress"""
+
+        counts = await self.get_counts()
+
+        return not counts.get('pending') and not counts.get('leased')
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,113 @@
+from asyncio import to_thread as aio_to_thread
+from sqlite3 import connect as sqlite_connect
+from threading import Lock
+from time import time
+from src.Scraper.Models.scraper_models import ScraperCrawlJob, ScraperQueueLease
+from src.Scraper.Queue.scraper_queue import ScraperQueue
+
+
+class ScraperSqliteQueue(ScraperQueue):
+    """ScraperQueue in a SQLite file, shared by the worker processes of a host or over a network file system.
+
+    Statuses: pending -> leased -> done, a failed job goes back to pending until max_attempts,
+    then it is dead. Lease times are wall clock, hosts sharing the queue need synchronized clocks.
+    """
+
+    def __init__(self, *, path: str, max_attempts: int = 5, timeout: float = 30):
+        self._max_attempts = max_attempts
+        self._connection = sqlite_connect(path, timeout=timeout, check_same_thread=False)
+        self._lock = Lock()
+
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS jobs '
+                                     '(id INTEGER PRIMARY KEY, url TEXT UNIQUE, job TEXT, priority INTEGER, '
+                                     "status TEXT DEFAULT 'pending', attempts INTEGER DEFAULT 0, "
+                                     'lease_owner TEXT, lease_until REAL, available_at REAL DEFAULT 0, '
+                                     'last_error TEXT)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority, id)')
+
+    async def put(self, *, job: ScraperCrawlJob, is_force: bool = False) -> bool:
+        return await aio_to_thread(self._insert, job, is_force)
+
+    async def lease(self, *, owner: str, lease_seconds: float) -> ScraperQueueLease or None:
+        return await aio_to_thread(self._lease, owner, lease_seconds)
+
+    async def extend(self, *, lease: ScraperQueueLease, lease_seconds: float) -> bool:
+        return await aio_to_thread(self._update_leased, lease,
+                                   'lease_until = ?', (time() + lease_seconds,))
+
+    async def ack(self, *, lease: ScraperQueueLease) -> bool:
+        return await aio_to_thread(self._update_leased, lease,
+                                   "status = 'done', lease_owner = NULL, lease_until = NULL", ())
+
+    async def fail(self, *, lease: ScraperQueueLease, error: str or None, retry_delay: float = 0) -> None:
+        status = 'dead' if lease.attempts >= self._max_attempts else 'pending'
+
+        await aio_to_thread(self._update_leased, lease,
+                            'status = ?, lease_owner = NULL, lease_until = NULL, available_at = ?, last_error = ?',
+                            (status, time() + retry_delay, error))
+
+    async def get_counts(self) -> dict[str, int]:
+        return await aio_to_thread(self._select_counts)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _insert(self, job: ScraperCrawlJob, is_force: bool) -> bool:
+        with self._lock, self._connection:
+            if is_force:
+                cursor = self._connection.execute("INSERT INTO jobs (url, job, priority) VALUES (?, ?, ?) "
+                                                  "ON CONFLICT (url) DO UPDATE SET job = excluded.job, "
+                                                  "priority = excluded.priority, status = 'pending', attempts = 0, "
+                                                  "lease_owner = NULL, lease_until = NULL, available_at = 0, "
+                                                  "last_error = NULL",
+                                                  (job.url, job.model_dump_json(), job.priority))
+            else:
+                cursor = self._connection.execute('INSERT OR IGNORE INTO jobs (url, job, priority) VALUES (?, ?, ?)',
+                                                  (job.url, job.model_dump_json(), job.priority))
+
+        return cursor.rowcount > 0
+
+    def _lease(self, owner: str, lease_seconds: float) -> ScraperQueueLease or None:
+        now = time()
+
+        with self._lock, self._connection:
+            # Owners of expired leases died or stalled, their attempts count
+            self._connection.execute("UPDATE jobs SET status = 'dead', lease_owner = NULL, "
+                                     "last_error = 'Lease expired' "
+                                     "WHERE status = 'leased' AND lease_until <= ? AND attempts >= ?",
+                                     (now, self._max_attempts))
+
+            # One statement, so two workers never lease the same job
+            row = self._connection.execute("UPDATE jobs SET status = 'leased', lease_owner = ?, lease_until = ?, "
+                                           "attempts = attempts + 1 "
+                                           "WHERE id = (SELECT id FROM jobs "
+                                           "WHERE (status = 'pending' AND available_at <= ?) "
+                                           "OR (status = 'leased' AND lease_until <= ?) "
+                                           "ORDER BY priority, id LIMIT 1) "
+                                           "RETURNING id, job, attempts",
+                                           (owner, now + lease_seconds, now, now)).fetchone()
+
+        if row is None:
+            return None
+
+        return ScraperQueueLease(id=row[0],
+                                 job=ScraperCrawlJob.model_validate_json(row[1]),
+                                 owner=owner,
+                                 attempts=row[2])
+
+    def _update_leased(self, lease: ScraperQueueLease, assignments: str, params: tuple) -> bool:
+        with self._lock, self._connection:
+            cursor = self._connection.execute(f"UPDATE jobs SET {assignments} "
+                                              f"WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                                              (*params, lease.id, lease.owner))
+
+        return cursor.rowcount > 0
+
+    def _select_counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+
+        return dict(rows)
@@ -0,0 +1,50 @@
+from re import (compile as re_compile,
+                I as re_I)
+from src.Error.scraper_error import ScraperError
+from src.Scraper.Models.scraper_models import ScraperMsgConfig
+
+
+class ScraperExtractionPlan:
+    """ScraperMsgConfig compiled once, regexes are compiled and the config is a private copy.
+
+    Reads like the config it was built from, so it can be passed wherever a ScraperMsgConfig is expected.
+    """
+
+    __slots__ = ('name', 'msg_config', 'date_regex', 'topic_link_regexes')
+
+    def __init__(self, *, msg_config: ScraperMsgConfig, name: str or None = None):
+        msg_config = msg_config.model_copy(deep=True)
+
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'msg_config', msg_config)
+        object.__setattr__(self, 'date_regex',
+                           re_compile(msg_config.date_pattern) if msg_config.date_pattern else None)
+        object.__setattr__(self, 'topic_link_regexes',
+                           tuple(re_compile(pattern, re_I) for pattern in msg_config.topic_link_patterns or ()))
+
+    def __getattr__(self, name: str):
+        # Only reached for names outside __slots__, private ones are never config fields
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return getattr(self.msg_config, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise ScraperError(f"Extraction plan is immutable, not set - {name}")
+
+    def __reduce__(self):
+        # Worker processes get the config and compile their own copy
+        return ScraperExtractionPlan._from_state, (self.msg_config, self.name)
+
+    @staticmethod
+    def _from_state(msg_config: ScraperMsgConfig, name: str or None) -> 'ScraperExtractionPlan':
+        return ScraperExtractionPlan(msg_config=msg_config, name=name)
+
+    @staticmethod
+    def get(msg_config: 'ScraperMsgConfig or ScraperExtractionPlan') -> 'ScraperExtractionPlan':
+        """Plans are returned as they are, plain configs are compiled for a single use"""
+
+        if isinstance(msg_config, ScraperExtractionPlan):
+            return msg_config
+
+        return ScraperExtractionPlan(msg_config=msg_config)
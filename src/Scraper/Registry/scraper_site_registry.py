@@ -0,0 +1,84 @@
+from json import load as json_load
+from pathlib import Path
+from types import MappingProxyType
+from urllib.parse import urlparse
+from src.Error.scraper_error import ScraperError
+from src.Scraper.Models.scraper_models import ScraperSiteProfile, ScraperCrawlJob, ScraperMsgConfig
+from src.Scraper.Registry.scraper_extraction_plan import ScraperExtractionPlan
+
+
+class ScraperSiteRegistry:
+    """Named site profiles, each compiled into an extraction plan when registered.
+
+    Files are JSON or YAML (PyYAML is optional), either a list of profiles or {"sites": [...]}:
+        sites:
+          - name: forum
+            hosts: [forum.onion]
+            msg_config: {msg_block_class_name: message, ...}
+    """
+
+    def __init__(self):
+        self._plans: dict[str, ScraperExtractionPlan] = {}
+        self._hosts: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def register(self, profile: ScraperSiteProfile) -> ScraperExtractionPlan:
+        plan = ScraperExtractionPlan(msg_config=profile.msg_config, name=profile.name)
+
+        self._plans[profile.name] = plan
+
+        for host in profile.hosts:
+            self._hosts[host.lower()] = profile.name
+
+        return plan
+
+    def load(self, *, path: str) -> [str]:
+        """Registers every profile of the file, returns their names"""
+
+        file_path = Path(path)
+
+        with open(file_path, encoding='utf-8') as file:
+            if file_path.suffix.lower() in ('.yml', '.yaml'):
+                try:
+                    from yaml import safe_load
+                except ImportError:
+                    raise ScraperError("PyYAML is required to load YAML site profiles")
+
+                data = safe_load(file)
+            else:
+                data = json_load(file)
+
+        profiles = data.get('sites', []) if isinstance(data, dict) else data
+
+        return [self.register(ScraperSiteProfile.model_validate(profile)).name for profile in profiles or []]
+
+    def get_plan(self, *, name: str) -> ScraperExtractionPlan:
+        plan = self._plans.get(name)
+
+        if plan is None:
+            raise ScraperError(f"Not found site profile - {name}")
+
+        return plan
+
+    def get_plan_by_url(self, *, url: str) -> ScraperExtractionPlan or None:
+        name = self._hosts.get(urlparse(url).netloc.lower())
+
+        return self._plans[name] if name is not None else None
+
+    def get_msg_config(self, *, job: ScraperCrawlJob) -> ScraperMsgConfig or ScraperExtractionPlan:
+        """The msg config of the job, else the plan of its site, else the plan of its host"""
+
+        if job.msg_config is not None:
+            return job.msg_config
+
+        plan = self.get_plan(name=job.site) if job.site else self.get_plan_by_url(url=job.url)
+
+        if plan is None:
+            raise ScraperError(f"Not found msg config for url - {job.url}")
+
+        return plan
+
+    def get_plans(self) -> MappingProxyType:
+        return MappingProxyType(self._plans)
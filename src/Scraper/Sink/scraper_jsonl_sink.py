@@ -0,0 +1,28 @@
+from aiofiles import open as aio_open
+from json import dumps as json_dumps
+from src.Scraper.Models.scraper_records import ScraperMsgRecord
+from src.Scraper.Sink.scraper_sink import ScraperSink
+
+
+class ScraperJsonlSink(ScraperSink):
+    def __init__(self, *,
+                 path: str,
+                 batch_size: int = 500):
+
+        super().__init__(batch_size=batch_size)
+
+        self._path = path
+        self._file = None
+
+    async def _write_batch(self, batch: [ScraperMsgRecord]) -> None:
+        if self._file is None:
+            self._file = await aio_open(self._path, 'a', encoding='utf-8')
+
+        await self._file.write("".join([f"{json_dumps(result.to_dict(), ensure_ascii=False, separators=(',', ':'))}\n"
+                                        for result in batch]))
+        await self._file.flush()
+
+    async def _close(self) -> None:
+        if self._file is not None:
+            await self._file.close()
+            self._file = None
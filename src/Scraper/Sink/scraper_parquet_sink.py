@@ -0,0 +1,45 @@
+from asyncio import to_thread as aio_to_thread
+from src.Error.scraper_error import ScraperError
+from src.Scraper.Models.scraper_records import ScraperMsgRecord
+from src.Scraper.Sink.scraper_sink import ScraperSink
+
+
+class ScraperParquetSink(ScraperSink):
+    """Every batch becomes one row group, pyarrow is optional and only needed for this sink"""
+
+    def __init__(self, *,
+                 path: str,
+                 batch_size: int = 5000):
+
+        super().__init__(batch_size=batch_size)
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as err:
+            raise ScraperError(f"Parquet sink requires pyarrow - {err}")
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._path = path
+        self._writer = None
+
+    async def _write_batch(self, batch: [ScraperMsgRecord]) -> None:
+        table = self._pa.Table.from_pylist([ScraperSink.to_row(result) for result in batch],
+                                           schema=self._get_schema())
+
+        await aio_to_thread(self._write_table, table)
+
+    async def _close(self) -> None:
+        if self._writer is not None:
+            await aio_to_thread(self._writer.close)
+            self._writer = None
+
+    def _write_table(self, table) -> None:
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+
+        self._writer.write_table(table)
+
+    def _get_schema(self):
+        return self._pa.schema([(name, self._pa.string()) for name in ScraperSink.COLUMNS])
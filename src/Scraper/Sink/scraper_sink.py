@@ -0,0 +1,76 @@
+from asyncio import Lock as aio_Lock
+from json import dumps as json_dumps
+from src.Scraper.Models.scraper_models import ScraperMsgResult
+from src.Scraper.Models.scraper_records import ScraperMsgRecord
+from src.Scraper.Metrics.scraper_metrics import ScraperMetrics
+from src.Scraper.Operations.scraper_msg_operations import ScraperMsgOperations
+
+
+class ScraperSink:
+    """Buffers results and writes them in batches, memory stays bounded by batch_size"""
+
+    COLUMNS = ('msg_key', 'date', 'parsed_date', 'topic_url', 'topic_name', 'user_url', 'user_name', 'user_profile',
+               'text', 'questions')
+
+    def __init__(self, *, batch_size: int = 500):
+        self._batch_size = batch_size
+        self._batch = []
+        self._lock = aio_Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def write(self, result: ScraperMsgResult or ScraperMsgRecord) -> None:
+        self._batch.append(ScraperMsgRecord.from_result(result) if isinstance(result, ScraperMsgResult) else result)
+
+        if len(self._batch) >= self._batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        # Scheduler workers write concurrently, batches must reach the backend one at a time.
+        # An empty flush still waits for the batch in flight, after flush() every written result is stored
+        async with self._lock:
+            batch, self._batch = self._batch, []
+
+            if batch:
+                with ScraperMetrics.time('sink_write'):
+                    await self._write_batch(batch)
+
+        if batch:
+            ScraperMetrics.count('scraper_sink_rows_total', value=len(batch))
+
+    async def close(self) -> None:
+        await self.flush()
+        await self._close()
+
+    async def _write_batch(self, batch: [ScraperMsgRecord]) -> None:
+        raise NotImplementedError()
+
+    async def _close(self) -> None:
+        pass
+
+    @staticmethod
+    def to_row(result: ScraperMsgRecord) -> dict:
+        answer = result.answer
+        user = answer.user if answer else None
+
+        return {
+            # Same message crawled twice, by a retry or another worker, gets the same key
+            'msg_key': ScraperMsgOperations.get_msg_key(topic_url=result.topic.url if result.topic else None,
+                                                        user_url=user.url if user else None,
+                                                        date=result.date,
+                                                        text=answer.text if answer else None),
+            'date': result.date,
+            'parsed_date': result.parsed_date.isoformat() if result.parsed_date else None,
+            'topic_url': result.topic.url if result.topic else None,
+            'topic_name': result.topic.name if result.topic else None,
+            'user_url': user.url if user else None,
+            'user_name': user.name if user else None,
+            'user_profile': json_dumps(answer.profile, ensure_ascii=False) if answer and answer.profile else None,
+            'text': answer.text if answer else None,
+            'questions': json_dumps([question.to_dict() for question in result.questions],
+                                    ensure_ascii=False) if result.questions else None
+        }
@@ -0,0 +1,41 @@
+from asyncio import to_thread as aio_to_thread
+from sqlite3 import connect as sqlite_connect
+from src.Scraper.Models.scraper_records import ScraperMsgRecord
+from src.Scraper.Sink.scraper_sink import ScraperSink
+
+
+class ScraperSqliteSink(ScraperSink):
+    """Rows are unique by msg_key, writing a message again is a no-op"""
+
+    def __init__(self, *,
+                 path: str,
+                 table: str = 'messages',
+                 batch_size: int = 500):
+
+        super().__init__(batch_size=batch_size)
+
+        self._path = path
+        self._table = table
+        self._connection = None
+
+    async def _write_batch(self, batch: [ScraperMsgRecord]) -> None:
+        rows = [tuple(ScraperSink.to_row(result).values()) for result in batch]
+
+        await aio_to_thread(self._insert_rows, rows)
+
+    async def _close(self) -> None:
+        if self._connection is not None:
+            await aio_to_thread(self._connection.close)
+            self._connection = None
+
+    def _insert_rows(self, rows: [tuple]) -> None:
+        if self._connection is None:
+            # Batches are written one at a time, so sharing the connection across pool threads is safe
+            self._connection = sqlite_connect(self._path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS {self._table} '
+                                     f'(id INTEGER PRIMARY KEY, {", ".join(ScraperSink.COLUMNS)}, UNIQUE (msg_key))')
+
+        with self._connection:
+            self._connection.executemany(f'INSERT OR IGNORE INTO {self._table} ({", ".join(ScraperSink.COLUMNS)}) '
+                                         f'VALUES ({", ".join("?" * len(ScraperSink.COLUMNS))})', rows)
@@ -0,0 +1,44 @@
+from asyncio import to_thread as aio_to_thread
+from sqlite3 import connect as sqlite_connect
+from threading import Lock
+from src.Scraper.Models.scraper_models import ScraperPageState
+
+_COLUMNS = ('url', 'etag', 'last_modified', 'content_hash', 'last_msg_key', 'last_msg_date', 'next_url')
+
+
+class ScraperCrawlState:
+    """Per-URL fingerprints and message watermarks persisted between crawls"""
+
+    def __init__(self, *, path: str):
+        self._connection = sqlite_connect(path, check_same_thread=False)
+        self._lock = Lock()
+
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS pages '
+                                     f'(url TEXT PRIMARY KEY, {", ".join(_COLUMNS[1:])})')
+
+    async def get(self, *, url: str) -> ScraperPageState or None:
+        return await aio_to_thread(self._select, url)
+
+    async def put(self, *, state: ScraperPageState) -> None:
+        await aio_to_thread(self._upsert, state)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _select(self, url: str) -> ScraperPageState or None:
+        with self._lock:
+            row = self._connection.execute(f'SELECT {", ".join(_COLUMNS)} FROM pages WHERE url = ?',
+                                           (url,)).fetchone()
+
+        return ScraperPageState(**dict(zip(_COLUMNS, row))) if row else None
+
+    def _upsert(self, state: ScraperPageState) -> None:
+        row = state.model_dump(mode='json')
+
+        with self._lock, self._connection:
+            self._connection.execute(f'INSERT OR REPLACE INTO pages ({", ".join(_COLUMNS)}) '
+                                     f'VALUES ({", ".join("?" * len(_COLUMNS))})',
+                                     tuple(row[column] for column in _COLUMNS))
@@ -0,0 +1,115 @@
+from asyncio import (get_running_loop as aio_get_running_loop,
+                     TimeoutError as aio_TimeoutError)
+from logging import getLogger
+from uuid import uuid4
+from urllib.parse import urlparse, urlunparse
+from aiohttp import (ClientSession, ClientTimeout, TCPConnector, ClientError)
+from aiohttp_socks import ProxyConnector, ProxyError, ProxyConnectionError, ProxyTimeoutError
+from src.Error.scraper_error import ScraperConnectionError
+from src.Scraper.Models.scraper_models import ScraperResponse
+from src.Scraper.Transport.scraper_transport import ScraperTransport
+
+LOGGER = getLogger()
+
+
+class ScraperAiohttpTransport(ScraperTransport):
+    def __init__(self, *,
+                 proxy_url: str or None = 'socks5://127.0.0.1:9150',
+                 limit: int = 100,
+                 limit_per_host: int = 8,
+                 timeout: float = 60,
+                 rotate_every: int or None = None,
+                 rotate_on_statuses: list[int] or None = None):
+
+        self._proxy_url = proxy_url
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._timeout = timeout
+        self._rotate_every = rotate_every
+        self._rotate_on_statuses = set(rotate_on_statuses if rotate_on_statuses is not None else [403, 429])
+
+        self._session = None
+        self._loop = None
+        self._in_flight = {}
+        self._requests_count = 0
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        session = self._get_session()
+        self._in_flight[session] = self._in_flight.get(session, 0) + 1
+
+        try:
+            async with session.get(url, headers=headers) as response:
+                result = ScraperResponse(url=url,
+                                         status_code=response.status,
+                                         text=await response.text(errors='replace'),
+                                         headers=dict(response.headers))
+        except (ClientError, ProxyError, ProxyConnectionError, ProxyTimeoutError, aio_TimeoutError, OSError) as err:
+            raise ScraperConnectionError(err)
+
+        finally:
+            # close(), or a session of a new loop, dropped the count and closed the session already
+            if session in self._in_flight:
+                self._in_flight[session] -= 1
+
+                if session is not self._session and self._in_flight[session] == 0:
+                    del self._in_flight[session]
+                    await session.close()
+
+        self._requests_count += 1
+
+        # Only the first response seen on a session rotates it, concurrent ones reuse the new identity
+        if session is self._session and (result.status_code in self._rotate_on_statuses or (
+                self._rotate_every and self._requests_count % self._rotate_every == 0)):
+            await self.rotate_identity()
+
+        return result
+
+    async def rotate_identity(self) -> None:
+        # Tor isolates circuits by SOCKS credentials, so a fresh pool with new credentials gets a new exit
+        old_session = self._get_session()
+        self._session = self._create_session()
+
+        if old_session is not None and self._loop is aio_get_running_loop() and not self._in_flight.get(old_session):
+            self._in_flight.pop(old_session, None)
+            await old_session.close()
+
+    async def close(self) -> None:
+        if self._loop is aio_get_running_loop():
+            for session in {self._session, *self._in_flight} - {None}:
+                await session.close()
+
+        self._session = None
+        self._loop = None
+        self._in_flight = {}
+
+    def _get_session(self) -> ClientSession:
+        loop = aio_get_running_loop()
+
+        # Sessions are bound to the loop they were created on, app.py runs a new loop per scrape
+        if self._session is None or self._loop is not loop:
+            self._loop = loop
+            self._in_flight = {}
+            self._session = self._create_session()
+
+        return self._session
+
+    def _create_session(self) -> ClientSession:
+        if self._proxy_url:
+            connector = ProxyConnector.from_url(self._isolated_proxy_url(),
+                                                rdns=True,
+                                                limit=self._limit,
+                                                limit_per_host=self._limit_per_host)
+        else:
+            connector = TCPConnector(limit=self._limit,
+                                     limit_per_host=self._limit_per_host)
+
+        return ClientSession(connector=connector,
+                             timeout=ClientTimeout(total=self._timeout))
+
+    def _isolated_proxy_url(self) -> str:
+        parsed = urlparse(self._proxy_url)
+
+        if parsed.username or not parsed.scheme.startswith('socks5'):
+            return self._proxy_url
+
+        return urlunparse(parsed._replace(netloc=f"{uuid4().hex}:{uuid4().hex}@{parsed.netloc}"))
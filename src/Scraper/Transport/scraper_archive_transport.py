@@ -0,0 +1,60 @@
+from logging import getLogger
+from src.Scraper.Archive.scraper_archive import ScraperArchive
+from src.Scraper.Models.scraper_models import ScraperResponse
+from src.Scraper.Transport.scraper_transport import ScraperTransport
+
+LOGGER = getLogger()
+
+
+class ScraperRecordingTransport(ScraperTransport):
+    """Passes requests to transport and archives every final response, throttling and server errors are skipped"""
+
+    def __init__(self, *,
+                 transport: ScraperTransport,
+                 archive: ScraperArchive,
+                 skip_statuses: tuple[int, ...] = (304, 429, 500, 502, 503, 504)):
+
+        self._transport = transport
+        self._archive = archive
+        self._skip_statuses = set(skip_statuses)
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        response = await self._transport.get(url=url, headers=headers)
+
+        if response.status_code not in self._skip_statuses:
+            try:
+                await self._archive.put(response=response)
+            except Exception as err:
+                LOGGER.error(err)
+
+        return response
+
+    async def rotate_identity(self) -> None:
+        await self._transport.rotate_identity()
+
+    async def close(self) -> None:
+        await self._transport.close()
+
+
+class ScraperReplayTransport(ScraperTransport):
+    """Serves pages from the archive only, urls never fetched come back as 404.
+
+    Conditional headers are ignored, so replay without crawl_state to re-extract pages already seen.
+    """
+
+    IS_REMOTE = False
+
+    def __init__(self, *,
+                 archive: ScraperArchive,
+                 fetched_before: float or None = None):
+
+        self._archive = archive
+        self._fetched_before = fetched_before
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        response = await self._archive.get(url=url, fetched_before=self._fetched_before)
+
+        if response is None:
+            return ScraperResponse(url=url, status_code=404, text='', headers={})
+
+        return response
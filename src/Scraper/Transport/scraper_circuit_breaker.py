@@ -0,0 +1,49 @@
+from time import monotonic
+
+
+class ScraperCircuitBreaker:
+    """Per-host breaker, an open host fails fast until reset_timeout passes and one probe request succeeds.
+
+    A failure is a request that failed after all of its retries, failure_threshold of them in a row open the host.
+    """
+
+    def __init__(self, *,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 60.0):
+
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened_at = {}
+        self._probing = {}
+
+    def allow(self, *, host: str) -> bool:
+        opened_at = self._opened_at.get(host)
+
+        if opened_at is None:
+            return True
+
+        now = monotonic()
+
+        # A probe that never reported back (cancelled) is replaced after another timeout
+        if now - opened_at < self._reset_timeout or now - self._probing.get(host, -self._reset_timeout) < self._reset_timeout:
+            return False
+
+        self._probing[host] = now
+
+        return True
+
+    def record_success(self, *, host: str) -> None:
+        self._failures.pop(host, None)
+        self._opened_at.pop(host, None)
+        self._probing.pop(host, None)
+
+    def record_failure(self, *, host: str) -> None:
+        self._failures[host] = self._failures.get(host, 0) + 1
+
+        if host in self._probing or self._failures[host] >= self._failure_threshold:
+            self._opened_at[host] = monotonic()
+            self._probing.pop(host, None)
+
+    def is_open(self, *, host: str) -> bool:
+        return host in self._opened_at
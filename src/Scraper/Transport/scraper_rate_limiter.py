@@ -0,0 +1,92 @@
+from asyncio import sleep as aio_sleep
+from time import monotonic
+
+
+class _ScraperHostBucket:
+    __slots__ = ('rate', 'tokens', 'updated_at', 'decreased_at', 'latency', 'base_latency')
+
+    def __init__(self, *, rate: float):
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated_at = monotonic()
+        self.decreased_at = 0.0
+        self.latency = None
+        self.base_latency = None
+
+
+class ScraperRateLimiter:
+    """Token bucket per host with AIMD rate control, backs off on 429/503 or rising latency, ramps up while fast"""
+
+    def __init__(self, *,
+                 initial_rate: float = 5.0,
+                 min_rate: float = 0.2,
+                 max_rate: float = 50.0,
+                 burst: float = 5.0,
+                 increase: float = 1.0,
+                 decrease: float = 0.5,
+                 latency_factor: float = 3.0,
+                 throttle_statuses: tuple[int, ...] = (429, 503)):
+
+        self._initial_rate = initial_rate
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._burst = burst
+        self._increase = increase
+        self._decrease = decrease
+        self._latency_factor = latency_factor
+        self._throttle_statuses = set(throttle_statuses)
+        self._buckets = {}
+
+    async def acquire(self, *, host: str) -> None:
+        bucket = self._get_bucket(host=host)
+
+        while 1:
+            now = monotonic()
+
+            bucket.tokens = min(self._burst, bucket.tokens + (now - bucket.updated_at) * bucket.rate)
+            bucket.updated_at = now
+
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return
+
+            await aio_sleep((1 - bucket.tokens) / bucket.rate)
+
+    def record(self, *, host: str, status_code: int or None, latency: float) -> None:
+        """status_code is None for connection failures"""
+
+        bucket = self._get_bucket(host=host)
+
+        bucket.latency = latency if bucket.latency is None else bucket.latency * 0.8 + latency * 0.2
+        bucket.base_latency = bucket.latency if bucket.base_latency is None else min(bucket.base_latency,
+                                                                                     bucket.latency)
+
+        is_throttled = status_code is None or status_code in self._throttle_statuses
+        is_slow = bucket.latency > bucket.base_latency * self._latency_factor
+
+        if is_throttled or is_slow:
+            now = monotonic()
+
+            # Responses of one congested window arrive together, cut the rate once per window
+            if now - bucket.decreased_at >= max(bucket.latency, 1 / bucket.rate):
+                bucket.rate = max(self._min_rate, bucket.rate * self._decrease)
+                bucket.decreased_at = now
+        else:
+            # Adds about `increase` requests per second for each second of healthy responses
+            bucket.rate = min(self._max_rate, bucket.rate + self._increase / bucket.rate)
+
+    def get_rate(self, *, host: str) -> float:
+        bucket = self._buckets.get(host)
+
+        return bucket.rate if bucket is not None else self._initial_rate
+
+    def get_rates(self) -> dict[str, float]:
+        return {host: bucket.rate for host, bucket in self._buckets.items()}
+
+    def _get_bucket(self, *, host: str) -> _ScraperHostBucket:
+        bucket = self._buckets.get(host)
+
+        if bucket is None:
+            bucket = self._buckets[host] = _ScraperHostBucket(rate=self._initial_rate)
+
+        return bucket
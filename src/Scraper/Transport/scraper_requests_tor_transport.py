@@ -0,0 +1,33 @@
+from asyncio import to_thread as aio_to_thread
+from requests_tor import RequestsTor
+from requests.exceptions import ConnectionError
+from src.Error.scraper_error import ScraperConnectionError
+from src.Scraper.Models.scraper_models import ScraperResponse
+from src.Scraper.Transport.scraper_transport import ScraperTransport
+
+
+class ScraperRequestsTorTransport(ScraperTransport):
+    def __init__(self, *,
+                 tor_ports: tuple[int, ...] = (9150,),
+                 tor_cport: int = 9151,
+                 password: str or None = None,
+                 autochange_id: int = 1):
+
+        self._rt = RequestsTor(tor_ports=tor_ports,
+                               tor_cport=tor_cport,
+                               password=password,
+                               autochange_id=autochange_id)
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        try:
+            response = await aio_to_thread(self._rt.get, url, headers=headers)
+        except ConnectionError as err:
+            raise ScraperConnectionError(err)
+
+        return ScraperResponse(url=url,
+                               status_code=response.status_code,
+                               text=response.text,
+                               headers=dict(response.headers))
+
+    async def rotate_identity(self) -> None:
+        await aio_to_thread(self._rt.new_id)
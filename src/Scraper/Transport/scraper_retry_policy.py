@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from src.Scraper.Models.scraper_models import ScraperResponse
+
+
+class ScraperRetryPolicy:
+    def __init__(self, *,
+                 max_attempts: int = 5,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0,
+                 jitter: float = 1.0,
+                 retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504),
+                 respect_retry_after: bool = True):
+
+        self.max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._jitter = jitter
+        self._retry_statuses = set(retry_statuses)
+        self._respect_retry_after = respect_retry_after
+
+    def is_retry_status(self, status_code: int) -> bool:
+        return status_code in self._retry_statuses
+
+    def get_delay(self, *, attempt: int, response: ScraperResponse or None = None) -> float:
+        if response is not None and self._respect_retry_after:
+            retry_after = ScraperRetryPolicy.get_retry_after(response=response)
+
+            if retry_after is not None:
+                return min(retry_after, self._max_delay)
+
+        delay = min(self._max_delay, self._base_delay * 2 ** (attempt - 1))
+
+        # jitter=1 is full jitter, spreads clients that failed together over the whole window
+        return delay * (1 - self._jitter) + uniform(0, delay * self._jitter)
+
+    @staticmethod
+    def get_retry_after(*, response: ScraperResponse) -> float or None:
+        value = response.headers.get('Retry-After', response.headers.get('retry-after'))
+
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
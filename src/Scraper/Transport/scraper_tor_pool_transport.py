@@ -0,0 +1,262 @@
+from asyncio import (get_running_loop as aio_get_running_loop,
+                     create_task as aio_create_task,
+                     gather as aio_gather,
+                     sleep as aio_sleep)
+from logging import getLogger
+from aiohttp_socks import ProxyConnectionError
+from statistics import median
+from time import monotonic
+from src.Error.scraper_error import ScraperConnectionError
+from src.Scraper.Models.scraper_models import ScraperResponse
+from src.Scraper.Metrics.scraper_metrics import ScraperMetrics
+from src.Scraper.Transport.scraper_transport import ScraperTransport
+from src.Scraper.Transport.scraper_aiohttp_transport import ScraperAiohttpTransport
+
+LOGGER = getLogger()
+
+
+class _ScraperTorIdentity:
+    __slots__ = ('proxy_url', 'transport', 'in_flight', 'requests_count', 'latency', 'bans', 'failures',
+                 'unhealthy_until', 'evictions')
+
+    def __init__(self, *, proxy_url: str, transport: ScraperAiohttpTransport):
+        self.proxy_url = proxy_url
+        self.transport = transport
+        self.in_flight = 0
+        self.unhealthy_until = 0.0
+        self.evictions = 0
+
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests_count = 0
+        self.latency = None
+        self.bans = 0
+        self.failures = 0
+
+
+class ScraperTorPoolTransport(ScraperTransport):
+    """Spreads requests over several Tor SOCKS ports, one identity (circuit) per port.
+
+    Every request goes to the healthy identity with the fewest requests in flight, a banned response is
+    requested again through the next one until every identity was tried. An identity gets a new
+    circuit after request_budget requests, after ban_threshold banned responses in a row, or when it is slow:
+    its latency is above max_latency or slow_factor times the pool median, or after failure_threshold connection
+    errors in a row. An identity whose SOCKS port is down, or which failed a health check of health_url,
+    is left out for cooldown seconds or until a health check through it succeeds.
+
+    The ports may belong to one Tor client (several SocksPort lines) or to separate clients.
+    """
+
+    def __init__(self, *,
+                 proxy_urls: list[str] or None = None,
+                 limit_per_host: int = 8,
+                 timeout: float = 60,
+                 request_budget: int or None = 200,
+                 ban_statuses: tuple[int, ...] = (403, 429),
+                 ban_threshold: int = 2,
+                 max_latency: float or None = None,
+                 slow_factor: float or None = 3.0,
+                 min_samples: int = 5,
+                 failure_threshold: int = 2,
+                 cooldown: float = 60,
+                 health_url: str or None = None,
+                 health_interval: float or None = None):
+
+        self._request_budget = request_budget
+        self._ban_statuses = set(ban_statuses)
+        self._ban_threshold = ban_threshold
+        self._max_latency = max_latency
+        self._slow_factor = slow_factor
+        self._min_samples = min_samples
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._health_url = health_url
+        self._health_interval = health_interval
+
+        # Rotation is decided here, the transports of the identities never rotate by themselves
+        self._identities = [_ScraperTorIdentity(proxy_url=proxy_url,
+                                                transport=ScraperAiohttpTransport(proxy_url=proxy_url,
+                                                                                  limit_per_host=limit_per_host,
+                                                                                  timeout=timeout,
+                                                                                  rotate_on_statuses=[]))
+                            for proxy_url in proxy_urls or ['socks5://127.0.0.1:9150']]
+
+        self._health_task = None
+        self._health_loop = None
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        self._start_health_checks()
+
+        response = None
+        tried = []
+
+        # A banned exit or a dead SOCKS port is the identity's problem, not the url's,
+        # so the request goes through the other identities
+        while identity := self._get_identity(excluded=tried):
+            identity.in_flight += 1
+            started_at = monotonic()
+
+            try:
+                response = await identity.transport.get(url=url, headers=headers)
+            except ScraperConnectionError as err:
+                # The SOCKS port itself is unreachable, any other identity may still get through
+                if err.args and isinstance(err.args[0], ProxyConnectionError):
+                    await self._set_unhealthy(identity=identity)
+                    tried.append(identity)
+                    continue
+
+                await self._record_failure(identity=identity)
+                raise
+
+            finally:
+                identity.in_flight -= 1
+
+            await self._record_response(identity=identity,
+                                        status_code=response.status_code,
+                                        latency=monotonic() - started_at)
+
+            if response.status_code not in self._ban_statuses:
+                break
+
+            tried.append(identity)
+
+        if response is None:
+            raise ScraperConnectionError("Not found healthy Tor identity")
+
+        return response
+
+    async def rotate_identity(self) -> None:
+        for identity in self._identities:
+            await self._evict(identity=identity, reason='rotate')
+
+    async def check_health(self) -> None:
+        """Probes health_url through every identity, a failed one is left out until the next check succeeds"""
+
+        if self._health_url is None:
+            return
+
+        await aio_gather(*[self._check_identity(identity=identity) for identity in self._identities])
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            if self._health_loop is aio_get_running_loop():
+                self._health_task.cancel()
+                await aio_gather(self._health_task, return_exceptions=True)
+
+            self._health_task = None
+            self._health_loop = None
+
+        for identity in self._identities:
+            await identity.transport.close()
+
+    def get_stats(self) -> [dict]:
+        now = monotonic()
+
+        return [{'proxy_url': identity.proxy_url,
+                 'is_healthy': identity.unhealthy_until <= now,
+                 'in_flight': identity.in_flight,
+                 'requests_count': identity.requests_count,
+                 'latency': identity.latency,
+                 'evictions': identity.evictions}
+                for identity in self._identities]
+
+    def _get_identity(self, *, excluded: [_ScraperTorIdentity]) -> _ScraperTorIdentity or None:
+        now = monotonic()
+        identities = [identity for identity in self._identities if identity.unhealthy_until <= now]
+
+        ScraperMetrics.set_gauge('scraper_tor_healthy_identities', len(identities))
+
+        identities = [identity for identity in identities if identity not in excluded]
+
+        # Unmeasured identities count as fastest, so each one is tried
+        return min(identities, key=lambda identity: (identity.in_flight, identity.latency or 0.0), default=None)
+
+    async def _record_response(self, *, identity: _ScraperTorIdentity, status_code: int, latency: float) -> None:
+        identity.requests_count += 1
+        identity.failures = 0
+        identity.latency = latency if identity.latency is None else identity.latency * 0.8 + latency * 0.2
+
+        if status_code in self._ban_statuses:
+            identity.bans += 1
+
+            if identity.bans >= self._ban_threshold:
+                await self._evict(identity=identity, reason='banned')
+                return
+        else:
+            identity.bans = 0
+
+        if self._request_budget and identity.requests_count >= self._request_budget:
+            await self._evict(identity=identity, reason='budget')
+        elif self._is_slow(identity=identity):
+            await self._evict(identity=identity, reason='slow')
+
+    async def _record_failure(self, *, identity: _ScraperTorIdentity) -> None:
+        # Errors behind the proxy may as well come from a dead host, so the identity only gets a new circuit
+        identity.failures += 1
+
+        if identity.failures >= self._failure_threshold:
+            await self._evict(identity=identity, reason='failed')
+
+    async def _set_unhealthy(self, *, identity: _ScraperTorIdentity) -> None:
+        identity.unhealthy_until = monotonic() + self._cooldown
+        await self._evict(identity=identity, reason='failed')
+
+    def _is_slow(self, *, identity: _ScraperTorIdentity) -> bool:
+        if identity.requests_count < self._min_samples:
+            return False
+
+        if self._max_latency is not None and identity.latency > self._max_latency:
+            return True
+
+        latencies = [other.latency for other in self._identities
+                     if other.latency is not None and other.requests_count >= self._min_samples]
+
+        return bool(self._slow_factor and len(latencies) > 1 and
+                    identity.latency > self._slow_factor * median(latencies))
+
+    async def _evict(self, *, identity: _ScraperTorIdentity, reason: str) -> None:
+        # New SOCKS credentials, so Tor builds a new circuit through another exit
+        await identity.transport.rotate_identity()
+
+        identity.reset()
+        identity.evictions += 1
+
+        ScraperMetrics.count(f'scraper_tor_evictions_{reason}_total')
+        LOGGER.info(f"New Tor circuit on {identity.proxy_url} - {reason}")
+
+    async def _check_identity(self, *, identity: _ScraperTorIdentity) -> None:
+        try:
+            response = await identity.transport.get(url=self._health_url, headers={})
+        except ScraperConnectionError as err:
+            LOGGER.warning(f"Failed health check of {identity.proxy_url} - {err}")
+            await self._set_unhealthy(identity=identity)
+            return
+
+        if response.status_code in self._ban_statuses or response.status_code >= 500:
+            LOGGER.warning(f"Failed health check of {identity.proxy_url} - status code {response.status_code}")
+            await self._set_unhealthy(identity=identity)
+            return
+
+        identity.unhealthy_until = 0.0
+        identity.failures = 0
+
+    def _start_health_checks(self) -> None:
+        if self._health_url is None or self._health_interval is None:
+            return
+
+        loop = aio_get_running_loop()
+
+        # The task belongs to the loop it was started on, app.py runs a new loop per scrape
+        if self._health_task is None or self._health_loop is not loop or self._health_task.done():
+            self._health_loop = loop
+            self._health_task = aio_create_task(self._check_health_periodically())
+
+    async def _check_health_periodically(self) -> None:
+        while 1:
+            try:
+                await self.check_health()
+            except Exception as err:
+                LOGGER.error(err)
+
+            await aio_sleep(self._health_interval)
@@ -0,0 +1,15 @@
+from src.Scraper.Models.scraper_models import ScraperResponse
+
+
+class ScraperTransport:
+    # Local transports skip rate limiting and the circuit breaker
+    IS_REMOTE = True
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        raise NotImplementedError()
+
+    async def rotate_identity(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
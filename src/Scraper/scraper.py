@@ -1,6 +1,9 @@
 from logging import getLogger
-from src.Scraper.Models.scraper_models import ScraperMsgConfig, ScraperMsgResult
+from src.Scraper.Models.scraper_models import ScraperMsgConfig, ScraperMsgResult, ScraperParseMode, ScraperParseExecutor
 from src.Scraper.scraper_operations import ScraperOperations
+from src.Scraper.Cache.scraper_cache import ScraperCache
+from src.Scraper.State.scraper_crawl_state import ScraperCrawlState
+from src.Scraper.Profile.scraper_profile_enricher import ScraperProfileEnricher
 from src.Error.scraper_error import ScraperNotFoundError
 
 LOGGER = getLogger()
@@ -10,20 +13,66 @@ class Scraper(ScraperOperations):
     def __init__(self, *,
                  url: str,
                  msg_config: ScraperMsgConfig,
-                 is_stop_404: bool):
+                 is_stop_404: bool,
+                 topic_cache: ScraperCache or None = None,
+                 parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+                 parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                 crawl_state: ScraperCrawlState or None = None,
+                 profile_enricher: ScraperProfileEnricher or None = None):
 
         self._url = url
         self._msg_config = msg_config
         self._is_stop_404 = is_stop_404
+        self._topic_cache = topic_cache
+        self._parse_mode = parse_mode
+        self._parse_executor = parse_executor
+        self._crawl_state = crawl_state
+        self._profile_enricher = profile_enricher
 
     async def run(self) -> [ScraperMsgResult]:
         try:
             result = await self.on_scraping_all_msg_from_url(base_url=self._url,
                                                               msg_config=self._msg_config,
-                                                              is_stop_404=self._is_stop_404)
+                                                              is_stop_404=self._is_stop_404,
+                                                              topic_cache=self._topic_cache,
+                                                              parse_mode=self._parse_mode,
+                                                              parse_executor=self._parse_executor,
+                                                              crawl_state=self._crawl_state,
+                                                              profile_enricher=self._profile_enricher)
 
             return result
         except ScraperNotFoundError:
             raise
         except Exception as err:
             LOGGER.error(err)
+
+    async def stream(self):
+        async for result in self.iter_msg_from_url(base_url=self._url,
+                                                   msg_config=self._msg_config,
+                                                   is_stop_404=self._is_stop_404,
+                                                   topic_cache=self._topic_cache,
+                                                   parse_mode=self._parse_mode,
+                                                   parse_executor=self._parse_executor,
+                                                   crawl_state=self._crawl_state,
+                                                   profile_enricher=self._profile_enricher):
+            yield result
+
+    async def stream_records(self, *,
+                             page_info: dict or None = None,
+                             is_put_state: bool = True):
+        """Same messages as stream() as internal records, for consumers that never need the models.
+
+        With is_put_state False the page state is left in page_info['page_state'], sinks put it after a flush.
+        """
+
+        async for record in self.iter_records_from_url(base_url=self._url,
+                                                       msg_config=self._msg_config,
+                                                       is_stop_404=self._is_stop_404,
+                                                       topic_cache=self._topic_cache,
+                                                       parse_mode=self._parse_mode,
+                                                       parse_executor=self._parse_executor,
+                                                       crawl_state=self._crawl_state,
+                                                       profile_enricher=self._profile_enricher,
+                                                       page_info=page_info,
+                                                       is_put_state=is_put_state):
+            yield record
@@ -1,19 +1,27 @@
-from asyncio import to_thread as aio_to_thread
+from asyncio import (to_thread as aio_to_thread,
+                     as_completed as aio_as_completed,
+                     Semaphore as aio_Semaphore)
+from collections import defaultdict
 from logging import getLogger
-from src.Error.scraper_error import ScraperError, ScraperNotFoundError
-from bs4 import BeautifulSoup
-from asyncio import (gather as aio_gather)
+from src.Error.scraper_error import ScraperError, ScraperNotFoundError, ScraperNotModifiedError
+from hashlib import sha256
+from pydantic import ValidationError
+from src.Scraper.Parser.scraper_parser import ScraperParser, ScraperNode
 from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
 from src.Scraper.Operations.scraper_msg_operations import ScraperMsgOperations
+from src.Scraper.Operations.scraper_page_operations import ScraperPageOperations
+from src.Scraper.Operations.scraper_executor_operations import ScraperExecutorOperations
+from src.Scraper.Cache.scraper_cache import ScraperCache
+from src.Scraper.State.scraper_crawl_state import ScraperCrawlState
 from src.Scraper.Models.scraper_models import (ScraperMsgConfig,
                                                ScraperMsgResult,
-                                               ScraperUserResult,
-                                               ScraperUserMsgResult,
-                                               ScraperTopicResult)
-from re import (search as re_search,
-                escape as re_escape,
-                sub as re_sub,
-                I as re_I)
+                                               ScraperParseMode,
+                                               ScraperParseExecutor,
+                                               ScraperPageState)
+from src.Scraper.Models.scraper_records import ScraperMsgRecord, ScraperUserMsgRecord, ScraperRecordPool
+from src.Scraper.Metrics.scraper_metrics import ScraperMetrics
+from src.Scraper.Registry.scraper_extraction_plan import ScraperExtractionPlan
+from src.Scraper.Profile.scraper_profile_enricher import ScraperProfileEnricher
 
 LOGGER = getLogger()
 
@@ -21,262 +29,690 @@ LOGGER = getLogger()
 class ScraperOperations(ScraperHtmlOperations,
                         ScraperMsgOperations):
 
+    _MSG_CONCURRENCY = 16
+    _RECORD_POOL = ScraperRecordPool()
+
+    @staticmethod
+    def set_record_pool(record_pool: ScraperRecordPool) -> None:
+        ScraperOperations._RECORD_POOL = record_pool
+
     @staticmethod
     async def on_scraping_all_msg_from_url(*,
                                            base_url: str,
                                            msg_config: ScraperMsgConfig,
-                                           is_stop_404: bool) -> [ScraperMsgResult]:
+                                           is_stop_404: bool,
+                                           topic_cache: ScraperCache or None = None,
+                                           parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+                                           parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                                           crawl_state: ScraperCrawlState or None = None,
+                                           page_info: dict or None = None,
+                                           profile_enricher: ScraperProfileEnricher or None = None
+                                           ) -> [ScraperMsgResult]:
+        """page_info, when given, receives the discovered 'next_url' of the page, the stored one when not modified"""
+
+        records = await ScraperOperations.on_scraping_all_records_from_url(base_url=base_url,
+                                                                           msg_config=msg_config,
+                                                                           is_stop_404=is_stop_404,
+                                                                           topic_cache=topic_cache,
+                                                                           parse_mode=parse_mode,
+                                                                           parse_executor=parse_executor,
+                                                                           crawl_state=crawl_state,
+                                                                           page_info=page_info,
+                                                                           profile_enricher=profile_enricher)
+
         try:
-            html_content, isStop = await ScraperOperations.get_html_from_url(url=base_url,
-                                                                             is_stop_404=is_stop_404)
+            return [record.to_result() for record in records] if records is not None else None
+        except ValidationError as err:
+            # An invalid message fails the whole page, as an unparsed one does
+            LOGGER.error(err)
 
-            if isStop:
-                raise ScraperNotFoundError()
+    @staticmethod
+    async def iter_msg_from_url(*,
+                                base_url: str,
+                                msg_config: ScraperMsgConfig,
+                                is_stop_404: bool,
+                                topic_cache: ScraperCache or None = None,
+                                parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+                                parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                                crawl_state: ScraperCrawlState or None = None,
+                                profile_enricher: ScraperProfileEnricher or None = None):
+        """Yields messages as soon as each is resolved, not in page order, unparsed messages are logged and skipped"""
+
+        async for record in ScraperOperations.iter_records_from_url(base_url=base_url,
+                                                                    msg_config=msg_config,
+                                                                    is_stop_404=is_stop_404,
+                                                                    topic_cache=topic_cache,
+                                                                    parse_mode=parse_mode,
+                                                                    parse_executor=parse_executor,
+                                                                    crawl_state=crawl_state,
+                                                                    profile_enricher=profile_enricher):
+            result = ScraperOperations._to_result(record=record)
+
+            if result is not None:
+                yield result
 
-            if not html_content:
-                raise ScraperError(f"Not get html content from url - {base_url}")
+    @staticmethod
+    async def on_scraping_all_records_from_url(*,
+                                               base_url: str,
+                                               msg_config: ScraperMsgConfig,
+                                               is_stop_404: bool,
+                                               topic_cache: ScraperCache or None = None,
+                                               parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+                                               parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                                               crawl_state: ScraperCrawlState or None = None,
+                                               page_info: dict or None = None,
+                                               profile_enricher: ScraperProfileEnricher or None = None,
+                                               is_put_state: bool = True) -> [ScraperMsgRecord]:
+        """With is_put_state False page_info['page_state'] gets the state to put once the caller stored the records"""
+
+        page_state = None
 
-            base_obj = BeautifulSoup(html_content, r'html.parser')
+        try:
+            page_state = await ScraperOperations._get_page_state(url=base_url,
+                                                                 crawl_state=crawl_state)
+
+            html_content = await ScraperOperations._get_html_content(url=base_url,
+                                                                     is_stop_404=is_stop_404,
+                                                                     page_state=page_state)
+
+            topic_cache = topic_cache if topic_cache is not None else ScraperCache()
+
+            if parse_mode in (ScraperParseMode.PAGE, ScraperParseMode.STREAM):
+                result = await ScraperOperations._parse_page_from_html(html_content=html_content,
+                                                                       msg_config=msg_config,
+                                                                       url=base_url,
+                                                                       topic_cache=topic_cache,
+                                                                       parse_executor=parse_executor,
+                                                                       page_state=page_state,
+                                                                       page_info=page_info,
+                                                                       is_stream=parse_mode == ScraperParseMode.STREAM)
+            else:
+                with ScraperMetrics.time('parse'):
+                    base_obj = ScraperParser.from_backend(msg_config.parser).parse(html_content)
+
+                result = await ScraperOperations._parse_and_save_msg_contents_from_html(base_obj=base_obj,
+                                                                                        msg_config=msg_config,
+                                                                                        url=base_url,
+                                                                                        topic_cache=topic_cache,
+                                                                                        page_state=page_state,
+                                                                                        page_info=page_info)
 
-            result = await ScraperOperations._parse_and_save_msg_contents_from_html(base_obj=base_obj,
-                                                                                    msg_config=msg_config,
-                                                                                    url=base_url)
+            if result is not None and profile_enricher is not None:
+                result = await profile_enricher.enrich(records=result, msg_config=msg_config)
+
+            if result is not None:
+                await ScraperOperations._put_page_state(page_state=page_state,
+                                                        crawl_state=crawl_state,
+                                                        page_info=page_info,
+                                                        is_put_state=is_put_state)
 
             return result
 
+        except ScraperNotModifiedError:
+            await ScraperOperations._put_page_state(page_state=page_state,
+                                                    crawl_state=crawl_state,
+                                                    page_info=page_info,
+                                                    is_put_state=is_put_state)
+            ScraperOperations._set_next_url(next_url=page_state.next_url, page_info=page_info, page_state=None)
+            return []
         except ScraperNotFoundError:
             raise
         except (Exception, ScraperError) as err:
             LOGGER.error(err)
 
     @staticmethod
-    async def _parse_and_save_msg_contents_from_html(*,
-                                                     base_obj: BeautifulSoup,
-                                                     msg_config: ScraperMsgConfig,
-                                                     url: str) -> [ScraperMsgResult]:
-        result = None
+    async def iter_records_from_url(*,
+                                    base_url: str,
+                                    msg_config: ScraperMsgConfig,
+                                    is_stop_404: bool,
+                                    topic_cache: ScraperCache or None = None,
+                                    parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+                                    parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                                    crawl_state: ScraperCrawlState or None = None,
+                                    profile_enricher: ScraperProfileEnricher or None = None,
+                                    page_info: dict or None = None,
+                                    is_put_state: bool = True):
+        """page_info and is_put_state as in on_scraping_all_records_from_url, the state is set after the last record"""
+
+        page_state = None
 
         try:
-            msg_objs = await aio_to_thread(base_obj.find_all, class_=msg_config.msg_block_class_name)
-
-            result_objs = []
+            page_state = await ScraperOperations._get_page_state(url=base_url,
+                                                                 crawl_state=crawl_state)
+
+            html_content = await ScraperOperations._get_html_content(url=base_url,
+                                                                     is_stop_404=is_stop_404,
+                                                                     page_state=page_state)
+
+            topic_cache = topic_cache if topic_cache is not None else ScraperCache()
+
+            if parse_mode in (ScraperParseMode.PAGE, ScraperParseMode.STREAM):
+                results = ScraperOperations._iter_page_from_html(html_content=html_content,
+                                                                 msg_config=msg_config,
+                                                                 url=base_url,
+                                                                 topic_cache=topic_cache,
+                                                                 parse_executor=parse_executor,
+                                                                 is_strict=False,
+                                                                 page_state=page_state,
+                                                                 is_stream=parse_mode == ScraperParseMode.STREAM)
+            else:
+                with ScraperMetrics.time('parse'):
+                    base_obj = ScraperParser.from_backend(msg_config.parser).parse(html_content)
+
+                results = ScraperOperations._iter_msg_contents_from_html(base_obj=base_obj,
+                                                                         msg_config=msg_config,
+                                                                         url=base_url,
+                                                                         topic_cache=topic_cache,
+                                                                         is_strict=False,
+                                                                         page_state=page_state)
+
+            records = (result async for _, result in results)
+
+            if profile_enricher is not None:
+                records = profile_enricher.iter_enriched(records=records, msg_config=msg_config)
+
+            async for result in records:
+                yield result
+
+            await ScraperOperations._put_page_state(page_state=page_state,
+                                                    crawl_state=crawl_state,
+                                                    page_info=page_info,
+                                                    is_put_state=is_put_state)
+
+        except ScraperNotModifiedError:
+            await ScraperOperations._put_page_state(page_state=page_state,
+                                                    crawl_state=crawl_state,
+                                                    page_info=page_info,
+                                                    is_put_state=is_put_state)
+        except ScraperNotFoundError:
+            raise
+        except (Exception, ScraperError) as err:
+            LOGGER.error(err)
 
-            for index, obj in enumerate(msg_objs, start=1):
-                result = await ScraperOperations._parse_msg_to_text(base_url=url,
-                                                                    base_obj=base_obj,
-                                                                    msg_obj=obj,
-                                                                    msg_config=msg_config)
+    @staticmethod
+    async def _put_page_state(*,
+                              page_state: ScraperPageState or None,
+                              crawl_state: ScraperCrawlState or None,
+                              page_info: dict or None,
+                              is_put_state: bool) -> None:
+        if page_state is None:
+            return
 
-                if result:
-                    result_objs.append(result)
+        if page_info is not None:
+            page_info['page_state'] = page_state
 
-                else:
-                    raise ScraperError(f"Not parsed msg {index} from - {url}")
+        if is_put_state:
+            await crawl_state.put(state=page_state)
 
-            result = result_objs
+    @staticmethod
+    async def _get_page_state(*,
+                              url: str,
+                              crawl_state: ScraperCrawlState or None) -> ScraperPageState or None:
+        if crawl_state is None:
+            return None
 
-        except (Exception, ScraperError) as err:
-            LOGGER.error(err)
+        page_state = await crawl_state.get(url=url)
 
-        finally:
-            return result
+        return page_state if page_state is not None else ScraperPageState(url=url)
 
     @staticmethod
-    async def _parse_msg_to_text(*,
-                                 base_url: str,
-                                 base_obj: BeautifulSoup,
-                                 msg_obj: BeautifulSoup,
-                                 msg_config: ScraperMsgConfig
-                                 ) -> ScraperMsgResult:
+    async def _get_html_content(*,
+                                url: str,
+                                is_stop_404: bool,
+                                page_state: ScraperPageState or None = None) -> str:
+        headers = {}
+
+        if page_state is not None:
+            if page_state.etag:
+                headers['If-None-Match'] = page_state.etag
+            if page_state.last_modified:
+                headers['If-Modified-Since'] = page_state.last_modified
+
+        response, isStop = await ScraperOperations.get_response_from_url(url=url,
+                                                                         is_stop_404=is_stop_404,
+                                                                         headers=headers)
 
+        if isStop:
+            raise ScraperNotFoundError()
+
+        if response is not None and response.status_code == 304:
+            raise ScraperNotModifiedError()
+
+        if not response or not response.text:
+            raise ScraperError(f"Not get html content from url - {url}")
+
+        if page_state is not None:
+            content_hash = sha256(response.text.encode()).hexdigest()
+            is_modified = content_hash != page_state.content_hash
+
+            page_state.etag = response.headers.get('ETag', response.headers.get('etag'))
+            page_state.last_modified = response.headers.get('Last-Modified', response.headers.get('last-modified'))
+            page_state.content_hash = content_hash
+
+            # Servers without validators still send the same bytes for an unchanged thread
+            if not is_modified:
+                raise ScraperNotModifiedError()
+
+        return response.text
+
+    @staticmethod
+    async def _parse_page_from_html(*,
+                                    html_content: str,
+                                    msg_config: ScraperMsgConfig,
+                                    url: str,
+                                    topic_cache: ScraperCache,
+                                    parse_executor: ScraperParseExecutor,
+                                    page_state: ScraperPageState or None = None,
+                                    page_info: dict or None = None,
+                                    is_stream: bool = False) -> [ScraperMsgRecord]:
         result = None
 
         try:
+            result_objs = {}
 
-            # Msg
-            msg_text_obj = await aio_to_thread(msg_obj.find, class_=msg_config.msg_text_class_name)
-            answer_text = msg_text_obj.get_text().strip()
+            async for position, result_obj in ScraperOperations._iter_page_from_html(html_content=html_content,
+                                                                                     msg_config=msg_config,
+                                                                                     url=url,
+                                                                                     topic_cache=topic_cache,
+                                                                                     parse_executor=parse_executor,
+                                                                                     is_strict=True,
+                                                                                     page_state=page_state,
+                                                                                     page_info=page_info,
+                                                                                     is_stream=is_stream):
+                result_objs[position] = result_obj
 
-            # Quote
+            result = [result_objs[position] for position in sorted(result_objs)]
 
-            quote_objs = await aio_to_thread(msg_obj.find_all, msg_config.quote_block_name)
-            quote_patterns = [quote_obj.get_text().strip() for quote_obj in quote_objs] if len(
-                quote_objs) != 0 else None
+        except (Exception, ScraperError) as err:
+            LOGGER.error(err)
 
-            # Topic
+        return result
 
-            if msg_config.topic_link_patterns:
-                topic = await ScraperOperations.get_topic_from_msg(base_url=base_url,
-                                                                   topic_link_patterns=msg_config.topic_link_patterns,
-                                                                   msg_obj=msg_obj)
+    @staticmethod
+    async def _iter_page_from_html(*,
+                                   html_content: str,
+                                   msg_config: ScraperMsgConfig,
+                                   url: str,
+                                   topic_cache: ScraperCache,
+                                   parse_executor: ScraperParseExecutor,
+                                   is_strict: bool,
+                                   page_state: ScraperPageState or None = None,
+                                   page_info: dict or None = None,
+                                   is_stream: bool = False):
+        # Parsing and extraction of all messages are one worker call in page mode
+        with ScraperMetrics.time('parse'):
+            page = await ScraperExecutorOperations.run_in_executor(ScraperPageOperations.extract_page,
+                                                                   executor=parse_executor,
+                                                                   html=html_content,
+                                                                   base_url=url,
+                                                                   msg_config=msg_config,
+                                                                   is_stream=is_stream)
+
+        if not page:
+            ScraperMetrics.count('scraper_parse_failures_total', url=url)
+            raise ScraperError(f"Not parsed page from - {url}")
+
+        ScraperOperations._set_next_url(next_url=page['next_url'], page_info=page_info, page_state=page_state)
+
+        msgs = page['msgs']
+        topic_positions = defaultdict(list)
+
+        start_position = 0 if page_state is None else ScraperOperations._apply_page_watermark(msgs=msgs,
+                                                                                             page_state=page_state)
+
+        for position, msg in enumerate(msgs):
+            if position < start_position:
+                continue
+
+            if not msg:
+                ScraperMetrics.count('scraper_parse_failures_total', url=url)
+
+                if is_strict:
+                    raise ScraperError(f"Not parsed msg {position + 1} from - {url}")
+
+                LOGGER.error(f"Not parsed msg {position + 1} from - {url}")
+
+            elif msg['topic']:
+                topic_positions[msg['topic'][0]].append(position)
 
             else:
-                topic_name = await ScraperOperations.get_title_from_html(base_obj=base_obj)
+                yield position, ScraperOperations._to_msg_record(msg=msg,
+                                                                 answer_text=msg['text'],
+                                                                 questions=None)
+
+        async def load_topic_index(topic_url: str) -> (str, [dict] or None):
+            if not msg_config.topic_link_patterns:
+                return topic_url, page['index']
+
+            return topic_url, await ScraperOperations._get_topic_index(topic_url=topic_url,
+                                                                       base_url=url,
+                                                                       msg_config=msg_config,
+                                                                       topic_cache=topic_cache,
+                                                                       parse_executor=parse_executor,
+                                                                       is_stream=is_stream)
+
+        # Messages of a topic are matched as soon as its index is loaded
+        for topic_load in aio_as_completed([load_topic_index(topic_url) for topic_url in topic_positions]):
+            topic_url, topic_index = await topic_load
+
+            if topic_index is None:
+                if is_strict:
+                    raise ScraperError(f"Not get topic index from url - {topic_url}")
+
+                LOGGER.error(f"Not get topic index from url - {topic_url}")
+                continue
+
+            positions = topic_positions[topic_url]
+
+            with ScraperMetrics.time('match'):
+                searched_results = await ScraperExecutorOperations.run_in_executor(
+                    ScraperPageOperations.match_page,
+                    executor=parse_executor,
+                    msgs=[msgs[position] for position in positions],
+                    topic_indexes={topic_url: topic_index})
+
+            for position, (answer_text, questions) in zip(positions, searched_results):
+                yield position, ScraperOperations._to_msg_record(msg=msgs[position],
+                                                                 answer_text=answer_text,
+                                                                 questions=questions)
 
-                topic = ScraperTopicResult(url=base_url,
-                                           name=topic_name)
+    @staticmethod
+    def _set_next_url(*,
+                      next_url: str or None,
+                      page_info: dict or None,
+                      page_state: ScraperPageState or None) -> None:
+        if page_info is not None:
+            page_info['next_url'] = next_url
 
-            # Date
-            date = await ScraperOperations.get_date_from_msg(msg_obj=msg_obj,
-                                                             date_pattern=msg_config.date_pattern)
+        if page_state is not None:
+            page_state.next_url = next_url
 
-            # User
-            answer_user: ScraperUserResult = await ScraperOperations.get_user_from_msg(msg_obj=msg_obj,
-                                                                                       base_url=base_url,
-                                                                                       user_config=msg_config.user_config)
+    @staticmethod
+    def _apply_page_watermark(*,
+                              msgs: [dict],
+                              page_state: ScraperPageState) -> int:
+        """Moves the watermark to the last message of the page, returns the position of the first new one"""
 
-            # Search questions and full answer
-            questions = None
+        keys = [ScraperOperations.get_msg_key(topic_url=msg['topic'][0] if msg['topic'] else None,
+                                              user_url=msg['user'][0] if msg['user'] else None,
+                                              date=msg['date'],
+                                              text=msg['text']) if msg else None for msg in msgs]
 
-            if topic:
-                if msg_config.topic_link_patterns:
-                    topic_html_content, _ = await ScraperOperations.get_html_from_url(url=topic.url,
-                                                                                      is_stop_404=False)
-                    topic_obj = BeautifulSoup(topic_html_content, 'html.parser')
-                else:
-                    topic_obj = base_obj
+        start_position = 0
 
-                searched_result = await ScraperOperations._search_questions_from_topic(base_url=base_url,
-                                                                                       topic_obj=topic_obj,
-                                                                                       searching_msg_pattern=answer_text,
-                                                                                       searching_quote_patterns=quote_patterns,
-                                                                                       msg_config=msg_config)
-                if searched_result:
-                    answer_text, questions = searched_result
+        # Unparsed messages have no key, a fresh state must not match them
+        if page_state.last_msg_key is not None and page_state.last_msg_key in keys:
+            start_position = keys.index(page_state.last_msg_key) + 1
 
-            result = ScraperMsgResult(date=date,
-                                      topic=topic,
-                                      answer=ScraperUserMsgResult(user=answer_user,
-                                                                  text=answer_text),
-                                      questions=questions)
-        except Exception as err:
-            LOGGER.error(err)
+        elif page_state.last_msg_date is not None:
+            # Edited or removed watermark message, fall back to dates where the forum exposes them
+            for position, msg in enumerate(msgs):
+                if msg and msg['parsed_date'] and msg['parsed_date'] <= page_state.last_msg_date:
+                    start_position = position + 1
 
-        finally:
-            return result
+        parsed_dates = [msg['parsed_date'] for msg in msgs if msg and msg['parsed_date']]
+        last_keys = [key for key in keys if key]
+
+        page_state.last_msg_key = last_keys[-1] if last_keys else page_state.last_msg_key
+        page_state.last_msg_date = max(parsed_dates) if parsed_dates else page_state.last_msg_date
+
+        return start_position
 
     @staticmethod
-    async def _search_questions_from_topic(*,
-                                           base_url: str,
-                                           topic_obj: BeautifulSoup,
-                                           searching_msg_pattern: str,
-                                           searching_quote_patterns: [str] or None,
-                                           msg_config: ScraperMsgConfig) -> (str,
-                                                                             ScraperUserMsgResult) or None:
+    def _apply_msg_objs_watermark(*,
+                                  msg_objs: [ScraperNode],
+                                  url: str,
+                                  msg_config: ScraperExtractionPlan,
+                                  page_state: ScraperPageState) -> int:
+        """_apply_page_watermark for msg mode, the keys are the same as in page mode"""
+
+        msgs = [ScraperPageOperations.extract_msg(msg_obj=msg_obj,
+                                                  base_url=url,
+                                                  msg_config=msg_config) for msg_obj in msg_objs]
+
+        # Only the url of the page topic is part of the key, its name is not needed
+        if not msg_config.topic_link_patterns:
+            for msg in msgs:
+                if msg:
+                    msg['topic'] = (url, None)
+
+        return ScraperOperations._apply_page_watermark(msgs=msgs, page_state=page_state)
+
+    @staticmethod
+    def _to_result(*, record: ScraperMsgRecord) -> ScraperMsgResult or None:
         result = None
 
         try:
-            searching_patterns = [searching_msg_pattern]
-
-            if searching_quote_patterns:
-                searching_patterns.extend(searching_quote_patterns)
-
-            searching_msg_pattern, searching_quote_patterns = await ScraperOperations._validate_searching_patterns(
-                patterns=searching_patterns)
-
-            msg_objs = await aio_to_thread(topic_obj.find_all, class_=msg_config.msg_block_class_name)
-
-            answer_text_index, answer_text, questions = await ScraperOperations._search_quote_questions_from_msgs(
-                base_url=base_url,
-                msg_objs=msg_objs,
-                msg_config=msg_config,
-                msg_pattern=searching_msg_pattern,
-                quote_patterns=searching_quote_patterns)
-            if answer_text_index:
-                if len(questions) == 0 and answer_text_index >= 1:
-                    previous_msg_obj = msg_objs[answer_text_index - 1]
-                    previous_msg_text_obj = await aio_to_thread(previous_msg_obj.find,
-                                                                class_=msg_config.msg_text_class_name)
-
-                    question_text = previous_msg_text_obj.get_text().strip()
-                    question_user = await ScraperOperations.get_user_from_msg(msg_obj=previous_msg_obj,
-                                                                              base_url=base_url,
-                                                                              user_config=msg_config.user_config)
-                    question = ScraperUserMsgResult(user=question_user,
-                                                    text=question_text)
-                    questions.append(question)
-
-            result = (answer_text if answer_text else searching_msg_pattern,
-                      questions if len(questions) != 0 else None)
-
-        except Exception as err:
+            result = record.to_result()
+        except ValidationError as err:
             LOGGER.error(err)
 
-        finally:
-            return result
+        return result
+
+    @staticmethod
+    def _to_msg_record(*,
+                       msg: dict,
+                       answer_text: str,
+                       questions: [dict] or None) -> ScraperMsgRecord:
+        record_pool = ScraperOperations._RECORD_POOL
+
+        return ScraperMsgRecord(date=msg['date'],
+                                parsed_date=msg['parsed_date'],
+                                topic=record_pool.get_topic(msg['topic']),
+                                answer=ScraperUserMsgRecord(user=record_pool.get_user(msg['user']),
+                                                            text=answer_text),
+                                questions=[ScraperUserMsgRecord(user=record_pool.get_user(question['user']),
+                                                                text=question['text']) for question in questions]
+                                if questions else None)
 
     @staticmethod
-    async def _validate_searching_patterns(*, patterns: [str]):
+    async def _parse_and_save_msg_contents_from_html(*,
+                                                     base_obj: ScraperNode,
+                                                     msg_config: ScraperMsgConfig,
+                                                     url: str,
+                                                     topic_cache: ScraperCache,
+                                                     page_state: ScraperPageState or None = None,
+                                                     page_info: dict or None = None
+                                                     ) -> [ScraperMsgRecord]:
         result = None
 
         try:
-            validated_patterns = []
-
-            for pattern in patterns:
-                text = pattern[:pattern.rfind('…')] if pattern.endswith('…') else pattern
-                text = re_escape(re_sub(r'\s+', '', text))
+            result_objs = {}
 
-                validated_patterns.append(text)
+            async for position, result_obj in ScraperOperations._iter_msg_contents_from_html(base_obj=base_obj,
+                                                                                             msg_config=msg_config,
+                                                                                             url=url,
+                                                                                             topic_cache=topic_cache,
+                                                                                             is_strict=True,
+                                                                                             page_state=page_state,
+                                                                                             page_info=page_info):
+                result_objs[position] = result_obj
 
-            result = validated_patterns[0], validated_patterns[1:] if len(validated_patterns) > 1 else None
+            result = [result_objs[position] for position in sorted(result_objs)]
 
-        except Exception as err:
+        except (Exception, ScraperError) as err:
             LOGGER.error(err)
 
-        finally:
-            return result
+        return result
 
     @staticmethod
-    async def _search_quote_questions_from_msgs(*,
-                                                base_url: str,
-                                                msg_objs: [BeautifulSoup],
-                                                msg_config: ScraperMsgConfig,
-                                                msg_pattern: str,
-                                                quote_patterns: [str] or None
-                                                ):
-        answer_text_index = None
-        answer_text = None
-        questions = []
+    async def _iter_msg_contents_from_html(*,
+                                           base_obj: ScraperNode,
+                                           msg_config: ScraperMsgConfig,
+                                           url: str,
+                                           topic_cache: ScraperCache,
+                                           is_strict: bool,
+                                           page_state: ScraperPageState or None = None,
+                                           page_info: dict or None = None):
+        msg_config = ScraperExtractionPlan.get(msg_config)
+        msg_objs = await aio_to_thread(base_obj.find_all_by_class, msg_config.msg_block_class_name)
+
+        if page_info is not None or page_state is not None:
+            ScraperOperations._set_next_url(next_url=await aio_to_thread(
+                ScraperOperations.parse_next_page_url_from_html,
+                base_obj=base_obj,
+                base_url=url,
+                next_page_class_name=msg_config.next_page_class_name),
+                page_info=page_info,
+                page_state=page_state)
+
+        start_position = 0 if page_state is None else await aio_to_thread(
+            ScraperOperations._apply_msg_objs_watermark,
+            msg_objs=msg_objs,
+            url=url,
+            msg_config=msg_config,
+            page_state=page_state)
+
+        # The page itself is the topic when topics are not linked from messages
+        page_index = None if msg_config.topic_link_patterns else await aio_to_thread(
+            ScraperPageOperations.build_topic_index,
+            msg_objs=msg_objs,
+            base_url=url,
+            msg_config=msg_config)
+
+        semaphore = aio_Semaphore(ScraperOperations._MSG_CONCURRENCY)
+
+        async def parse_msg(position: int, msg_obj: ScraperNode) -> (int, ScraperMsgRecord):
+            async with semaphore:
+                with ScraperMetrics.time('extract_msg'):
+                    return position, await ScraperOperations._parse_msg_to_text(base_url=url,
+                                                                                base_obj=base_obj,
+                                                                                msg_obj=msg_obj,
+                                                                                msg_config=msg_config,
+                                                                                page_index=page_index,
+                                                                                topic_cache=topic_cache)
+
+        for parsed_msg in aio_as_completed([parse_msg(position, obj) for position, obj in enumerate(msg_objs)
+                                            if position >= start_position]):
+            position, result_obj = await parsed_msg
+
+            if not result_obj:
+                ScraperMetrics.count('scraper_parse_failures_total', url=url)
+
+                if is_strict:
+                    raise ScraperError(f"Not parsed msg {position + 1} from - {url}")
+
+                LOGGER.error(f"Not parsed msg {position + 1} from - {url}")
+                continue
+
+            yield position, result_obj
+
+    @staticmethod
+    async def _parse_msg_to_text(*,
+                                 base_url: str,
+                                 base_obj: ScraperNode,
+                                 msg_obj: ScraperNode,
+                                 msg_config: ScraperExtractionPlan,
+                                 page_index: [dict] or None,
+                                 topic_cache: ScraperCache
+                                 ) -> ScraperMsgRecord:
+
+        result = None
 
         try:
-            for index, msg_obj in enumerate(msg_objs):
-                msg_text_obj = await aio_to_thread(msg_obj.find, class_=msg_config.msg_text_class_name)
-                msg_text = msg_text_obj.get_text().strip()
-
-                if quote_patterns:
-                    quote_objs = await aio_to_thread(msg_obj.find_all, msg_config.quote_block_name)
-                    quote_text = " ".join([obj.get_text().strip() for obj in quote_objs])
-
-                    quote_results = await aio_gather(
-                        *[aio_to_thread(re_search, pattern, re_sub(r'\s+', '', quote_text), re_I) for pattern in
-                          quote_patterns])
-
-                    text_results = await aio_gather(
-                        *[aio_to_thread(re_search, pattern, re_sub(r'\s+', '', msg_text), re_I) for pattern in
-                          quote_patterns])
-
-                    if all(quote_results):
-                        answer_text_index = index
-                        answer_text = msg_text
-
-                    elif any(text_results):
-                        question_text = msg_text
-                        question_user = await ScraperOperations.get_user_from_msg(msg_obj=msg_obj,
-                                                                                  base_url=base_url,
-                                                                                  user_config=msg_config.user_config)
-                        question = ScraperUserMsgResult(user=question_user,
-                                                        text=question_text)
-                        questions.append(question)
+
+            # Msg
+            msg_text_obj = await aio_to_thread(msg_obj.find_by_class, msg_config.msg_text_class_name)
+            answer_text = msg_text_obj.get_text().strip()
+
+            # Quote
+
+            quote_objs = await aio_to_thread(msg_obj.find_all_by_tag, msg_config.quote_block_name)
+            quote_texts = [quote_obj.get_text().strip() for quote_obj in quote_objs]
+
+            # Topic
+
+            if msg_config.topic_link_patterns:
+                topic = await aio_to_thread(ScraperOperations.parse_topic_from_msg,
+                                            base_url=base_url,
+                                            topic_link_patterns=msg_config.topic_link_regexes,
+                                            msg_obj=msg_obj)
+
+            else:
+                topic_name = await ScraperOperations.get_title_from_html(base_obj=base_obj)
+
+                topic = (base_url, topic_name)
+
+            # Date
+            date = await ScraperOperations.get_date_from_msg(msg_obj=msg_obj,
+                                                             date_pattern=msg_config.date_regex,
+                                                             date_config=msg_config.date_config)
+
+            # User
+            answer_user = await aio_to_thread(ScraperOperations.parse_user_from_msg,
+                                              msg_obj=msg_obj,
+                                              base_url=base_url,
+                                              user_config=msg_config.user_config)
+
+            # Search questions and full answer
+            questions = None
+
+            if topic:
+                if msg_config.topic_link_patterns:
+                    topic_index = await ScraperOperations._get_topic_index(topic_url=topic[0],
+                                                                           base_url=base_url,
+                                                                           msg_config=msg_config,
+                                                                           topic_cache=topic_cache)
                 else:
-                    searched_result = await aio_to_thread(re_search, msg_pattern, re_sub(r'\s+', '', msg_text),
-                                                          re_I)
+                    topic_index = page_index
 
-                    if searched_result:
-                        answer_text_index = index
-                        answer_text = msg_text
+                if topic_index is None:
+                    raise ScraperError(f"Not get topic index from url - {topic[0]}")
 
+                with ScraperMetrics.time('match'):
+                    searched_result = await aio_to_thread(ScraperPageOperations.search_questions_in_index,
+                                                          topic_index=topic_index,
+                                                          msg_text=answer_text,
+                                                          quote_texts=quote_texts)
+                if searched_result:
+                    answer_text, questions = searched_result
+
+            result = ScraperOperations._to_msg_record(msg={'date': date,
+                                                           'parsed_date': ScraperOperations.parse_datetime(
+                                                               date=date,
+                                                               date_format=msg_config.date_format),
+                                                           'topic': topic,
+                                                           'user': answer_user},
+                                                      answer_text=answer_text,
+                                                      questions=questions)
         except Exception as err:
             LOGGER.error(err)
 
-        finally:
-            return answer_text_index, answer_text, questions
+        return result
+
+    @staticmethod
+    async def _get_topic_index(*,
+                               topic_url: str,
+                               base_url: str,
+                               msg_config: ScraperMsgConfig,
+                               topic_cache: ScraperCache,
+                               parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                               is_stream: bool = False) -> [dict] or None:
+
+        is_loaded = False
+
+        async def load_topic_index():
+            nonlocal is_loaded
+            is_loaded = True
+
+            topic_html_content, _ = await ScraperOperations.get_html_from_url(url=topic_url,
+                                                                              is_stop_404=False)
+            if not topic_html_content:
+                return None
+
+            return await ScraperExecutorOperations.run_in_executor(ScraperPageOperations.extract_topic_index,
+                                                                   executor=parse_executor,
+                                                                   html=topic_html_content,
+                                                                   base_url=base_url,
+                                                                   msg_config=msg_config,
+                                                                   is_stream=is_stream)
+
+        with ScraperMetrics.time('topic_lookup'):
+            result = await topic_cache.get_or_load(key=topic_url,
+                                                   loader=load_topic_index)
+
+        # Waiting on a load already in flight counts as a hit
+        ScraperMetrics.count('scraper_topic_cache_misses_total' if is_loaded else 'scraper_topic_cache_hits_total',
+                             url=topic_url)
+
+        return result
@@ -0,0 +1,210 @@
+from asyncio import (Condition as aio_Condition,
+                     Event as aio_Event,
+                     create_task as aio_create_task,
+                     gather as aio_gather,
+                     iscoroutinefunction)
+from collections import defaultdict
+from heapq import heappush, heappop
+from itertools import count
+from logging import getLogger
+from urllib.parse import urlparse
+from src.Scraper.scraper import Scraper
+from src.Scraper.Cache.scraper_cache import ScraperCache
+from src.Scraper.Sink.scraper_sink import ScraperSink
+from src.Scraper.State.scraper_crawl_state import ScraperCrawlState
+from src.Scraper.Profile.scraper_profile_enricher import ScraperProfileEnricher
+from src.Scraper.Registry.scraper_site_registry import ScraperSiteRegistry
+from src.Scraper.Models.scraper_models import (ScraperCrawlJob,
+                                               ScraperMsgConfig,
+                                               ScraperMsgResult,
+                                               ScraperParseMode,
+                                               ScraperParseExecutor)
+from src.Error.scraper_error import ScraperNotFoundError
+
+LOGGER = getLogger()
+
+
+class ScraperScheduler:
+    """Crawls queued jobs with concurrency workers, at most per_host_concurrency at a time per host.
+
+    Jobs wait in one heap per host, so a saturated host does not hold workers or reorder the rest: a worker
+    takes the job with the lowest priority value among hosts with a free slot. queue_size bounds all waiting
+    jobs together, put() blocks while it is reached.
+    """
+
+    def __init__(self, *,
+                 concurrency: int = 16,
+                 per_host_concurrency: int = 4,
+                 queue_size: int = 1000,
+                 topic_cache: ScraperCache or None = None,
+                 parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+                 parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                 sink: ScraperSink or None = None,
+                 crawl_state: ScraperCrawlState or None = None,
+                 registry: ScraperSiteRegistry or None = None,
+                 profile_enricher: ScraperProfileEnricher or None = None,
+                 on_result=None):
+
+        self._concurrency = concurrency
+        self._per_host_concurrency = per_host_concurrency
+        self._queue_size = queue_size
+        self._topic_cache = topic_cache if topic_cache is not None else ScraperCache()
+        self._parse_mode = parse_mode
+        self._parse_executor = parse_executor
+        self._sink = sink
+        self._crawl_state = crawl_state
+        self._registry = registry if registry is not None else ScraperSiteRegistry()
+        self._profile_enricher = profile_enricher
+        self._on_result = on_result
+
+        self._counter = count()
+        self._range_counter = count()
+        self._stopped_ranges = set()
+        self._host_active = defaultdict(int)
+        self._host_jobs = defaultdict(list)
+        self._queued_count = 0
+        self._unfinished_count = 0
+        self._condition = aio_Condition()
+        self._finished = aio_Event()
+        self._finished.set()
+        self._workers = []
+
+        self.results: dict[str, list[ScraperMsgResult]] = {}
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.join()
+        else:
+            await self.stop()
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [aio_create_task(self._worker()) for _ in range(self._concurrency)]
+
+    async def put(self, job: ScraperCrawlJob) -> None:
+        # Lower priority value is crawled first, blocks while the queue is full
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._queue_size <= 0 or self._queued_count < self._queue_size)
+
+            heappush(self._host_jobs[urlparse(job.url).netloc], (job.priority, next(self._counter), job))
+
+            self._queued_count += 1
+            self._unfinished_count += 1
+            self._finished.clear()
+            self._condition.notify_all()
+
+    async def put_page_range(self, *,
+                             url_template: str,
+                             start_page: int,
+                             end_page: int,
+                             msg_config: ScraperMsgConfig or None = None,
+                             site: str or None = None,
+                             is_stop_404: bool = True,
+                             priority: int = 0) -> None:
+        range_id = next(self._range_counter)
+
+        for page in range(start_page, end_page + 1):
+            if range_id in self._stopped_ranges:
+                break
+
+            await self.put(ScraperCrawlJob(url=url_template.format(page=page),
+                                           msg_config=msg_config,
+                                           site=site,
+                                           is_stop_404=is_stop_404,
+                                           priority=priority,
+                                           range_id=range_id))
+
+    async def join(self) -> None:
+        await self._finished.wait()
+        await self.stop()
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+
+        await aio_gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        while 1:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._get_ready_host() is not None)
+
+                host = self._get_ready_host()
+                _, _, job = heappop(self._host_jobs[host])
+
+                if not self._host_jobs[host]:
+                    del self._host_jobs[host]
+
+                self._queued_count -= 1
+                self._host_active[host] += 1
+                self._condition.notify_all()
+
+            try:
+                await self._process(job=job)
+
+            except Exception as err:
+                LOGGER.error(err)
+
+            finally:
+                self._host_active[host] -= 1
+                self._unfinished_count -= 1
+
+                if not self._unfinished_count:
+                    self._finished.set()
+
+                async with self._condition:
+                    self._condition.notify_all()
+
+    def _get_ready_host(self) -> str or None:
+        # The host of the first job in priority order among hosts with a free slot
+        ready_hosts = [host for host in self._host_jobs
+                       if self._host_active[host] < self._per_host_concurrency]
+
+        return min(ready_hosts, key=lambda host: self._host_jobs[host][0][:2], default=None)
+
+    async def _process(self, *, job: ScraperCrawlJob) -> None:
+        if job.range_id is not None and job.range_id in self._stopped_ranges:
+            return
+
+        scraper = Scraper(url=job.url,
+                          msg_config=self._registry.get_msg_config(job=job),
+                          is_stop_404=job.is_stop_404,
+                          topic_cache=self._topic_cache,
+                          parse_mode=self._parse_mode,
+                          parse_executor=self._parse_executor,
+                          crawl_state=self._crawl_state,
+                          profile_enricher=self._profile_enricher)
+        try:
+            if self._sink is not None:
+                page_info = {}
+
+                async for record in scraper.stream_records(page_info=page_info, is_put_state=False):
+                    await self._sink.write(record)
+
+                # The watermark moves past the messages only once they are stored
+                if page_info.get('page_state') is not None:
+                    await self._sink.flush()
+                    await self._crawl_state.put(state=page_info['page_state'])
+
+                return
+
+            result = await scraper.run()
+        except ScraperNotFoundError:
+            if job.range_id is not None:
+                self._stopped_ranges.add(job.range_id)
+            return
+
+        if result is None:
+            return
+
+        if self._on_result is None:
+            self.results[job.url] = result
+        elif iscoroutinefunction(self._on_result):
+            await self._on_result(job, result)
+        else:
+            self._on_result(job, result)
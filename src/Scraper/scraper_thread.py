@@ -0,0 +1,181 @@
+from asyncio import (create_task as aio_create_task,
+                     gather as aio_gather)
+from collections import deque
+from logging import getLogger
+from urllib.parse import urlparse
+from src.Scraper.scraper_operations import ScraperOperations
+from src.Scraper.Cache.scraper_cache import ScraperCache
+from src.Scraper.State.scraper_crawl_state import ScraperCrawlState
+from src.Scraper.Profile.scraper_profile_enricher import ScraperProfileEnricher
+from src.Scraper.Models.scraper_models import (ScraperMsgConfig,
+                                               ScraperMsgResult,
+                                               ScraperParseMode,
+                                               ScraperParseExecutor)
+from src.Scraper.Models.scraper_records import ScraperMsgRecord
+from src.Error.scraper_error import ScraperError, ScraperNotFoundError
+
+LOGGER = getLogger()
+
+
+class ScraperThreadCrawler(ScraperOperations):
+    """Crawls every page of a thread in page order.
+
+    With url_template ("...?page={page}") the next pages are fetched speculatively, prefetch at a time,
+    the thread ends on a 404, an empty page or a page repeating the previous one, pages fetched past
+    the end are cancelled. A failed page is skipped, the thread ends after max_failed_pages failed pages
+    in a row or once the circuit of the host is open. With start_url the next page link
+    (msg_config.next_page_class_name or rel="next") is followed one page at a time, with crawl_state
+    the link stored with a not modified page.
+    """
+
+    def __init__(self, *,
+                 msg_config: ScraperMsgConfig,
+                 url_template: str or None = None,
+                 start_url: str or None = None,
+                 start_page: int = 1,
+                 prefetch: int = 3,
+                 max_pages: int or None = None,
+                 max_failed_pages: int = 3,
+                 topic_cache: ScraperCache or None = None,
+                 parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+                 parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                 crawl_state: ScraperCrawlState or None = None,
+                 profile_enricher: ScraperProfileEnricher or None = None):
+
+        if (url_template is None) == (start_url is None):
+            raise ScraperError("Either url_template or start_url is required")
+
+        self._msg_config = msg_config
+        self._url_template = url_template
+        self._start_url = start_url
+        self._start_page = start_page
+        self._prefetch = max(prefetch, 1)
+        self._max_pages = max_pages
+        self._max_failed_pages = max(max_failed_pages, 1)
+        self._topic_cache = topic_cache if topic_cache is not None else ScraperCache()
+        self._parse_mode = parse_mode
+        self._parse_executor = parse_executor
+        self._crawl_state = crawl_state
+        self._profile_enricher = profile_enricher
+
+    async def run(self) -> [ScraperMsgResult]:
+        result = []
+
+        async for msg in self.stream():
+            result.append(msg)
+
+        return result
+
+    async def stream(self):
+        async for record in self.stream_records():
+            result = self._to_result(record=record)
+
+            if result is not None:
+                yield result
+
+    async def stream_records(self):
+        pages = self._iter_template_pages() if self._url_template is not None else self._iter_linked_pages()
+
+        try:
+            async for page in pages:
+                for record in page:
+                    yield record
+        finally:
+            await pages.aclose()
+
+    async def _iter_template_pages(self):
+        tasks = deque()
+        next_page = self._start_page
+        last_page = self._start_page + self._max_pages - 1 if self._max_pages is not None else None
+        prev_key = None
+        failed_pages = 0
+
+        try:
+            while True:
+                while len(tasks) < self._prefetch and (last_page is None or next_page <= last_page):
+                    url = self._url_template.format(page=next_page)
+                    tasks.append(aio_create_task(self._get_page(url=url)))
+                    next_page += 1
+
+                if not tasks:
+                    break
+
+                try:
+                    page = await tasks.popleft()
+                except ScraperNotFoundError:
+                    break
+
+                if page is None:
+                    failed_pages += 1
+
+                    # Failure is already logged, the following pages are worth a try unless the host is down
+                    if failed_pages >= self._max_failed_pages or self._is_circuit_open():
+                        LOGGER.error(f"Thread crawl ended after {failed_pages} failed pages - {self._url_template}")
+                        break
+
+                    continue
+
+                failed_pages = 0
+
+                # Not modified pages come back empty when crawl_state is used
+                if not page and self._crawl_state is None:
+                    break
+
+                page_key = self._get_page_key(page=page)
+
+                if page and page_key == prev_key:
+                    # Forums often answer a page past the end with the last page again
+                    break
+
+                prev_key = page_key
+
+                yield page
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await aio_gather(*tasks, return_exceptions=True)
+
+    async def _iter_linked_pages(self):
+        url = self._start_url
+        visited = set()
+
+        while url and url not in visited and (self._max_pages is None or len(visited) < self._max_pages):
+            visited.add(url)
+            page_info = {}
+
+            try:
+                page = await self._get_page(url=url, page_info=page_info)
+            except ScraperNotFoundError:
+                break
+
+            if page:
+                yield page
+
+            url = page_info.get('next_url')
+
+    async def _get_page(self, *, url: str, page_info: dict or None = None) -> [ScraperMsgRecord]:
+        return await self.on_scraping_all_records_from_url(base_url=url,
+                                                           msg_config=self._msg_config,
+                                                           is_stop_404=True,
+                                                           topic_cache=self._topic_cache,
+                                                           parse_mode=self._parse_mode,
+                                                           parse_executor=self._parse_executor,
+                                                           crawl_state=self._crawl_state,
+                                                           page_info=page_info,
+                                                           profile_enricher=self._profile_enricher)
+
+    def _is_circuit_open(self) -> bool:
+        circuit_breaker = ScraperOperations.get_circuit_breaker()
+        host = urlparse(self._url_template or self._start_url).netloc
+
+        return circuit_breaker is not None and circuit_breaker.is_open(host=host)
+
+    @staticmethod
+    def _get_page_key(*, page: [ScraperMsgRecord]) -> tuple:
+        # Without topic links the topic is the page itself, so it differs for a repeated page
+        return tuple(ScraperOperations.get_msg_key(topic_url=None,
+                                                   user_url=msg.answer.user.url if msg.answer and msg.answer.user else None,
+                                                   date=msg.date,
+                                                   text=msg.answer.text if msg.answer else None) for msg in page)
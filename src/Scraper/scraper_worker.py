@@ -0,0 +1,204 @@
+from argparse import ArgumentParser
+from asyncio import (run as aio_run,
+                     create_task as aio_create_task,
+                     gather as aio_gather,
+                     sleep as aio_sleep)
+from logging import getLogger
+from os import getpid
+from socket import gethostname
+from uuid import uuid4
+from src.Scraper.scraper_operations import ScraperOperations
+from src.Scraper.Cache.scraper_cache import ScraperCache
+from src.Scraper.Queue.scraper_queue import ScraperQueue
+from src.Scraper.Queue.scraper_sqlite_queue import ScraperSqliteQueue
+from src.Scraper.Sink.scraper_sink import ScraperSink
+from src.Scraper.Sink.scraper_sqlite_sink import ScraperSqliteSink
+from src.Scraper.State.scraper_crawl_state import ScraperCrawlState
+from src.Scraper.Profile.scraper_profile_enricher import ScraperProfileEnricher
+from src.Scraper.Registry.scraper_site_registry import ScraperSiteRegistry
+from src.Scraper.Models.scraper_models import (ScraperCrawlJob,
+                                               ScraperParseMode,
+                                               ScraperParseExecutor,
+                                               ScraperQueueLease)
+from src.Error.scraper_error import ScraperNotFoundError
+
+LOGGER = getLogger()
+
+
+class ScraperWorker(ScraperOperations):
+    """Crawls jobs leased from a shared ScraperQueue into a sink, any number of workers may share the queue.
+
+    A job is acked, and its page state put, only after its messages are flushed to the sink, a failed job is
+    retried with exponential backoff. A job whose lease expired may be crawled twice, so the sink must be
+    idempotent - ScraperSqliteSink ignores messages it already has by msg_key.
+    """
+
+    def __init__(self, *,
+                 queue: ScraperQueue,
+                 sink: ScraperSink,
+                 worker_id: str or None = None,
+                 concurrency: int = 4,
+                 lease_seconds: float = 60,
+                 registry: ScraperSiteRegistry or None = None,
+                 topic_cache: ScraperCache or None = None,
+                 parse_mode: ScraperParseMode = ScraperParseMode.PAGE,
+                 parse_executor: ScraperParseExecutor = ScraperParseExecutor.THREAD,
+                 crawl_state: ScraperCrawlState or None = None,
+                 profile_enricher: ScraperProfileEnricher or None = None,
+                 poll_interval: float = 1.0,
+                 retry_delay: float = 5.0,
+                 is_drain: bool = False):
+
+        self._queue = queue
+        self._sink = sink
+        self._worker_id = worker_id or f'{gethostname()}-{getpid()}-{uuid4().hex[:8]}'
+        self._concurrency = concurrency
+        self._lease_seconds = lease_seconds
+        self._registry = registry if registry is not None else ScraperSiteRegistry()
+        self._topic_cache = topic_cache if topic_cache is not None else ScraperCache()
+        self._parse_mode = parse_mode
+        self._parse_executor = parse_executor
+        self._crawl_state = crawl_state
+        self._profile_enricher = profile_enricher
+        self._poll_interval = poll_interval
+        self._retry_delay = retry_delay
+        self._is_drain = is_drain
+
+        self._is_stopped = False
+
+    async def run(self) -> None:
+        """Works until stop(), or with is_drain until no job is waiting or in progress"""
+
+        self._is_stopped = False
+
+        try:
+            await aio_gather(*[self._work() for _ in range(self._concurrency)])
+        finally:
+            await self._sink.flush()
+
+    def stop(self) -> None:
+        """Leased jobs are finished first"""
+
+        self._is_stopped = True
+
+    async def _work(self) -> None:
+        while not self._is_stopped:
+            lease = await self._queue.lease(owner=self._worker_id, lease_seconds=self._lease_seconds)
+
+            if lease is None:
+                if self._is_drain and await self._queue.is_empty():
+                    return
+
+                await aio_sleep(self._poll_interval)
+                continue
+
+            try:
+                await self._process(lease=lease)
+            except Exception as err:
+                LOGGER.error(err)
+
+    async def _process(self, *, lease: ScraperQueueLease) -> None:
+        heartbeat = aio_create_task(self._heartbeat(lease=lease))
+        records, error = None, None
+        page_info = {}
+
+        try:
+            records = await self.on_scraping_all_records_from_url(base_url=lease.job.url,
+                                                                  msg_config=self._registry.get_msg_config(job=lease.job),
+                                                                  is_stop_404=lease.job.is_stop_404,
+                                                                  topic_cache=self._topic_cache,
+                                                                  parse_mode=self._parse_mode,
+                                                                  parse_executor=self._parse_executor,
+                                                                  crawl_state=self._crawl_state,
+                                                                  page_info=page_info,
+                                                                  profile_enricher=self._profile_enricher,
+                                                                  is_put_state=False)
+        except ScraperNotFoundError:
+            # Nothing to retry
+            records = []
+        except Exception as err:
+            error = str(err)
+        finally:
+            heartbeat.cancel()
+            await aio_gather(heartbeat, return_exceptions=True)
+
+        if records is None:
+            await self._queue.fail(lease=lease,
+                                   error=error or f"Not scraped url - {lease.job.url}",
+                                   retry_delay=self._retry_delay * 2 ** (lease.attempts - 1))
+            return
+
+        for record in records:
+            await self._sink.write(record)
+
+        await self._sink.flush()
+
+        # The watermark moves past the messages only once they are stored
+        if page_info.get('page_state') is not None:
+            await self._crawl_state.put(state=page_info['page_state'])
+
+        if not await self._queue.ack(lease=lease):
+            LOGGER.warning(f"Lost lease of url - {lease.job.url}")
+
+    async def _heartbeat(self, *, lease: ScraperQueueLease) -> None:
+        while 1:
+            await aio_sleep(self._lease_seconds / 3)
+
+            if not await self._queue.extend(lease=lease, lease_seconds=self._lease_seconds):
+                LOGGER.warning(f"Lost lease of url - {lease.job.url}")
+                return
+
+
+async def _main(args) -> None:
+    from src.config import get_site_registry
+
+    queue = ScraperSqliteQueue(path=args.queue, max_attempts=args.max_attempts)
+
+    try:
+        if args.url_template:
+            for page in range(args.start_page, args.end_page + 1):
+                await queue.put(job=ScraperCrawlJob(url=args.url_template.format(page=page),
+                                                     site=args.site,
+                                                     is_stop_404=True),
+                                is_force=args.force)
+
+        if args.sink:
+            async with ScraperSqliteSink(path=args.sink) as sink:
+                await ScraperWorker(queue=queue,
+                                    sink=sink,
+                                    worker_id=args.worker_id,
+                                    concurrency=args.concurrency,
+                                    lease_seconds=args.lease,
+                                    registry=get_site_registry(),
+                                    parse_mode=ScraperParseMode(args.mode),
+                                    parse_executor=ScraperParseExecutor(args.executor),
+                                    is_drain=args.drain).run()
+
+        LOGGER.info(await queue.get_counts())
+    finally:
+        await queue.close()
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Crawls jobs of a shared queue, site profiles come from SITE_PROFILES_PATH")
+    parser.add_argument('--queue', required=True, help="SQLite queue file")
+    parser.add_argument('--sink', help="SQLite file for messages, without it jobs are only put")
+    parser.add_argument('--url-template', help="Puts a job per page, {page} is replaced by the page number")
+    parser.add_argument('--start-page', type=int, default=1)
+    parser.add_argument('--end-page', type=int, default=1)
+    parser.add_argument('--site', help="Site profile of the put jobs, by default taken by host")
+    parser.add_argument('--force', action='store_true', help="Put again jobs that are done or dead")
+    parser.add_argument('--worker-id')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--lease', type=float, default=60, help="Lease time in seconds")
+    parser.add_argument('--max-attempts', type=int, default=5)
+    parser.add_argument('--mode', choices=[mode.value for mode in ScraperParseMode], default='page')
+    parser.add_argument('--executor', choices=[executor.value for executor in ScraperParseExecutor], default='thread')
+    parser.add_argument('--drain', action='store_true', help="Exit once no job is waiting or in progress")
+    args = parser.parse_args()
+
+    aio_run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,23 @@ from os import environ
 from pathlib import Path
 
 from dotenv import load_dotenv
+from src.Scraper.Registry.scraper_site_registry import ScraperSiteRegistry
 
 LOGGER = logging.getLogger()
 
 if not load_dotenv(Path("./.env")):
     LOGGER.error("Not found .env file")
 
+# Site profiles, JSON or YAML
+SITE_PROFILES_PATH = environ.get("SITE_PROFILES_PATH")
+
+
+def get_site_registry() -> ScraperSiteRegistry:
+    registry = ScraperSiteRegistry()
+
+    if SITE_PROFILES_PATH:
+        registry.load(path=SITE_PROFILES_PATH)
+
+    return registry
+
 
@@ -0,0 +1,125 @@
+from pathlib import Path
+import pytest
+from src.Scraper.Models.scraper_models import (ScraperMsgConfig,
+                                               ScraperUserConfig,
+                                               ScraperDateConfig,
+                                               ScraperParserBackend)
+from src.Scraper.Operations.scraper_page_operations import ScraperPageOperations
+from src.Scraper.Parser.scraper_parser import ScraperParser
+
+FIXTURES_PATH = Path(__file__).parent / 'fixtures'
+
+BACKENDS = [ScraperParserBackend.LXML, ScraperParserBackend.SELECTOLAX]
+
+XENFORO_CONFIG = ScraperMsgConfig(msg_block_class_name='message',
+                                  msg_text_class_name='bbWrapper',
+                                  quote_block_name='blockquote',
+                                  user_config=ScraperUserConfig(block_name='message-name', is_class=True),
+                                  date_config=ScraperDateConfig(block_name='u-dt', is_class=True, attribute='datetime'),
+                                  date_format='%Y-%m-%dT%H:%M:%S%z',
+                                  topic_link_patterns=None,
+                                  next_page_class_name='pageNav-jump--next')
+
+PAGES = {
+    'xenforo_thread': ('https://forum.example/threads/best-way-to-store-rotate-keys.1042/page-2', XENFORO_CONFIG),
+    'xenforo_post_history': ('https://forum.example/search/1234/',
+                             XENFORO_CONFIG.model_copy(update={'topic_link_patterns': [r'/threads/']})),
+    'phpbb_topic': ('https://board.example/viewtopic.php?t=300',
+                    ScraperMsgConfig(msg_block_class_name='post',
+                                     msg_text_class_name='content',
+                                     quote_block_name='blockquote',
+                                     user_config=ScraperUserConfig(block_name='postprofile', is_class=True),
+                                     date_pattern=r'»\s*(.+)$',
+                                     date_config=ScraperDateConfig(block_name='author', is_class=True),
+                                     date_format='%a %b %d, %Y %I:%M %p',
+                                     topic_link_patterns=None)),
+}
+
+
+def read_fixture(name: str) -> str:
+    return (FIXTURES_PATH / f'{name}.html').read_text(encoding='utf-8')
+
+
+def extract_page(name: str, backend: ScraperParserBackend, is_stream: bool = False) -> dict:
+    base_url, msg_config = PAGES[name]
+
+    return ScraperPageOperations.extract_page(html=read_fixture(name),
+                                              base_url=base_url,
+                                              msg_config=msg_config.model_copy(update={'parser': backend}),
+                                              is_stream=is_stream)
+
+
+@pytest.fixture(params=BACKENDS, ids=lambda backend: backend.value)
+def backend(request) -> ScraperParserBackend:
+    try:
+        ScraperParser.from_backend(request.param)
+    except Exception as err:
+        pytest.skip(str(err))
+
+    return request.param
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_page_matches_html_parser(name, backend):
+    assert extract_page(name, backend) == extract_page(name, ScraperParserBackend.HTML_PARSER)
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_stream_page_matches_html_parser(name, backend):
+    assert extract_page(name, backend, is_stream=True) == extract_page(name, ScraperParserBackend.HTML_PARSER)
+
+
+def test_xenforo_thread_values():
+    page = extract_page('xenforo_thread', ScraperParserBackend.HTML_PARSER)
+    msgs = page['msgs']
+
+    assert len(msgs) == 4
+    assert msgs[0]['user'] == ('https://forum.example/members/kestrel.77/', 'kestrel')
+    assert msgs[0]['date'] == '2023-03-14T09:26:53+0000'
+    assert msgs[0]['topic'] == ('https://forum.example/threads/best-way-to-store-rotate-keys.1042/page-2',
+                                'Best way to store & rotate keys? | Page 2 | Example Forum')
+    assert msgs[1]['user'] == ('https://forum.example/members/m%C3%B6we.310/', 'möwe')
+    assert msgs[1]['quotes'][0].endswith('Anything else is asking for trouble.')
+    # A deleted message has no text block
+    assert msgs[2] is None
+    assert page['next_url'] == 'https://forum.example/threads/best-way-to-store-rotate-keys.1042/page-3'
+
+
+def test_phpbb_topic_values():
+    msgs = extract_page('phpbb_topic', ScraperParserBackend.HTML_PARSER)['msgs']
+
+    assert [msg['date'] for msg in msgs] == ['Sat Jan 06, 2024 8:13 pm',
+                                             'Sun Jan 07, 2024 9:01 am',
+                                             'Sun Jan 07, 2024 11:40 am']
+    assert msgs[1]['user'] == ('https://board.example/memberlist.php?mode=viewprofile&u=12', 'admin')
+    assert msgs[1]['quotes'] == ['ferret wrote:obfs4 bridges stop working after a few minutes.Any ideas?']
+    assert msgs[2]['parsed_date'].hour == 11
+
+
+@pytest.mark.parametrize('name, class_name', [('xenforo_thread', 'message message--post js-post js-inlineModContainer'),
+                                              ('xenforo_thread', 'message--post'),
+                                              ('xenforo_thread', 'message--deleted'),
+                                              ('phpbb_topic', 'post has-profile bg2'),
+                                              ('phpbb_topic', 'bg2'),
+                                              ('phpbb_topic', 'has-profile bg2')])
+def test_class_lookups(name, class_name, backend):
+    # A name with spaces matches the whole class attribute only, like bs4 does
+    expected = ScraperParser.from_backend(ScraperParserBackend.HTML_PARSER).parse(read_fixture(name))
+    base_obj = ScraperParser.from_backend(backend).parse(read_fixture(name))
+
+    assert ([obj.get_text() for obj in base_obj.find_all_by_class(class_name)] ==
+            [obj.get_text() for obj in expected.find_all_by_class(class_name)])
+
+
+@pytest.mark.parametrize('name, attr, value', [('xenforo_thread', 'rel', 'next'),
+                                               ('xenforo_thread', 'rel', 'nofollow'),
+                                               ('xenforo_thread', 'data-quote', 'möwe'),
+                                               ('xenforo_thread', 'data-author', 'möwe'),
+                                               ('phpbb_topic', 'style', 'color: #AA0000;')])
+def test_attr_lookups(name, attr, value, backend):
+    expected = ScraperParser.from_backend(ScraperParserBackend.HTML_PARSER).parse(read_fixture(name))
+    obj = ScraperParser.from_backend(backend).parse(read_fixture(name)).find_by_attr(attr, value)
+
+    assert obj is not None
+    assert obj.get_attr('href') == expected.find_by_attr(attr, value).get_attr('href')
+    assert obj.get_text() == expected.find_by_attr(attr, value).get_text()
@@ -0,0 +1,88 @@
+from random import Random
+from src.Scraper.Matcher.scraper_pattern_matcher import ScraperPatternMatcher
+from src.Scraper.Operations.scraper_page_operations import ScraperPageOperations
+
+
+def _random_text(rng: Random, size: int) -> str:
+    # A tiny alphabet makes overlapping and nested patterns common
+    return "".join(rng.choice('ab c') for _ in range(size))
+
+
+def _get_entry(text: str, quote_text: str) -> dict:
+    return {
+        'text': text,
+        'quote_text': quote_text,
+        'norm_text': ScraperPageOperations.normalize_text(text=text),
+        'norm_quote_text': ScraperPageOperations.normalize_text(text=quote_text)
+    }
+
+
+def _search_linear(*, topic_index: [dict], msg: dict) -> (str, [dict] or None):
+    """Per message scan of the whole topic, as matching worked before the automaton"""
+
+    msg_pattern = ScraperPageOperations.normalize_pattern(pattern=msg['text'])
+    quote_patterns = [ScraperPageOperations.normalize_pattern(pattern=quote) for quote in msg['quotes']]
+
+    answer_text_index = None
+    questions = []
+
+    for index, entry in enumerate(topic_index):
+        if quote_patterns:
+            if all(pattern in entry['norm_quote_text'] for pattern in quote_patterns):
+                answer_text_index = index
+
+            elif any(pattern in entry['norm_text'] for pattern in quote_patterns):
+                questions.append(entry)
+
+        elif msg_pattern in entry['norm_text']:
+            answer_text_index = index
+
+    if answer_text_index and len(questions) == 0:
+        questions.append(topic_index[answer_text_index - 1])
+
+    return (topic_index[answer_text_index]['text'] if answer_text_index is not None else msg['text'],
+            questions if len(questions) != 0 else None)
+
+
+def test_matcher_finds_same_patterns_as_substring_search():
+    rng = Random(7)
+
+    for _ in range(200):
+        patterns = [_random_text(rng, rng.randint(0, 4)) for _ in range(rng.randint(1, 8))]
+        text = _random_text(rng, rng.randint(0, 40))
+
+        expected = {pattern_id for pattern_id, pattern in enumerate(patterns) if pattern in text}
+
+        assert ScraperPatternMatcher(patterns).search(text) == expected
+
+
+def test_topic_search_matches_linear_search():
+    rng = Random(11)
+
+    for _ in range(200):
+        topic_index = [_get_entry(_random_text(rng, rng.randint(1, 12)), _random_text(rng, rng.randint(0, 12)))
+                       for _ in range(rng.randint(1, 10))]
+
+        msgs = []
+
+        for _ in range(rng.randint(1, 5)):
+            quotes = [_random_text(rng, rng.randint(1, 3)) + rng.choice(['', '…'])
+                      for _ in range(rng.choice([0, 0, 1, 2]))]
+            msgs.append({'text': _random_text(rng, rng.randint(1, 4)), 'quotes': quotes})
+
+        expected = [_search_linear(topic_index=topic_index, msg=msg) for msg in msgs]
+
+        assert ScraperPageOperations.search_questions_in_topic(topic_index=topic_index, msgs=msgs) == expected
+
+
+def test_search_in_index_finds_quoted_question():
+    topic_index = [_get_entry('Where is the Config file?', ''),
+                   _get_entry('Unrelated', ''),
+                   _get_entry('In the home directory', 'Where is the config file?')]
+
+    answer, questions = ScraperPageOperations.search_questions_in_index(topic_index=topic_index,
+                                                                       msg_text='In the home directory',
+                                                                       quote_texts=['where is the  config…'])
+
+    assert answer == 'In the home directory'
+    assert questions == [topic_index[0]]
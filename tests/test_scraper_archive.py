@@ -0,0 +1,113 @@
+from asyncio import run as aio_run, gather as aio_gather
+from os import walk
+import pytest
+from test_parser_backends import PAGES, read_fixture
+from src.Scraper.Archive.scraper_archive import ScraperArchive
+from src.Scraper.Models.scraper_models import ScraperResponse
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Transport.scraper_archive_transport import ScraperRecordingTransport, ScraperReplayTransport
+from src.Scraper.Transport.scraper_transport import ScraperTransport
+from src.Scraper.scraper import Scraper
+
+URL = 'https://forum.example/threads/1/'
+
+
+class PagesTransport(ScraperTransport):
+    """Serves fixed pages, any other url is unavailable"""
+
+    IS_REMOTE = False
+
+    def __init__(self, *, pages: dict[str, str]):
+        self._pages = pages
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        if url not in self._pages:
+            return ScraperResponse(url=url, status_code=503, text='', headers={})
+
+        return ScraperResponse(url=url, status_code=200, text=self._pages[url], headers={'ETag': '"1"'})
+
+
+@pytest.fixture
+def archive(tmp_path) -> ScraperArchive:
+    result = ScraperArchive(path=str(tmp_path / 'archive'))
+
+    yield result
+
+    result.close()
+
+
+def get_file_names(path: str) -> [str]:
+    return [file_name for _, _, file_names in walk(path) for file_name in file_names]
+
+
+def test_put_and_get_by_time(archive, tmp_path):
+    async def main():
+        for fetched_at, text in ((10.0, 'first'), (20.0, 'second — ünïcode'), (30.0, 'first')):
+            await archive.put(response=ScraperResponse(url=URL, status_code=200, text=text, headers={'ETag': text}),
+                              fetched_at=fetched_at)
+
+        return (await archive.get(url=URL),
+                await archive.get(url=URL, fetched_before=25.0),
+                await archive.get(url=URL, fetched_before=5.0),
+                await archive.get(url='https://forum.example/threads/2/'),
+                await archive.get_urls())
+
+    latest, before, too_early, missing, urls = aio_run(main())
+
+    assert (latest.text, latest.headers) == ('first', {'ETag': 'first'})
+    assert before.text == 'second — ünïcode'
+    assert too_early is None and missing is None
+    assert urls == [URL]
+    # Same body fetched twice is stored once
+    assert len(get_file_names(str(tmp_path / 'archive' / 'objects'))) == 2
+
+
+def test_concurrent_puts_of_same_body(archive, tmp_path):
+    async def main():
+        await aio_gather(*[archive.put(response=ScraperResponse(url=f'{URL}?page={page}',
+                                                                status_code=200,
+                                                                text='same body',
+                                                                headers={})) for page in range(20)])
+
+        return await archive.get_urls()
+
+    assert len(aio_run(main())) == 20
+    # No temporary file is left behind
+    assert len(get_file_names(str(tmp_path / 'archive' / 'objects'))) == 1
+
+
+def test_replay_gives_recorded_results(archive, monkeypatch):
+    base_url, msg_config = PAGES['phpbb_topic']
+    transport = PagesTransport(pages={base_url: read_fixture('phpbb_topic')})
+
+    async def scrape(url: str):
+        return await Scraper(url=url, msg_config=msg_config, is_stop_404=False).run()
+
+    recording_transport = ScraperRecordingTransport(transport=transport, archive=archive)
+
+    monkeypatch.setattr(ScraperHtmlOperations, '_TRANSPORT', recording_transport)
+    recorded = aio_run(scrape(base_url))
+
+    # Server errors are not archived
+    assert aio_run(recording_transport.get(url=URL, headers={})).status_code == 503
+
+    monkeypatch.setattr(ScraperHtmlOperations, '_TRANSPORT', ScraperReplayTransport(archive=archive))
+    replayed = aio_run(scrape(base_url))
+
+    assert len(recorded) == 3
+    assert replayed == recorded
+    assert aio_run(archive.get_urls()) == [base_url]
+
+    response = aio_run(ScraperReplayTransport(archive=archive).get(url=URL, headers={}))
+
+    assert response.status_code == 404
+
+
+def test_replay_before_time(archive):
+    async def main():
+        await archive.put(response=ScraperResponse(url=URL, status_code=200, text='old', headers={}), fetched_at=1.0)
+        await archive.put(response=ScraperResponse(url=URL, status_code=200, text='new', headers={}), fetched_at=2.0)
+
+        return await ScraperReplayTransport(archive=archive, fetched_before=1.5).get(url=URL, headers={})
+
+    assert aio_run(main()).text == 'old'
@@ -0,0 +1,66 @@
+from asyncio import run as aio_run, gather as aio_gather, sleep as aio_sleep
+from time import sleep
+from src.Scraper.Cache.scraper_cache import ScraperCache
+
+
+def test_get_or_load_runs_one_loader_per_key():
+    cache = ScraperCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await aio_sleep(0.01)
+        return 'index'
+
+    async def main():
+        return await aio_gather(*[cache.get_or_load(key='topic', loader=loader) for _ in range(10)])
+
+    assert aio_run(main()) == ['index'] * 10
+    assert len(calls) == 1
+    assert aio_run(cache.get_or_load(key='topic', loader=loader)) == 'index'
+    assert len(calls) == 1
+
+
+def test_failed_load_is_shared_and_not_cached():
+    cache = ScraperCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await aio_sleep(0.01)
+        raise ValueError('dead topic')
+
+    async def main():
+        return await aio_gather(*[cache.get_or_load(key='topic', loader=loader) for _ in range(3)])
+
+    assert aio_run(main()) == [None] * 3
+    assert len(calls) == 1
+    assert cache.get('topic') is None
+
+    aio_run(main())
+
+    assert len(calls) == 2
+
+
+def test_ttl_expires_values():
+    cache = ScraperCache(ttl=0.05)
+    cache.put('topic', 'index')
+
+    assert cache.get('topic') == 'index'
+
+    sleep(0.06)
+
+    assert cache.get('topic') is None
+    assert len(cache) == 0
+
+
+def test_max_size_evicts_least_recently_used():
+    cache = ScraperCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
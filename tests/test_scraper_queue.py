@@ -0,0 +1,103 @@
+from asyncio import run as aio_run
+from time import sleep
+import pytest
+from src.Scraper.Models.scraper_models import ScraperCrawlJob
+from src.Scraper.Queue.scraper_sqlite_queue import ScraperSqliteQueue
+
+URL = 'https://forum.example/threads/1/'
+
+
+@pytest.fixture
+def queue(tmp_path) -> ScraperSqliteQueue:
+    result = ScraperSqliteQueue(path=str(tmp_path / 'queue.db'), max_attempts=2)
+
+    yield result
+
+    aio_run(result.close())
+
+
+def test_jobs_are_unique_by_url(queue):
+    async def main():
+        return (await queue.put(job=ScraperCrawlJob(url=URL)),
+                await queue.put(job=ScraperCrawlJob(url=URL, priority=-1)),
+                await queue.get_counts())
+
+    assert aio_run(main()) == (True, False, {'pending': 1})
+
+
+def test_lease_order_and_ack(queue):
+    async def main():
+        await queue.put(job=ScraperCrawlJob(url=URL))
+        await queue.put(job=ScraperCrawlJob(url=f'{URL}page-2', priority=-1))
+
+        first = await queue.lease(owner='a', lease_seconds=60)
+        second = await queue.lease(owner='b', lease_seconds=60)
+
+        return (first.job.url, second.job.url,
+                await queue.lease(owner='c', lease_seconds=60),
+                await queue.ack(lease=first),
+                await queue.ack(lease=first),
+                await queue.get_counts(),
+                await queue.is_empty())
+
+    assert aio_run(main()) == (f'{URL}page-2', URL, None, True, False, {'done': 1, 'leased': 1}, False)
+
+
+def test_expired_lease_is_taken_over(queue):
+    async def main():
+        await queue.put(job=ScraperCrawlJob(url=URL))
+
+        expired = await queue.lease(owner='a', lease_seconds=0.05)
+        sleep(0.1)
+        taken = await queue.lease(owner='b', lease_seconds=60)
+
+        # The first owner lost the job, only the new one may finish it
+        return (taken.attempts,
+                await queue.extend(lease=expired, lease_seconds=60),
+                await queue.ack(lease=expired),
+                await queue.ack(lease=taken),
+                await queue.is_empty())
+
+    assert aio_run(main()) == (2, False, False, True, True)
+
+
+def test_extend_keeps_lease(queue):
+    async def main():
+        await queue.put(job=ScraperCrawlJob(url=URL))
+
+        lease = await queue.lease(owner='a', lease_seconds=0.1)
+        sleep(0.06)
+        is_extended = await queue.extend(lease=lease, lease_seconds=60)
+        sleep(0.06)
+
+        return is_extended, await queue.lease(owner='b', lease_seconds=60)
+
+    assert aio_run(main()) == (True, None)
+
+
+def test_failed_job_is_retried_then_dead(queue):
+    async def main():
+        await queue.put(job=ScraperCrawlJob(url=URL))
+
+        await queue.fail(lease=await queue.lease(owner='a', lease_seconds=60), error='503', retry_delay=0.05)
+        is_delayed = await queue.lease(owner='a', lease_seconds=60) is None
+
+        sleep(0.1)
+        await queue.fail(lease=await queue.lease(owner='a', lease_seconds=60), error='503')
+
+        return is_delayed, await queue.get_counts(), await queue.put(job=ScraperCrawlJob(url=URL), is_force=True)
+
+    assert aio_run(main()) == (True, {'dead': 1}, True)
+
+
+def test_expired_lease_of_last_attempt_is_dead(queue):
+    async def main():
+        await queue.put(job=ScraperCrawlJob(url=URL))
+
+        for _ in range(2):
+            await queue.lease(owner='a', lease_seconds=0.05)
+            sleep(0.1)
+
+        return await queue.lease(owner='b', lease_seconds=60), await queue.get_counts()
+
+    assert aio_run(main()) == (None, {'dead': 1})
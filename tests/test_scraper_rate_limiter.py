@@ -0,0 +1,80 @@
+from asyncio import run as aio_run
+from time import monotonic, sleep
+from src.Scraper.Transport.scraper_rate_limiter import ScraperRateLimiter
+
+HOST = 'forum.example'
+
+
+def test_rate_grows_additively_up_to_max_rate():
+    rate_limiter = ScraperRateLimiter(initial_rate=2.0, max_rate=3.0, increase=1.0)
+
+    rate_limiter.record(host=HOST, status_code=200, latency=0.1)
+
+    assert rate_limiter.get_rate(host=HOST) == 2.5
+
+    for _ in range(10):
+        rate_limiter.record(host=HOST, status_code=200, latency=0.1)
+
+    assert rate_limiter.get_rate(host=HOST) == 3.0
+
+
+def test_throttling_halves_rate_once_per_window():
+    rate_limiter = ScraperRateLimiter(initial_rate=10.0, min_rate=1.0, decrease=0.5)
+
+    # A burst of 429 from one window counts once
+    for _ in range(5):
+        rate_limiter.record(host=HOST, status_code=429, latency=0.01)
+
+    assert rate_limiter.get_rate(host=HOST) == 5.0
+
+    sleep(0.25)
+    rate_limiter.record(host=HOST, status_code=503, latency=0.01)
+
+    assert rate_limiter.get_rate(host=HOST) == 2.5
+
+    for _ in range(3):
+        sleep(0.5)
+        rate_limiter.record(host=HOST, status_code=None, latency=0.01)
+
+    assert rate_limiter.get_rate(host=HOST) == 1.0
+
+
+def test_rising_latency_decreases_rate():
+    rate_limiter = ScraperRateLimiter(initial_rate=10.0, latency_factor=3.0)
+
+    rate_limiter.record(host=HOST, status_code=200, latency=0.01)
+    rate = rate_limiter.get_rate(host=HOST)
+
+    # The moving average jumps above three times the base latency, so even a 200 slows down
+    rate_limiter.record(host=HOST, status_code=200, latency=0.2)
+
+    assert rate_limiter.get_rate(host=HOST) < rate
+
+
+def test_hosts_are_independent():
+    rate_limiter = ScraperRateLimiter(initial_rate=4.0)
+
+    rate_limiter.record(host=HOST, status_code=429, latency=0.01)
+
+    assert rate_limiter.get_rates() == {HOST: 2.0}
+    assert rate_limiter.get_rate(host='board.example') == 4.0
+
+
+def test_acquire_paces_requests_after_burst():
+    rate_limiter = ScraperRateLimiter(initial_rate=20.0, burst=3.0)
+
+    async def main() -> [float]:
+        started_at = monotonic()
+        result = []
+
+        for _ in range(5):
+            await rate_limiter.acquire(host=HOST)
+            result.append(monotonic() - started_at)
+
+        return result
+
+    times = aio_run(main())
+
+    # The bucket starts with one token, then refills at 20 per second
+    assert times[0] < 0.02
+    assert 0.17 <= times[-1] < 0.4
@@ -0,0 +1,68 @@
+from asyncio import run as aio_run
+from datetime import datetime, timezone
+import pytest
+from pydantic import ValidationError
+from test_parser_backends import PAGES, read_fixture
+from src.Scraper.Archive.scraper_archive import ScraperArchive
+from src.Scraper.Models.scraper_models import ScraperMsgResult, ScraperResponse
+from src.Scraper.Models.scraper_records import (ScraperMsgRecord,
+                                                ScraperUserMsgRecord,
+                                                ScraperUserRecord,
+                                                ScraperTopicRecord)
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Transport.scraper_archive_transport import ScraperReplayTransport
+from src.Scraper.scraper import Scraper
+
+
+def get_record(*, topic_name: str or None = 'Thread', user_name: str or None = 'kestrel') -> ScraperMsgRecord:
+    user = ScraperUserRecord(url='https://forum.example/members/kestrel.77/', name=user_name)
+
+    return ScraperMsgRecord(date='2024-01-01T00:00:00+0000',
+                            parsed_date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                            answer=ScraperUserMsgRecord(user=user, text='Answer', profile={'joined': '2020'}),
+                            questions=[ScraperUserMsgRecord(user=None, text='Question')],
+                            topic=ScraperTopicRecord(url='https://forum.example/threads/1/', name=topic_name))
+
+
+def test_record_round_trip():
+    result = get_record().to_result()
+
+    assert isinstance(result, ScraperMsgResult)
+    assert result.answer.user.profile == {'joined': '2020'}
+    assert ScraperMsgRecord.from_result(result).to_dict() == get_record().to_dict()
+    assert ScraperMsgResult.model_validate(result.model_dump()) == result
+
+
+@pytest.mark.parametrize('fields', [{'topic_name': None}, {'user_name': None}])
+def test_invalid_record_is_rejected_on_hand_out(fields):
+    with pytest.raises(ValidationError):
+        get_record(**fields).to_result()
+
+
+def test_page_without_title_is_not_handed_out(tmp_path, monkeypatch):
+    base_url, msg_config = PAGES['phpbb_topic']
+    html = read_fixture('phpbb_topic')
+    # The title is the name of the page topic
+    html = html[:html.index('<title>')] + html[html.index('</title>') + len('</title>'):]
+    archive = ScraperArchive(path=str(tmp_path / 'archive'))
+
+    monkeypatch.setattr(ScraperHtmlOperations, '_TRANSPORT', ScraperReplayTransport(archive=archive))
+
+    async def main() -> ([ScraperMsgResult] or None, [ScraperMsgResult], [ScraperMsgRecord]):
+        await archive.put(response=ScraperResponse(url=base_url, status_code=200, text=html, headers={}))
+
+        scraper = Scraper(url=base_url, msg_config=msg_config, is_stop_404=False)
+
+        return (await scraper.run(),
+                [result async for result in scraper.stream()],
+                [record async for record in scraper.stream_records()])
+
+    try:
+        result, results, records = aio_run(main())
+    finally:
+        archive.close()
+
+    assert result is None
+    assert results == []
+    # Sinks take records as they are
+    assert len(records) == 3
@@ -0,0 +1,149 @@
+from asyncio import run as aio_run
+from time import sleep
+import pytest
+from src.Scraper.Models.scraper_models import ScraperResponse
+from src.Scraper.Operations import scraper_html_operations
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Transport.scraper_circuit_breaker import ScraperCircuitBreaker
+from src.Scraper.Transport.scraper_retry_policy import ScraperRetryPolicy
+from src.Scraper.Transport.scraper_transport import ScraperTransport
+
+URL = 'https://forum.example/threads/1/'
+HOST = 'forum.example'
+
+
+class ScriptedTransport(ScraperTransport):
+    """Answers with the given status codes in turn, the last one repeats"""
+
+    def __init__(self, *statuses: (int, dict)):
+        self._statuses = list(statuses)
+        self.requests_count = 0
+
+    async def get(self, *, url: str, headers: dict[str, str]) -> ScraperResponse:
+        status_code, response_headers = self._statuses[min(self.requests_count, len(self._statuses) - 1)]
+        self.requests_count += 1
+
+        return ScraperResponse(url=url, status_code=status_code, text='<html></html>', headers=response_headers)
+
+
+@pytest.fixture
+def delays(monkeypatch) -> [float]:
+    result = []
+
+    async def sleep_stub(delay: float) -> None:
+        result.append(delay)
+
+    monkeypatch.setattr(scraper_html_operations, 'aio_sleep', sleep_stub)
+    monkeypatch.setattr(ScraperHtmlOperations, '_RATE_LIMITER', None)
+
+    return result
+
+
+def set_fetch(monkeypatch, *, transport: ScraperTransport, circuit_breaker: ScraperCircuitBreaker,
+              max_attempts: int = 3) -> None:
+    monkeypatch.setattr(ScraperHtmlOperations, '_TRANSPORT', transport)
+    monkeypatch.setattr(ScraperHtmlOperations, '_CIRCUIT_BREAKER', circuit_breaker)
+    monkeypatch.setattr(ScraperHtmlOperations, '_RETRY_POLICY', ScraperRetryPolicy(max_attempts=max_attempts))
+
+
+def fetch() -> ScraperResponse or None:
+    response, _ = aio_run(ScraperHtmlOperations.get_response_from_url(url=URL, is_stop_404=False))
+
+    return response
+
+
+def test_retry_after_is_respected(monkeypatch, delays):
+    transport = ScriptedTransport((429, {'Retry-After': '7'}), (503, {'Retry-After': '120'}), (200, {}))
+    set_fetch(monkeypatch, transport=transport, circuit_breaker=ScraperCircuitBreaker())
+
+    assert fetch().status_code == 200
+    assert transport.requests_count == 3
+    # Capped by max_delay
+    assert delays == [7.0, 60.0]
+
+
+def test_retry_after_date_and_backoff():
+    response = ScraperResponse(url=URL,
+                               status_code=503,
+                               text='',
+                               headers={'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+
+    assert ScraperRetryPolicy.get_retry_after(response=response) == 0.0
+    assert ScraperRetryPolicy(jitter=0).get_delay(attempt=3) == 4.0
+
+
+def test_retries_of_one_request_do_not_open_circuit(monkeypatch, delays):
+    transport = ScriptedTransport((503, {}))
+    circuit_breaker = ScraperCircuitBreaker(failure_threshold=2)
+    set_fetch(monkeypatch, transport=transport, circuit_breaker=circuit_breaker)
+
+    assert fetch() is None
+    assert transport.requests_count == 3
+    assert not circuit_breaker.is_open(host=HOST)
+
+    assert fetch() is None
+    assert transport.requests_count == 6
+    assert circuit_breaker.is_open(host=HOST)
+
+    # Open host fails fast without a request
+    assert fetch() is None
+    assert transport.requests_count == 6
+
+
+def test_success_resets_failures(monkeypatch, delays):
+    circuit_breaker = ScraperCircuitBreaker(failure_threshold=2)
+    set_fetch(monkeypatch, transport=ScriptedTransport((503, {})), circuit_breaker=circuit_breaker)
+
+    assert fetch() is None
+
+    set_fetch(monkeypatch, transport=ScriptedTransport((503, {}), (200, {})), circuit_breaker=circuit_breaker)
+
+    assert fetch().status_code == 200
+
+    set_fetch(monkeypatch, transport=ScriptedTransport((503, {})), circuit_breaker=circuit_breaker)
+
+    assert fetch() is None
+    assert not circuit_breaker.is_open(host=HOST)
+
+
+def test_half_open_probe(monkeypatch, delays):
+    circuit_breaker = ScraperCircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    set_fetch(monkeypatch, transport=ScriptedTransport((503, {})), circuit_breaker=circuit_breaker)
+
+    assert fetch() is None
+    assert circuit_breaker.is_open(host=HOST)
+
+    sleep(0.06)
+
+    # The probe is a single request, its failure opens the host again
+    transport = ScriptedTransport((503, {}), (200, {}))
+    set_fetch(monkeypatch, transport=transport, circuit_breaker=circuit_breaker)
+
+    assert fetch() is None
+    assert transport.requests_count == 1
+    assert not circuit_breaker.allow(host=HOST)
+
+    sleep(0.06)
+
+    transport = ScriptedTransport((200, {}))
+    set_fetch(monkeypatch, transport=transport, circuit_breaker=circuit_breaker)
+
+    assert fetch().status_code == 200
+    assert transport.requests_count == 1
+    assert not circuit_breaker.is_open(host=HOST)
+
+
+def test_one_probe_at_a_time():
+    circuit_breaker = ScraperCircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    circuit_breaker.record_failure(host=HOST)
+
+    assert not circuit_breaker.allow(host=HOST)
+
+    sleep(0.06)
+
+    assert circuit_breaker.allow(host=HOST)
+    assert not circuit_breaker.allow(host=HOST)
+
+    circuit_breaker.record_success(host=HOST)
+
+    assert circuit_breaker.allow(host=HOST)
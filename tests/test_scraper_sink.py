@@ -0,0 +1,89 @@
+from asyncio import run as aio_run
+from sqlite3 import connect as sqlite_connect
+import pytest
+from test_parser_backends import PAGES, read_fixture
+from src.Scraper.Archive.scraper_archive import ScraperArchive
+from src.Scraper.Models.scraper_models import ScraperParseMode, ScraperResponse
+from src.Scraper.Models.scraper_records import (ScraperMsgRecord,
+                                                ScraperUserMsgRecord,
+                                                ScraperUserRecord,
+                                                ScraperTopicRecord)
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Sink.scraper_sqlite_sink import ScraperSqliteSink
+from src.Scraper.Transport.scraper_archive_transport import ScraperReplayTransport
+from src.Scraper.scraper_operations import ScraperOperations
+
+
+def select_rows(path: str, columns: str) -> [tuple]:
+    connection = sqlite_connect(path)
+
+    try:
+        return connection.execute(f'SELECT {columns} FROM messages ORDER BY id').fetchall()
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize('parse_mode', list(ScraperParseMode), ids=lambda parse_mode: parse_mode.value)
+def test_deleted_msg_does_not_drop_thread(parse_mode, tmp_path, monkeypatch):
+    if parse_mode == ScraperParseMode.STREAM:
+        pytest.importorskip('lxml')
+
+    base_url, msg_config = PAGES['xenforo_thread']
+    archive = ScraperArchive(path=str(tmp_path / 'archive'))
+    sink_path = str(tmp_path / 'messages.db')
+
+    monkeypatch.setattr(ScraperHtmlOperations, '_TRANSPORT', ScraperReplayTransport(archive=archive))
+
+    async def main():
+        await archive.put(response=ScraperResponse(url=base_url,
+                                                   status_code=200,
+                                                   text=read_fixture('xenforo_thread'),
+                                                   headers={}))
+
+        async with ScraperSqliteSink(path=sink_path) as sink:
+            async for record in ScraperOperations.iter_records_from_url(base_url=base_url,
+                                                                        msg_config=msg_config,
+                                                                        is_stop_404=False,
+                                                                        parse_mode=parse_mode):
+                await sink.write(record)
+
+    try:
+        aio_run(main())
+    finally:
+        archive.close()
+
+    rows = select_rows(sink_path, 'topic_url, user_name')
+
+    # The third post is deleted, it has no text block
+    assert len(rows) == 3
+    assert all(topic_url == base_url for topic_url, _ in rows)
+
+
+def get_record(text: str) -> ScraperMsgRecord:
+    return ScraperMsgRecord(date='2024-01-01T00:00:00+0000',
+                            parsed_date=None,
+                            answer=ScraperUserMsgRecord(user=ScraperUserRecord(url='https://forum.example/members/1/',
+                                                                               name='kestrel'),
+                                                        text=text),
+                            questions=None,
+                            topic=ScraperTopicRecord(url='https://forum.example/threads/1/', name='Thread'))
+
+
+def test_sink_ignores_msgs_it_already_has(tmp_path):
+    sink_path = str(tmp_path / 'messages.db')
+
+    async def main():
+        async with ScraperSqliteSink(path=sink_path, batch_size=2) as sink:
+            for text in ('first', 'second', 'first'):
+                await sink.write(get_record(text))
+
+        # A job crawled again by another worker writes the same messages
+        async with ScraperSqliteSink(path=sink_path) as sink:
+            for text in ('second', 'third'):
+                await sink.write(get_record(text))
+
+            await sink.write(get_record('third').to_result())
+
+    aio_run(main())
+
+    assert [text for text, in select_rows(sink_path, 'text')] == ['first', 'second', 'third']
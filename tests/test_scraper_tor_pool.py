@@ -0,0 +1,102 @@
+from asyncio import run as aio_run, gather as aio_gather, sleep as aio_sleep
+import pytest
+from src.Bench.scraper_bench_corpus import BENCH_URL
+from src.Bench.scraper_bench_server import ScraperBenchServer
+from src.Bench.scraper_bench_socks import ScraperBenchSocksProxy
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Transport.scraper_circuit_breaker import ScraperCircuitBreaker
+from src.Scraper.Transport.scraper_retry_policy import ScraperRetryPolicy
+from src.Scraper.Transport.scraper_tor_pool_transport import ScraperTorPoolTransport
+
+PAGES = {f'{BENCH_URL}/': 'ok',
+         **{f'{BENCH_URL}/threads/{page}/': f'<html><body>page {page}</body></html>' for page in range(40)}}
+
+
+@pytest.fixture(autouse=True)
+def fetch_settings(monkeypatch):
+    monkeypatch.setattr(ScraperHtmlOperations, '_RATE_LIMITER', None)
+    monkeypatch.setattr(ScraperHtmlOperations, '_CIRCUIT_BREAKER', ScraperCircuitBreaker())
+    monkeypatch.setattr(ScraperHtmlOperations, '_RETRY_POLICY', ScraperRetryPolicy(base_delay=0.05, max_delay=0.1))
+
+
+def test_pool_fails_over_to_live_proxy_and_probes_restarted_one(monkeypatch):
+    async def main():
+        proxies = [ScraperBenchSocksProxy(latency=0.01, seed=1), ScraperBenchSocksProxy(latency=0.01, seed=2)]
+
+        async with ScraperBenchServer(pages=PAGES, latency=0.02) as server:
+            for proxy in proxies:
+                await proxy.start()
+
+            pool = ScraperTorPoolTransport(proxy_urls=[proxy.proxy_url for proxy in proxies],
+                                           timeout=5,
+                                           request_budget=None,
+                                           slow_factor=None,
+                                           cooldown=60,
+                                           health_url=server.get_url(f'{BENCH_URL}/'))
+            monkeypatch.setattr(ScraperHtmlOperations, '_TRANSPORT', pool)
+
+            async def fetch(page: int) -> str or None:
+                html, _ = await ScraperHtmlOperations.get_html_from_url(
+                    url=server.get_url(f'{BENCH_URL}/threads/{page}/'), is_stop_404=False)
+
+                return html
+
+            try:
+                # Both identities take requests while they are up
+                assert all(await aio_gather(*[fetch(page) for page in range(10)]))
+                assert [proxy.connections_count > 0 for proxy in proxies] == [True, True]
+
+                async def kill():
+                    await aio_sleep(0.03)
+                    await proxies[0].stop()
+
+                # One SOCKS port goes down in the middle of a crawl, requests cut with it are retried
+                results = await aio_gather(*[fetch(page) for page in range(10, 40)], kill())
+
+                assert results[:-1] == [PAGES[f'{BENCH_URL}/threads/{page}/'] for page in range(10, 40)]
+
+                stats = pool.get_stats()
+
+                assert [stats[0]['is_healthy'], stats[1]['is_healthy']] == [False, True]
+                assert stats[0]['evictions'] >= 1
+
+                # Stays out for the cooldown, even when the port is back
+                await proxies[0].start()
+
+                assert pool.get_stats()[0]['is_healthy'] is False
+
+                connections_count = proxies[0].connections_count
+                await pool.check_health()
+
+                assert pool.get_stats()[0]['is_healthy'] is True
+                assert proxies[0].connections_count > connections_count
+                assert await fetch(0)
+            finally:
+                await pool.close()
+
+                for proxy in proxies:
+                    await proxy.stop()
+
+    aio_run(main())
+
+
+def test_pool_without_live_proxy_fails_request(monkeypatch):
+    async def main():
+        proxy = ScraperBenchSocksProxy()
+        proxy_url = await proxy.start()
+        await proxy.stop()
+
+        pool = ScraperTorPoolTransport(proxy_urls=[proxy_url], timeout=5)
+        monkeypatch.setattr(ScraperHtmlOperations, '_TRANSPORT', pool)
+
+        try:
+            html, _ = await ScraperHtmlOperations.get_html_from_url(url=f'{BENCH_URL}/', is_stop_404=False)
+
+            return html, pool.get_stats()
+        finally:
+            await pool.close()
+
+    html, stats = aio_run(main())
+
+    assert html is None
+    assert stats[0]['is_healthy'] is False
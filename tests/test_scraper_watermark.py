@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+from test_parser_backends import PAGES, read_fixture, extract_page
+from src.Scraper.Models.scraper_models import ScraperPageState, ScraperParserBackend
+from src.Scraper.Operations.scraper_msg_operations import ScraperMsgOperations
+from src.Scraper.Parser.scraper_parser import ScraperParser
+from src.Scraper.Registry.scraper_extraction_plan import ScraperExtractionPlan
+from src.Scraper.scraper_operations import ScraperOperations
+
+STARTED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def get_msg(text: str, minutes: int or None = None) -> dict:
+    date = STARTED_AT + timedelta(minutes=minutes) if minutes is not None else None
+
+    return {'text': text,
+            'quotes': [],
+            'topic': ('https://forum.example/threads/1/', None),
+            'date': date.isoformat() if date else None,
+            'parsed_date': date,
+            'user': None}
+
+
+def get_key(msg: dict) -> str:
+    return ScraperMsgOperations.get_msg_key(topic_url=msg['topic'][0],
+                                            user_url=None,
+                                            date=msg['date'],
+                                            text=msg['text'])
+
+
+def test_fresh_state_keeps_msgs_before_unparsed_one():
+    msgs = [get_msg('first'), None, get_msg('third')]
+    page_state = ScraperPageState(url='https://forum.example/threads/1/')
+
+    assert ScraperOperations._apply_page_watermark(msgs=msgs, page_state=page_state) == 0
+    assert page_state.last_msg_key == get_key(msgs[2])
+
+
+def test_watermark_starts_after_last_seen_msg():
+    msgs = [get_msg('first', 0), None, get_msg('third', 2), get_msg('fourth', 3)]
+    page_state = ScraperPageState(url='https://forum.example/threads/1/', last_msg_key=get_key(msgs[2]))
+
+    assert ScraperOperations._apply_page_watermark(msgs=msgs, page_state=page_state) == 3
+    assert page_state.last_msg_key == get_key(msgs[3])
+    assert page_state.last_msg_date == msgs[3]['parsed_date']
+
+
+def test_deleted_watermark_msg_falls_back_to_dates():
+    msgs = [get_msg('first', 0), get_msg('second', 1), get_msg('fourth', 3)]
+    page_state = ScraperPageState(url='https://forum.example/threads/1/',
+                                  last_msg_key=get_key(get_msg('third', 2)),
+                                  last_msg_date=STARTED_AT + timedelta(minutes=2))
+
+    assert ScraperOperations._apply_page_watermark(msgs=msgs, page_state=page_state) == 2
+
+
+def test_deleted_watermark_msg_without_dates_starts_over():
+    msgs = [get_msg('first'), get_msg('second')]
+    page_state = ScraperPageState(url='https://forum.example/threads/1/', last_msg_key=get_key(get_msg('third')))
+
+    assert ScraperOperations._apply_page_watermark(msgs=msgs, page_state=page_state) == 0
+    assert page_state.last_msg_key == get_key(msgs[1])
+
+
+def test_fresh_state_on_thread_with_deleted_msg():
+    base_url, msg_config = PAGES['xenforo_thread']
+    msgs = extract_page('xenforo_thread', ScraperParserBackend.HTML_PARSER)['msgs']
+    msg_objs = ScraperParser.from_backend(ScraperParserBackend.HTML_PARSER).parse(
+        read_fixture('xenforo_thread')).find_all_by_class(msg_config.msg_block_class_name)
+
+    page_state = ScraperPageState(url=base_url)
+    msg_page_state = ScraperPageState(url=base_url)
+
+    assert msgs[2] is None
+    assert ScraperOperations._apply_page_watermark(msgs=msgs, page_state=page_state) == 0
+    assert ScraperOperations._apply_msg_objs_watermark(msg_objs=msg_objs,
+                                                       url=base_url,
+                                                       msg_config=ScraperExtractionPlan.get(msg_config),
+                                                       page_state=msg_page_state) == 0
+
+    # Both modes move the watermark to the same message
+    assert page_state.last_msg_key == msg_page_state.last_msg_key is not None
@@ -0,0 +1,111 @@
+from asyncio import run as aio_run
+import pytest
+from test_parser_backends import PAGES, read_fixture
+from test_scraper_sink import select_rows
+from src.Scraper.Archive.scraper_archive import ScraperArchive
+from src.Scraper.Models.scraper_models import ScraperCrawlJob, ScraperResponse
+from src.Scraper.Operations.scraper_html_operations import ScraperHtmlOperations
+from src.Scraper.Queue.scraper_sqlite_queue import ScraperSqliteQueue
+from src.Scraper.Sink.scraper_sqlite_sink import ScraperSqliteSink
+from src.Scraper.State.scraper_crawl_state import ScraperCrawlState
+from src.Scraper.Transport.scraper_archive_transport import ScraperReplayTransport
+from src.Scraper.scraper_scheduler import ScraperScheduler
+from src.Scraper.scraper_worker import ScraperWorker
+
+BASE_URL, MSG_CONFIG = PAGES['phpbb_topic']
+
+
+class FailingSink(ScraperSqliteSink):
+    async def _write_batch(self, batch) -> None:
+        raise OSError('No space left on device')
+
+
+@pytest.fixture
+def crawl_state(tmp_path, monkeypatch) -> ScraperCrawlState:
+    archive = ScraperArchive(path=str(tmp_path / 'archive'))
+    result = ScraperCrawlState(path=str(tmp_path / 'state.db'))
+
+    aio_run(archive.put(response=ScraperResponse(url=BASE_URL,
+                                                 status_code=200,
+                                                 text=read_fixture('phpbb_topic'),
+                                                 headers={})))
+
+    monkeypatch.setattr(ScraperHtmlOperations, '_TRANSPORT', ScraperReplayTransport(archive=archive))
+
+    yield result
+
+    result.close()
+    archive.close()
+
+
+def run_worker(*, tmp_path, sink: ScraperSqliteSink, crawl_state: ScraperCrawlState) -> dict[str, int]:
+    async def main():
+        queue = ScraperSqliteQueue(path=str(tmp_path / 'queue.db'), max_attempts=1)
+
+        try:
+            await queue.put(job=ScraperCrawlJob(url=BASE_URL, msg_config=MSG_CONFIG), is_force=True)
+
+            async with sink:
+                await ScraperWorker(queue=queue,
+                                    sink=sink,
+                                    crawl_state=crawl_state,
+                                    lease_seconds=0.2,
+                                    poll_interval=0.05,
+                                    is_drain=True).run()
+
+            return await queue.get_counts()
+        finally:
+            await queue.close()
+
+    return aio_run(main())
+
+
+def test_worker_puts_state_after_flush(tmp_path, crawl_state):
+    sink_path = str(tmp_path / 'messages.db')
+
+    assert run_worker(tmp_path=tmp_path, sink=ScraperSqliteSink(path=sink_path), crawl_state=crawl_state) == {
+        'done': 1}
+    assert len(select_rows(sink_path, 'msg_key')) == 3
+
+    page_state = aio_run(crawl_state.get(url=BASE_URL))
+
+    assert page_state.last_msg_key == select_rows(sink_path, 'msg_key')[-1][0]
+
+    # Not modified the second time, nothing new to store
+    assert run_worker(tmp_path=tmp_path, sink=ScraperSqliteSink(path=sink_path), crawl_state=crawl_state) == {
+        'done': 1}
+    assert len(select_rows(sink_path, 'msg_key')) == 3
+
+
+def test_worker_keeps_state_when_sink_fails(tmp_path, crawl_state):
+    counts = run_worker(tmp_path=tmp_path,
+                        sink=FailingSink(path=str(tmp_path / 'messages.db')),
+                        crawl_state=crawl_state)
+
+    # The lease expires unacked, a next attempt would crawl the messages again from the start
+    assert counts == {'dead': 1}
+    assert aio_run(crawl_state.get(url=BASE_URL)) is None
+
+
+def run_scheduler(*, sink: ScraperSqliteSink, crawl_state: ScraperCrawlState) -> None:
+    async def main():
+        async with sink:
+            async with ScraperScheduler(sink=sink, crawl_state=crawl_state) as scheduler:
+                await scheduler.put(ScraperCrawlJob(url=BASE_URL, msg_config=MSG_CONFIG))
+
+    aio_run(main())
+
+
+def test_scheduler_puts_state_after_flush(tmp_path, crawl_state):
+    sink_path = str(tmp_path / 'messages.db')
+
+    # A batch far larger than the page, the scheduler flushes before the state is put
+    run_scheduler(sink=ScraperSqliteSink(path=sink_path, batch_size=1000), crawl_state=crawl_state)
+
+    assert aio_run(crawl_state.get(url=BASE_URL)).last_msg_key == select_rows(sink_path, 'msg_key')[-1][0]
+
+
+def test_scheduler_keeps_state_when_sink_fails(tmp_path, crawl_state):
+    run_scheduler(sink=FailingSink(path=str(tmp_path / 'messages.db')), crawl_state=crawl_state)
+
+    assert aio_run(crawl_state.get(url=BASE_URL)) is None
@@ -0,0 +1,74 @@
+import pytest
+from test_parser_backends import PAGES, read_fixture, backend
+from src.Scraper.Models.scraper_models import ScraperParserBackend
+from src.Scraper.Operations.scraper_page_operations import ScraperPageOperations
+from src.Scraper.Parser.scraper_parser import ScraperParser
+from src.Scraper.Parser.scraper_stream_parser import ScraperStreamParser
+
+pytest.importorskip('lxml')
+
+NESTED_HTML = """<html><head><title>Nested</title></head><body>
+<div class="post" id="outer"><p>outer start</p>
+  <div class="post reply" id="inner"><p>inner</p>
+    <div class="post" id="innermost">innermost</div>
+  </div>
+  <p>outer end</p>
+</div>
+<div class="post" id="last">last</div>
+</body></html>"""
+
+
+def get_texts(html: str, block_class_name: str, backend: ScraperParserBackend, chunk_size: int = 65536) -> [str]:
+    stream_parser = ScraperStreamParser(block_class_name=block_class_name, backend=backend, chunk_size=chunk_size)
+
+    return [obj.get_text() for obj in stream_parser.iter_blocks(html)]
+
+
+def get_page_texts(html: str, block_class_name: str, backend: ScraperParserBackend) -> [str]:
+    return [obj.get_text() for obj in ScraperParser.from_backend(backend).parse(html).find_all_by_class(block_class_name)]
+
+
+@pytest.mark.parametrize('name', PAGES)
+@pytest.mark.parametrize('chunk_size', [7, 65536])
+def test_blocks_match_page(name, chunk_size, backend):
+    block_class_name = PAGES[name][1].msg_block_class_name
+    html = read_fixture(name)
+
+    assert get_texts(html, block_class_name, backend, chunk_size) == get_page_texts(html, block_class_name, backend)
+
+
+def test_nested_blocks_match_page(backend):
+    texts = get_texts(NESTED_HTML, 'post', backend, chunk_size=16)
+
+    assert len(texts) == 4
+    assert texts == get_page_texts(NESTED_HTML, 'post', backend)
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_truncated_page_matches_page(name, backend):
+    base_url, msg_config = PAGES[name]
+    html = read_fixture(name)
+    # Cut inside the text of the last message, its block is never closed
+    html = html[:html.rindex(msg_config.msg_block_class_name) + 200]
+    msg_config = msg_config.model_copy(update={'parser': backend})
+
+    texts = get_texts(html, msg_config.msg_block_class_name, backend)
+
+    assert texts == get_page_texts(html, msg_config.msg_block_class_name, backend)
+    assert texts[-1]
+
+    stream_page = ScraperPageOperations.extract_page(html=html, base_url=base_url, msg_config=msg_config,
+                                                     is_stream=True)
+    page = ScraperPageOperations.extract_page(html=html, base_url=base_url, msg_config=msg_config)
+
+    assert stream_page['msgs'] == page['msgs']
+
+
+def test_title_and_next_link_are_read_after_blocks():
+    base_url, msg_config = PAGES['xenforo_thread']
+    stream_parser = ScraperStreamParser(block_class_name=msg_config.msg_block_class_name,
+                                        next_page_class_name=msg_config.next_page_class_name)
+
+    assert len(list(stream_parser.iter_blocks(read_fixture('xenforo_thread')))) == 4
+    assert stream_parser.title == 'Best way to store & rotate keys? | Page 2 | Example Forum'
+    assert stream_parser.next_link.endswith('/page-3')